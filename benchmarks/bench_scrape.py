@@ -0,0 +1,197 @@
+"""End-to-end scrape benchmark against the local mock site and CDN.
+
+Usage:
+    python -m benchmarks.bench_scrape [--albums 20] [--images 30] [--image-size 262144]
+        [--latency 0.02] [--error-rate 0] [--bandwidth 0] [--max-worker 5] [--segments 4]
+        [--page-concurrency 4] [--output result.json]
+
+A list page of the mock site is scraped by a real `ScrapeManager`, with `FakeBot` in place
+of the browser. Pages/s, images/s, MB/s, CPU seconds per downloaded GB and the p50/p95
+latency of page fetches and image downloads are printed, `--output` also writes them as
+JSON for diffing across versions. The CPU time includes the mock servers, which run in the
+same process.
+"""
+
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+import tempfile
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+from benchmarks.fake_bot import FakeBot
+from benchmarks.mock_site import CdnSpec, MockCdn, MockSite, SiteSpec
+from v2dl.common import Config, ConfigManager
+from v2dl.common.const import BASE_URL
+from v2dl.scraper import ScrapeManager
+from v2dl.version import __version__
+
+
+def make_config(download_dir: Path, args: argparse.Namespace) -> Config:
+    config_manager = ConfigManager()
+    config_manager.load_from_defaults()  # the user's config.yaml is ignored on purpose
+    static_config = config_manager.get("static_config")
+    static_config.update(
+        download_dir=str(download_dir),
+        download_log_path=str(download_dir / "downloaded_albums.txt"),
+        system_log_path=str(download_dir / "v2dl.log"),
+        state_dir=str(download_dir / "state"),
+        chrome_exec_path="",
+        no_metadata=True,
+        force_download=True,
+        max_worker=args.max_worker,
+        rate_limit=args.rate_limit,
+        download_segments=args.segments,
+        page_concurrency=args.page_concurrency,
+        page_range=None,
+    )
+
+    logger = logging.getLogger("v2dl.bench")
+    logger.setLevel(logging.DEBUG if args.verbose else logging.CRITICAL)
+    config_manager.set("runtime_config", "logger", logger)
+    return Config(
+        config_manager.create_static_config(),
+        config_manager.create_encryption_config(),
+        config_manager.create_runtime_config(),
+    )
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+def latency_summary(values: list[float]) -> dict[str, float]:
+    return {
+        "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+    }
+
+
+def time_downloads(
+    scrape_manager: ScrapeManager,
+) -> tuple[list[float], list[bool]]:
+    """Wrap the image downloader to record the latency and result of every file."""
+    strategy = scrape_manager.strategies["album_image"]
+    download_file: Callable[..., Awaitable[bool]] = strategy.download_file  # type: ignore[attr-defined]
+    latencies: list[float] = []
+    results: list[bool] = []
+
+    async def timed(*args: Any, **kwargs: Any) -> bool:
+        start = time.perf_counter()
+        result = await download_file(*args, **kwargs)
+        latencies.append(time.perf_counter() - start)
+        results.append(result)
+        return result
+
+    strategy.download_file = timed  # type: ignore[attr-defined]
+    return latencies, results
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict[str, Any]:
+    cdn = MockCdn(
+        CdnSpec(
+            image_size=args.image_size,
+            latency=args.latency,
+            error_rate=args.error_rate,
+            bandwidth=args.bandwidth,
+        )
+    )
+    site = MockSite(
+        SiteSpec(
+            albums=args.albums,
+            images_per_album=args.images,
+            page_latency=args.page_latency,
+        ),
+        cdn,
+    )
+    await cdn.start()
+    await site.start()
+
+    with tempfile.TemporaryDirectory(prefix="v2dl-bench-") as tmp:
+        download_dir = Path(tmp)
+        config = make_config(download_dir, args)
+        bot = FakeBot(config, site.base_url)
+        scrape_manager = ScrapeManager(config, bot)
+        image_latencies, image_results = time_downloads(scrape_manager)
+
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            await scrape_manager.scrape_url(f"{BASE_URL}/actor/bench")
+        finally:
+            elapsed = time.perf_counter() - start
+            cpu_time = time.process_time() - cpu_start
+            await scrape_manager.aclose()
+            await bot.aclose()
+            await site.close()
+            await cdn.close()
+
+        total_bytes = sum(f.stat().st_size for f in download_dir.rglob("*.jpg"))
+
+    pages = len(bot.latencies)
+    images = sum(image_results)
+    return {
+        "v2dl_version": __version__,
+        "python": platform.python_version(),
+        "params": {
+            key: value for key, value in vars(args).items() if key not in ("output", "verbose")
+        },
+        "elapsed_s": round(elapsed, 3),
+        "pages": pages,
+        "images": images,
+        "failed_images": len(image_results) - images,
+        "bytes": total_bytes,
+        "pages_per_s": round(pages / elapsed, 2),
+        "images_per_s": round(images / elapsed, 2),
+        "mb_per_s": round(total_bytes / 2**20 / elapsed, 2),
+        "cpu_s": round(cpu_time, 3),
+        "cpu_s_per_gb": round(cpu_time / (total_bytes / 2**30), 2) if total_bytes else 0.0,
+        "page_latency": latency_summary(bot.latencies),
+        "image_latency": latency_summary(image_latencies),
+    }
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline v2dl scrape benchmark")
+    parser.add_argument("--albums", type=int, default=20, help="albums in the list page")
+    parser.add_argument("--images", type=int, default=30, help="images per album")
+    parser.add_argument("--image-size", type=int, default=256 * 1024, help="bytes per image")
+    parser.add_argument("--latency", type=float, default=0.02, help="CDN latency in seconds")
+    parser.add_argument("--page-latency", type=float, default=0.0, help="site latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="CDN 503 probability")
+    parser.add_argument("--bandwidth", type=int, default=0, help="CDN bytes/s per response")
+    parser.add_argument("--max-worker", type=int, default=5)
+    parser.add_argument("--rate-limit", type=int, default=0, help="v2dl rate limit in KB/s")
+    parser.add_argument("--segments", type=int, default=4, help="ranges per large file")
+    parser.add_argument("--page-concurrency", type=int, default=4, help="album pages at once")
+    parser.add_argument("--output", type=Path, help="write the result as JSON")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+    result = asyncio.run(run_benchmark(args))
+
+    print(f"v2dl {result['v2dl_version']}, {result['elapsed_s']}s")
+    print(f"pages   {result['pages']:>8} {result['pages_per_s']:>10} pages/s")
+    print(f"images  {result['images']:>8} {result['images_per_s']:>10} images/s")
+    print(f"bytes   {result['bytes']:>8} {result['mb_per_s']:>10} MB/s")
+    print(f"cpu     {result['cpu_s']:>8} {result['cpu_s_per_gb']:>10} s/GB")
+    for name in ("page_latency", "image_latency"):
+        latency = result[name]
+        print(f"{name:<14} p50 {latency['p50_ms']:>8} ms  p95 {latency['p95_ms']:>8} ms")
+
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
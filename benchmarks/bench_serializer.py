@@ -0,0 +1,71 @@
+"""Compare the JSON backends of `v2dl.common.serializer` on synthetic metadata.
+
+Usage:
+    python benchmarks/bench_serializer.py [--albums 100000] [--repeat 5]
+
+The status map mirrors what `MetadataHandler` writes: one entry per album with the status
+name, destination and image counts. Each backend is timed for the pretty legacy file, the
+compact JSONL journal (one dumps call per album) and loading the legacy file back.
+"""
+
+import time
+import argparse
+import importlib.util
+from collections.abc import Callable
+from typing import Any
+
+from v2dl.common.serializer import BACKENDS, get_serializer
+from v2dl.scraper.tools import DownloadStatus
+
+
+def make_status_map(albums: int) -> dict[str, dict[str, Any]]:
+    statuses = [status.name for status in DownloadStatus]
+    return {
+        f"https://www.v2ph.com/album/{i:x}": {
+            "status": statuses[i % len(statuses)],
+            "dest": f"/home/user/Downloads/v2dl/相簿 {i}",
+            "expect_num": 120,
+            "real_num": 120 - i % 3,
+        }
+        for i in range(albums)
+    }
+
+
+def best_of(repeat: int, func: Callable[[], Any]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--albums", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    status_map = make_status_map(args.albums)
+    records = [{"url": url, **status} for url, status in status_map.items()]
+
+    print(f"{args.albums} albums, best of {args.repeat} runs")
+    print(f"{'backend':<10}{'pretty dump':>14}{'jsonl dump':>14}{'load':>14}{'size':>14}")
+    for name in BACKENDS:
+        if importlib.util.find_spec(name) is None:
+            print(f"{name:<10}{'not installed':>14}")
+            continue
+
+        serializer = get_serializer(name)
+        pretty = serializer.dumps(status_map, pretty=True)
+        dump = best_of(args.repeat, lambda: serializer.dumps(status_map, pretty=True))
+        jsonl = best_of(args.repeat, lambda: [serializer.dumps(r) for r in records])
+        load = best_of(args.repeat, lambda: serializer.loads(pretty))
+        print(
+            f"{name:<10}{dump * 1000:>12.1f}ms{jsonl * 1000:>12.1f}ms"
+            f"{load * 1000:>12.1f}ms{len(pretty) / 2**20:>12.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
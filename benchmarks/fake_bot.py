@@ -0,0 +1,47 @@
+import time
+
+import httpx
+
+from v2dl.common import Config
+from v2dl.common.const import BASE_URL
+from v2dl.web_bot.base import BaseBot
+
+
+class FakeBot(BaseBot):
+    """Fetch pages of the mock site with httpx instead of driving a browser.
+
+    Keys and accounts are not needed, so `BaseBot.__init__` is skipped on purpose.
+    """
+
+    def __init__(self, config: Config, site_url: str) -> None:
+        self.config = config
+        self.runtime_config = config.runtime_config
+        self.close_browser = config.static_config.terminate
+        self.logger = config.runtime_config.logger
+        self.page_concurrency = max(config.static_config.page_concurrency, 1)
+        self.site_url = site_url.rstrip("/")
+        self.client = httpx.AsyncClient(timeout=30.0)
+        self.latencies: list[float] = []
+
+    def init_driver(self) -> None:
+        pass
+
+    def close_driver(self) -> None:
+        pass
+
+    async def auto_page_scroll(self, url: str, max_retry: int = 3, page_sleep: int = 5) -> str:
+        target = self.site_url + url.removeprefix(BASE_URL)
+        for _ in range(max_retry):
+            start = time.perf_counter()
+            try:
+                response = await self.client.get(target)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                self.logger.warning("Fake bot failed to fetch %s: %s", target, e)
+                continue
+            self.latencies.append(time.perf_counter() - start)
+            return response.text
+        return f"Failed to fetch {target}"
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
@@ -0,0 +1,208 @@
+"""Local stand-ins for v2ph.com and its image CDN.
+
+The site renders album list and album pages that satisfy the XPath contracts of
+`AlbumScraper` and `ImageScraper`, the CDN serves synthetic images with a configurable
+size, latency, error rate and bandwidth, and answers byte range requests. Both speak just
+enough HTTP/1.1 for httpx, including keep-alive.
+"""
+
+import re
+import random
+import asyncio
+from dataclasses import dataclass
+from html import escape
+from urllib.parse import parse_qs, urlsplit
+
+from v2dl.common.const import IMAGE_PER_PAGE
+
+ALBUMS_PER_LIST_PAGE = 24
+
+
+@dataclass
+class SiteSpec:
+    albums: int = 20  # albums listed under /actor/bench
+    images_per_album: int = 30
+    page_latency: float = 0.0  # seconds before a page is served
+
+
+@dataclass
+class CdnSpec:
+    image_size: int = 256 * 1024  # bytes
+    latency: float = 0.02  # seconds before the first byte
+    error_rate: float = 0.0  # probability of a 503 response
+    bandwidth: int = 0  # bytes per second per response, 0 is unlimited
+    seed: int = 0
+
+
+class MockServer:
+    """Minimal keep-alive HTTP/1.1 server, subclasses implement `respond`."""
+
+    def __init__(self) -> None:
+        self.server: asyncio.Server | None = None
+        self.requests = 0
+        self.range_requests = 0
+
+    @property
+    def base_url(self) -> str:
+        if self.server is None:
+            raise RuntimeError("Server is not started")
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while request_line := await reader.readline():
+                _, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while line := (await reader.readline()).strip():
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.lower()] = value.strip()  # bodies are never sent
+
+                self.requests += 1
+                await self.respond(writer, target, headers)
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(
+        self, writer: asyncio.StreamWriter, target: str, headers: dict[str, str]
+    ) -> None:
+        raise NotImplementedError
+
+    @staticmethod
+    def write_head(
+        writer: asyncio.StreamWriter,
+        status: str,
+        content_type: str,
+        length: int,
+        extra: str = "",
+    ) -> None:
+        writer.write(
+            (
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {length}\r\n"
+                f"{extra}"
+                "Connection: keep-alive\r\n\r\n"
+            ).encode("latin-1")
+        )
+
+
+class MockSite(MockServer):
+    """Serves `/actor/bench?page=N` and `/album/<id>?page=N`."""
+
+    def __init__(self, spec: SiteSpec, cdn: "MockCdn") -> None:
+        super().__init__()
+        self.spec = spec
+        self.cdn = cdn
+
+    async def respond(
+        self, writer: asyncio.StreamWriter, target: str, headers: dict[str, str]
+    ) -> None:
+        parts = urlsplit(target)
+        page = int(parse_qs(parts.query).get("page", ["1"])[0])
+        if self.spec.page_latency:
+            await asyncio.sleep(self.spec.page_latency)
+
+        if parts.path.startswith("/actor/"):
+            body = self.render_list(page)
+        elif parts.path.startswith("/album/"):
+            body = self.render_album(parts.path.removeprefix("/album/"), page)
+        else:
+            self.write_head(writer, "404 Not Found", "text/plain", 0)
+            return
+
+        data = body.encode("utf-8")
+        self.write_head(writer, "200 OK", "text/html; charset=utf-8", len(data))
+        writer.write(data)
+
+    def render_list(self, page: int) -> str:
+        start = (page - 1) * ALBUMS_PER_LIST_PAGE
+        end = min(start + ALBUMS_PER_LIST_PAGE, self.spec.albums)
+        covers = "".join(
+            f'<a class="media-cover" href="/album/bench-{i}"></a>' for i in range(start, end)
+        )
+        return self.render_page(covers, page, -(-self.spec.albums // ALBUMS_PER_LIST_PAGE))
+
+    def render_album(self, album_id: str, page: int) -> str:
+        start = (page - 1) * IMAGE_PER_PAGE
+        end = min(start + IMAGE_PER_PAGE, self.spec.images_per_album)
+        name = escape(f"Bench Album {album_id}")
+        photos = "".join(
+            f'<div class="album-photo my-2"><img src="{self.cdn.base_url}/img/{album_id}/{i}.jpg"'
+            f' alt="{name} {i + 1}"></div>'
+            for i in range(start, end)
+        )
+        return self.render_page(photos, page, -(-self.spec.images_per_album // IMAGE_PER_PAGE))
+
+    @staticmethod
+    def render_page(content: str, page: int, max_page: int) -> str:
+        # the real site shows a window of page links around the current page
+        window = range(max(1, page - 2), min(max_page, page + 2) + 1)
+        pagination = "".join(
+            f'<li class="page-item"><a class="page-link" href="?page={p}">{p}</a></li>'
+            for p in window
+        )
+        return (
+            "<html><body>"
+            f"<div class='content'>{content}</div>"
+            f"<ul class='pagination'>{pagination}</ul>"
+            "</body></html>"
+        )
+
+
+class MockCdn(MockServer):
+    """Serves `/img/...` with synthetic JPEG bodies."""
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, spec: CdnSpec) -> None:
+        super().__init__()
+        self.spec = spec
+        self.random = random.Random(spec.seed)
+        self.errors = 0
+        # a complete JPEG for the verifier, start and end of image markers
+        self.body = b"\xff\xd8\xff" + bytes(max(spec.image_size - 5, 0)) + b"\xff\xd9"
+
+    async def respond(
+        self, writer: asyncio.StreamWriter, target: str, headers: dict[str, str]
+    ) -> None:
+        if self.spec.latency:
+            await asyncio.sleep(self.spec.latency)
+
+        if self.random.random() < self.spec.error_rate:
+            self.errors += 1
+            self.write_head(writer, "503 Service Unavailable", "text/plain", 0)
+            return
+
+        body = memoryview(self.body)
+        if match := re.fullmatch(r"bytes=(\d+)-(\d*)", headers.get("range", "")):
+            self.range_requests += 1
+            start = int(match[1])
+            stop = min(int(match[2]) + 1, len(body)) if match[2] else len(body)
+            content_range = f"Content-Range: bytes {start}-{stop - 1}/{len(body)}\r\n"
+            body = body[start:stop]
+            self.write_head(writer, "206 Partial Content", "image/jpeg", len(body), content_range)
+        else:
+            self.write_head(writer, "200 OK", "image/jpeg", len(body), "Accept-Ranges: bytes\r\n")
+
+        if not self.spec.bandwidth:
+            writer.write(body)
+            return
+
+        # pace each chunk by the time it takes at the configured bandwidth
+        for offset in range(0, len(body), self.CHUNK_SIZE):
+            chunk = body[offset : offset + self.CHUNK_SIZE]
+            await asyncio.sleep(len(chunk) / self.spec.bandwidth)
+            writer.write(chunk)
+            await writer.drain()
@@ -0,0 +1,106 @@
+from argparse import Namespace
+
+from benchmarks.bench_scrape import make_config, run_benchmark
+from benchmarks.fake_bot import FakeBot
+from benchmarks.mock_site import CdnSpec, MockCdn, MockSite, SiteSpec
+from v2dl.common.const import BASE_URL
+from v2dl.scraper import ScrapeManager
+from v2dl.scraper.downloader import SEGMENT_MIN_SIZE
+
+
+async def test_scrape_benchmark_smoke():
+    args = Namespace(
+        albums=2,
+        images=12,
+        image_size=1024,
+        latency=0.0,
+        page_latency=0.0,
+        error_rate=0.0,
+        bandwidth=0,
+        max_worker=2,
+        rate_limit=0,
+        segments=4,
+        page_concurrency=4,
+        output=None,
+        verbose=False,
+    )
+    result = await run_benchmark(args)
+
+    assert result["pages"] == 1 + 2 * 2  # list page and two pages per album
+    assert result["images"] == 24
+    assert result["failed_images"] == 0
+    assert result["bytes"] == 24 * 1024
+
+
+async def test_segmented_download(tmp_path):
+    cdn = MockCdn(CdnSpec(image_size=SEGMENT_MIN_SIZE + 12345, latency=0.0))
+    await cdn.start()
+    args = Namespace(max_worker=3, rate_limit=0, segments=4, page_concurrency=1, verbose=False)
+    scrape_manager = ScrapeManager(make_config(tmp_path, args), None)
+    strategy = scrape_manager.strategies["album_image"]
+    try:
+        assert await strategy.download_file(f"{cdn.base_url}/img/a/0.jpg", tmp_path / "a" / "001")
+    finally:
+        await scrape_manager.aclose()
+        await cdn.close()
+
+    assert (tmp_path / "a" / "001.jpg").read_bytes() == cdn.body
+    assert cdn.range_requests == 3  # the first range comes from the initial response
+
+
+async def test_broken_download_is_quarantined(tmp_path):
+    cdn = MockCdn(CdnSpec(image_size=1024, latency=0.0))
+    cdn.body = cdn.body[:-2]  # cut short, the end of image marker is missing
+    await cdn.start()
+    args = Namespace(max_worker=2, rate_limit=0, segments=4, page_concurrency=1, verbose=False)
+    config = make_config(tmp_path, args)
+    config.static_config.verify_mode = "header"
+    scrape_manager = ScrapeManager(config, None)
+    strategy = scrape_manager.strategies["album_image"]
+    try:
+        assert not await strategy.download_file(
+            f"{cdn.base_url}/img/a/0.jpg", tmp_path / "a" / "001"
+        )
+    finally:
+        await scrape_manager.aclose()
+        await cdn.close()
+
+    assert not (tmp_path / "a" / "001.jpg").exists()
+    assert (tmp_path / ".quarantine" / "a" / "001.jpg").read_bytes() == cdn.body
+
+
+async def test_concurrent_album_pages(tmp_path):
+    cdn = MockCdn(CdnSpec(image_size=256, latency=0.0))
+    site = MockSite(SiteSpec(albums=1, images_per_album=95, page_latency=0.02), cdn)
+    await cdn.start()
+    await site.start()
+    args = Namespace(max_worker=3, rate_limit=0, segments=4, page_concurrency=4, verbose=False)
+    config = make_config(tmp_path, args)
+    bot = FakeBot(config, site.base_url)
+    scrape_manager = ScrapeManager(config, bot)
+
+    fetch_page = bot.auto_page_scroll
+    in_flight: list[str] = []
+    peak: list[int] = []
+
+    async def counted(url, *args, **kwargs):
+        in_flight.append(url)
+        peak.append(len(in_flight))
+        try:
+            return await fetch_page(url, *args, **kwargs)
+        finally:
+            in_flight.remove(url)
+
+    bot.auto_page_scroll = counted
+    try:
+        await scrape_manager.scrape_url(f"{BASE_URL}/album/bench-0")
+    finally:
+        await scrape_manager.aclose()
+        await bot.aclose()
+        await site.close()
+        await cdn.close()
+
+    assert max(peak) > 1
+    assert len(bot.latencies) == 10  # no page past the last one is requested
+    names = sorted(path.stem for path in tmp_path.rglob("*.jpg"))
+    assert names == [f"{i:03d}" for i in range(1, 96)]
@@ -0,0 +1,88 @@
+import time
+
+from v2dl.common import metrics
+from v2dl.common.clearance import ClearanceCache
+
+
+def test_clearance_cache_shared_through_state_dir(tmp_path):
+    first = ClearanceCache(tmp_path / "clearance.json", reload_interval=0)
+    second = ClearanceCache(tmp_path / "clearance.json", reload_interval=0)
+    assert first.get() is None
+
+    first.store("a", "UA 1", time.time() + 60)
+    first.store("b", "UA 2", time.time() + 120)
+    clearance = second.get("UA 1")
+    assert clearance is not None
+    assert clearance.value == "a"
+    assert second.get("UA 3") is None
+    newest = second.get()
+    assert newest is not None
+    assert newest.value == "b"
+
+    # one clearance per user agent, rejected ones are dropped for every reader
+    second.store("c", "UA 1")
+    second.discard("b")
+    assert [(c.value, c.user_agent) for c in [first.get()] if c] == [("c", "UA 1")]
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_clearance_lookups_throttle_reloads(tmp_path, monkeypatch):
+    path = tmp_path / "clearance.json"
+    reader = ClearanceCache(path, reload_interval=60)
+    writer = ClearanceCache(path)
+    writer.store("a", "UA")
+    assert reader.get("UA") is not None
+
+    writer.store("b", "UA")
+    stats = 0
+    original_reload = ClearanceCache.reload
+
+    def counting_reload(self):
+        nonlocal stats
+        stats += 1
+        original_reload(self)
+
+    monkeypatch.setattr(ClearanceCache, "reload", counting_reload)
+    clearance = reader.get("UA")
+    assert clearance is not None
+    assert clearance.value == "a"  # the file is not checked again within the interval
+    assert stats == 0
+
+    reader.checked -= 60
+    clearance = reader.get("UA")
+    assert clearance is not None
+    assert clearance.value == "b"
+    assert stats == 1
+
+
+def test_clearance_cache_expiry(tmp_path):
+    cache = ClearanceCache(tmp_path / "clearance.json")
+    cache.store("old", "UA", time.time() - 1)  # unknown or past expiry uses the default
+    clearance = cache.get("UA")
+    assert clearance is not None
+    assert clearance.expires > time.time()
+
+    clearance.expires = time.time() - 1
+    assert cache.get("UA") is None
+
+
+def test_clearance_applies_to_v2ph_hosts():
+    assert ClearanceCache.applies_to("https://www.v2ph.com/album/a")
+    assert ClearanceCache.applies_to("https://cdn.v2ph.com/photos/a.jpg")
+    assert not ClearanceCache.applies_to("https://notv2ph.com/a.jpg")
+    assert not ClearanceCache.applies_to("http://127.0.0.1:8000/a.jpg")
+
+
+def test_clearance_lookups_counted_by_source(tmp_path):
+    cache = ClearanceCache(tmp_path / "clearance.json")
+    cache.store("a", "UA")
+    before = dict(metrics.CLEARANCE_CACHE.values)
+    cache.get("UA")
+    cache.get(source="image")
+    cache.get(source="image")
+
+    def delta(result, source):
+        key = (result, source)
+        return metrics.CLEARANCE_CACHE.values.get(key, 0) - before.get(key, 0)
+
+    assert (delta("hit", "page"), delta("hit", "image")) == (1, 2)
@@ -37,6 +37,8 @@ def test_parse_arguments(mock_parse_args):
         min_scroll=50,
         chrome_args="",
         input_file=None,
+        url_file=None,
+        watch=False,
         destination=None,
         directory=None,
         force=False,
@@ -51,3 +53,10 @@ def test_parse_arguments(mock_parse_args):
     assert args.language == "en"
     assert args.max_scroll == 100
     assert args.min_scroll == 50
+
+
+def test_watch_requires_input_file(tmp_path):
+    with pytest.raises(SystemExit):
+        parse_arguments(["http://example.com", "--watch"])
+    args = parse_arguments(["-i", str(tmp_path / "urls.txt"), "--watch"])
+    assert args.watch
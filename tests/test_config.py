@@ -19,20 +19,40 @@ def default_args():
         language=None,
         chrome_args=None,
         no_metadata=False,
+        metadata_jsonl=False,
         force_download=False,
+        no_resume=False,
+        plan_albums=False,
         terminate=False,
+        dry_run=False,
         use_default_chrome_profile=False,
         log_level="INFO",
         min_scroll_distance=800,
         max_scroll_distance=1000,
         max_worker=4,
+        shards=None,
+        watch=False,
+        sync_interval=None,
+        min_free_space=None,
+        verify_mode=None,
         rate_limit=1.0,
         page_range=None,
+        metrics_address=None,
         cookies_path=None,
         destination=None,
         metadata_path=None,
+        manifest_path=None,
+        metrics_textfile=None,
+        trace_path=None,
+        profile_dir=None,
+        profile_mode="sample",
         url="https://example.com",
         url_file=None,
+        manifest_file=None,
+        serve=None,
+        subscribe=None,
+        unsubscribe=None,
+        sync=False,
     )
 
 
@@ -67,6 +87,11 @@ def mock_dependencies():
     [
         # Test force_download flag
         ({"force_download": True}, {"static_config": {"force_download": True}}),
+        # Test no_resume flag, independent of force_download
+        (
+            {"no_resume": True},
+            {"static_config": {"resume": False, "force_download": False}},
+        ),
         # Test bot_type
         ({"bot_type": "custom_bot"}, {"static_config": {"bot_type": "custom_bot"}}),
         # Test scroll distance adjustment
@@ -0,0 +1,120 @@
+import logging
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+
+from v2dl.common.clearance import ClearanceCache
+from v2dl.web_bot.base import BaseBot
+from v2dl.web_bot.http_bot import HttpBot
+
+ALBUM_PAGE = "<html><a href='https://www.v2ph.com/'>v2ph</a></html>"
+CHALLENGE_PAGE = "<html><title>Just a moment...</title></html>"
+
+
+class FakePool:
+    def __init__(self, handler):
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        self.clearance = ClearanceCache(None)
+
+    def get(self):
+        return self.client
+
+
+@pytest.fixture
+def config():
+    return SimpleNamespace(
+        static_config=SimpleNamespace(terminate=False, custom_user_agent="", page_concurrency=4),
+        runtime_config=SimpleNamespace(logger=logging.getLogger("test")),
+    )
+
+
+def make_bot(config, handler, fallback=None):
+    account_manager = MagicMock()
+    account_manager.lease.return_value = "account"
+    account_manager.read.return_value = {"cookies": ""}
+    return HttpBot(config, MagicMock(), account_manager, FakePool(handler), fallback)
+
+
+async def test_http_bot_fetches_without_browser(config):
+    fallback = MagicMock()
+    bot = make_bot(config, lambda request: httpx.Response(200, text=ALBUM_PAGE), fallback)
+
+    assert await bot.auto_page_scroll("https://www.v2ph.com/album/a") == ALBUM_PAGE
+    fallback.assert_not_called()
+
+
+async def test_http_bot_hands_off_to_browser(config):
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("Cookie"))
+        if "cf_clearance=ok" in (request.headers.get("Cookie") or ""):
+            return httpx.Response(200, text=ALBUM_PAGE)
+        return httpx.Response(403, text=CHALLENGE_PAGE, headers={"cf-mitigated": "challenge"})
+
+    browser = MagicMock()
+    browser.account = "account"
+    browser.auto_page_scroll = AsyncMock(return_value=ALBUM_PAGE)
+    browser.export_session.return_value = ({"cf_clearance": "ok"}, "Browser UA")
+    factory = MagicMock(return_value=browser)
+    bot = make_bot(config, handler, factory)
+
+    assert await bot.auto_page_scroll("https://www.v2ph.com/album/a?page=1") == ALBUM_PAGE
+    assert await bot.auto_page_scroll("https://www.v2ph.com/album/a?page=2") == ALBUM_PAGE
+
+    factory.assert_called_once_with(bot)
+    browser.auto_page_scroll.assert_awaited_once()
+    assert seen == [None, "cf_clearance=ok"]
+    assert bot.user_agent == "Browser UA"
+    clearance = bot.clearance.get()
+    assert clearance is not None
+    assert (clearance.value, clearance.user_agent) == ("ok", "Browser UA")
+
+
+def test_fallback_shares_the_http_bot_lease(config):
+    class Browser(BaseBot):
+        def init_driver(self):
+            pass
+
+        def close_driver(self):
+            pass
+
+        def logout(self):
+            pass
+
+    bot = make_bot(config, lambda request: httpx.Response(200, text=ALBUM_PAGE))
+    account_manager = bot.account_manager
+    browser = Browser(config, MagicMock(), account_manager, bot)
+
+    assert browser.account == "account"
+    account_manager.lease.assert_called_once_with(bot)
+    # switching account on the read limit renews the lease of the http bot
+    browser.rotate_account()
+    assert account_manager.lease.call_args_list[-1].args == (bot,)
+
+
+async def test_http_bot_uses_cached_clearance(config):
+    seen = []
+
+    def handler(request):
+        seen.append((request.headers.get("Cookie"), request.headers["User-Agent"]))
+        if len(seen) == 1:
+            return httpx.Response(200, text=ALBUM_PAGE)
+        return httpx.Response(403, text=CHALLENGE_PAGE, headers={"cf-mitigated": "challenge"})
+
+    bot = make_bot(config, handler)
+    bot.clearance.store("cached", "Cached UA")
+
+    assert await bot.auto_page_scroll("https://www.v2ph.com/album/a?page=1") == ALBUM_PAGE
+    assert seen == [("cf_clearance=cached", "Cached UA")]
+
+    # a clearance Cloudflare no longer accepts is removed from the cache
+    await bot.auto_page_scroll("https://www.v2ph.com/album/a?page=2")
+    assert bot.clearance.get() is None
+
+
+async def test_http_bot_without_fallback_reports_failure(config):
+    bot = make_bot(config, lambda request: httpx.Response(200, text=CHALLENGE_PAGE))
+    assert (await bot.auto_page_scroll("https://www.v2ph.com/album/a")).startswith("Failed")
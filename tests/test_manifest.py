@@ -0,0 +1,42 @@
+from pathlib import Path
+
+from v2dl.scraper.manifest import ManifestRecord, ManifestWriter, group_by_album, read_manifest
+
+ALBUM_1 = "https://www.v2ph.com/album/foo"
+ALBUM_2 = "https://www.v2ph.com/album/bar"
+
+
+def test_manifest_roundtrip(tmp_path):
+    manifest_path = tmp_path / "sub" / "manifest.jsonl"
+    records = [
+        ManifestRecord(ALBUM_1, "相簿 foo", "001", "https://cdn.v2ph.com/1.jpg"),
+        ManifestRecord(ALBUM_1, "相簿 foo", "002", "https://cdn.v2ph.com/2.jpg"),
+        ManifestRecord(ALBUM_2, "bar", "001", "https://cdn.v2ph.com/3.jpg"),
+    ]
+
+    writer = ManifestWriter(manifest_path)
+    writer.write(records[:2])
+    writer.write([])
+    writer.write(records[2:])
+
+    assert list(read_manifest(manifest_path)) == records
+
+    groups = list(group_by_album(read_manifest(manifest_path)))
+    assert [url for url, _ in groups] == [ALBUM_1, ALBUM_2]
+    assert groups[0][1] == records[:2]
+
+
+def test_group_interleaved_albums():
+    records = [
+        ManifestRecord(ALBUM_1, "foo", "001", "https://cdn.v2ph.com/1.jpg"),
+        ManifestRecord(ALBUM_2, "bar", "001", "https://cdn.v2ph.com/3.jpg"),
+        ManifestRecord(ALBUM_1, "foo", "002", "https://cdn.v2ph.com/2.jpg"),
+    ]
+    groups = list(group_by_album(records))
+    assert groups == [(ALBUM_1, [records[0], records[2]]), (ALBUM_2, [records[1]])]
+
+
+def test_manifest_dest_follows_download_root(tmp_path):
+    record = ManifestRecord(ALBUM_1, "foo", "003", "https://cdn.v2ph.com/3.jpg")
+    assert record.get_dest(tmp_path) == tmp_path / "foo" / "003"
+    assert record.get_dest("/other") == Path("/other") / "foo" / "003"
@@ -0,0 +1,65 @@
+import asyncio
+import logging
+
+import pytest
+
+from v2dl.common.metrics import Counter, Gauge, Histogram, MetricsExporter, Registry
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+def test_render_exposition_format(registry):
+    downloads = Counter("test_downloads_total", "Downloads.", ("result",), registry)
+    in_flight = Gauge("test_in_flight", "In flight.", registry=registry)
+    seconds = Histogram("test_seconds", "Seconds.", registry=registry, buckets=(0.1, 1.0))
+
+    downloads.inc(result="ok")
+    downloads.inc(2, result="ok")
+    downloads.inc(result='fa"il')
+    in_flight.inc()
+    in_flight.dec()
+    seconds.observe(0.05)
+    seconds.observe(0.5)
+    seconds.observe(5)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE test_downloads_total counter" in lines
+    assert 'test_downloads_total{result="ok"} 3' in lines
+    assert 'test_downloads_total{result="fa\\"il"} 1' in lines
+    assert "test_in_flight 0" in lines
+    assert 'test_seconds_bucket{le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{le="1"} 2' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 3' in lines
+    assert "test_seconds_sum 5.55" in lines
+    assert "test_seconds_count 3" in lines
+
+    with pytest.raises(ValueError):
+        downloads.inc(stage="page")
+    with pytest.raises(ValueError):
+        Counter("test_downloads_total", "Duplicate.", registry=registry)
+
+
+async def test_exporter_endpoint_and_textfile(registry, tmp_path):
+    Counter("test_pages_total", "Pages.", registry=registry).inc()
+    textfile = tmp_path / "v2dl.prom"
+    exporter = MetricsExporter(
+        logging.getLogger("test"), "127.0.0.1:0", str(textfile), registry=registry
+    )
+    await exporter.start()
+    try:
+        assert exporter.server is not None
+        port = exporter.server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+    finally:
+        await exporter.stop()
+
+    assert response.startswith(b"HTTP/1.1 200 OK")
+    assert b"test_pages_total 1" in response
+    assert "test_pages_total 1" in textfile.read_text(encoding="utf-8")
+    assert list(tmp_path.iterdir()) == [textfile]
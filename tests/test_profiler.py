@@ -0,0 +1,47 @@
+import time
+import asyncio
+import logging
+
+import pytest
+
+from v2dl.common.profiler import Profiler
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def workload():
+    await asyncio.sleep(0.06)
+    busy_wait(0.15)  # blocks the loop, reported as lag and as a slow callback
+    await asyncio.sleep(0.06)
+
+
+@pytest.mark.parametrize("mode", ["sample", "cprofile"])
+async def test_profiler_reports(mode, tmp_path):
+    profiler = Profiler(tmp_path, logging.getLogger("test"), mode, slow_callback=0.1)
+    await profiler.start()
+    await workload()
+    await profiler.stop()
+
+    report = (tmp_path / "profile.txt").read_text(encoding="utf-8")
+    assert f"mode {mode}" in report
+    assert "slow callbacks (> 100 ms): 1" in report
+    assert "busy_wait" in report
+    assert profiler.monitor.lags and max(profiler.monitor.lags) > 0.05
+    assert not asyncio.get_running_loop().get_debug()
+
+    if mode == "sample":
+        collapsed = (tmp_path / "profile.collapsed").read_text(encoding="utf-8")
+        line = next(line for line in collapsed.splitlines() if "busy_wait" in line)
+        assert "workload (test_profiler.py);busy_wait (test_profiler.py)" in line
+        assert int(line.rsplit(" ", 1)[1]) > 0
+    else:
+        assert (tmp_path / "profile.prof").stat().st_size > 0
+
+
+def test_unknown_mode(tmp_path):
+    with pytest.raises(ValueError):
+        Profiler(tmp_path, logging.getLogger("test"), "pyinstrument")
@@ -1,17 +1,24 @@
 import os
+import json
 import atexit
 
 # os.environ["GITHUB_ACTIONS"] = "true"
 import shutil
 import asyncio
 import logging
+import argparse
 from pathlib import Path
-from unittest.mock import MagicMock
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
-from v2dl.common.const import VALID_EXTENSIONS
-from v2dl.scraper import DownloadStatus, LogKey, ScrapeManager, UrlHandler
+from v2dl.common.const import IMAGE_PER_PAGE, VALID_EXTENSIONS
+from v2dl.common.error import ScrapeError
+from v2dl.scraper import AlbumUrl, DownloadStatus, LogKey, ScrapeManager, UrlHandler
+from v2dl.scraper.planner import AlbumPlanner, ScrapeProgress
+from v2dl.scraper.shard import ShardCoordinator, get_shard_index, partition_urls
+from v2dl.scraper.tools import AlbumTracker, MetadataHandler, UrlFileReader, UrlPreprocessor
 
 TEST_ALBUM_URL = "http://example.com/album"
 
@@ -79,6 +86,13 @@ def mock_runtime_config():
 def mock_config(tmp_path):
     config = MagicMock()
     config.static_config.max_worker = 5
+    config.static_config.writer_threads = 2
+    config.static_config.download_segments = 4
+    config.static_config.verify_mode = "header"
+    config.static_config.verify_workers = 1
+    config.static_config.quarantine_dir = str(tmp_path / "quarantine")
+    config.static_config.json_backend = "auto"
+    config.static_config.state_dir = str(tmp_path / "state")
     config.paths.download_log_path = tmp_path / "mock_log_path"
     return config
 
@@ -88,6 +102,7 @@ def mock_web_bot():
     web_bot = MagicMock()
     web_bot.close_driver = MagicMock()
     web_bot.auto_page_scroll = MagicMock(return_value="<html></html>")
+    web_bot.page_concurrency = 1
     return web_bot
 
 
@@ -130,3 +145,354 @@ def test_log_final_status(real_scrape_manager):
     real_scrape_manager.logger.info.assert_any_call(f"{url1}: Download successful")
     real_scrape_manager.logger.error.assert_called_once_with(f"{url2}: Unexpected error")
     real_scrape_manager.logger.warning.assert_called_once_with(f"{url3}: VIP images found")
+
+
+def test_mark_processed_urls(tmp_path):
+    test_file = tmp_path / "input_urls.txt"
+    test_file.write_text(f"{TEST_ALBUM_URL}1\n{TEST_ALBUM_URL}2\n{TEST_ALBUM_URL}3\n")
+
+    UrlHandler.mark_processed_urls(
+        str(test_file), [TEST_ALBUM_URL + "1?page=2", TEST_ALBUM_URL + "3"]
+    )
+
+    assert test_file.read_text() == f"# {TEST_ALBUM_URL}1\n{TEST_ALBUM_URL}2\n# {TEST_ALBUM_URL}3\n"
+    assert UrlHandler.load_urls(url="", url_file=str(test_file)) == [TEST_ALBUM_URL + "2"]
+
+
+def test_album_url():
+    url = f"{TEST_ALBUM_URL}1?q=a+b&q=c&page=3#top"
+    album_url = AlbumUrl.parse(url)
+    assert AlbumUrl.parse(url) is album_url
+    assert album_url.key == f"{TEST_ALBUM_URL}1#top"
+    assert album_url.page == 3
+    assert album_url.language is None
+    assert album_url.path_parts == ("", "album1")
+
+    assert UrlHandler.add_page_num(url, 4) == f"{TEST_ALBUM_URL}1?q=a+b&q=c&page=4#top"
+    assert UrlHandler.remove_page_num(url) == f"{TEST_ALBUM_URL}1?q=a+b&q=c#top"
+    assert UrlHandler.update_language(url, "ja") == f"{TEST_ALBUM_URL}1?q=a+b&q=c&page=3&hl=ja#top"
+    assert UrlHandler.parse_input_url(TEST_ALBUM_URL) == (["", "album"], 1)
+
+
+def test_normalize_urls():
+    urls = [
+        f"{TEST_ALBUM_URL}1",
+        f"{TEST_ALBUM_URL}2?hl=zh-Hant",
+        f"{TEST_ALBUM_URL}1",
+        f"{TEST_ALBUM_URL}2?hl=en",
+        f"{TEST_ALBUM_URL}1?page=2",
+    ]
+    assert AlbumUrl.normalize_many(urls, "ja") == [
+        f"{TEST_ALBUM_URL}1?hl=ja",
+        f"{TEST_ALBUM_URL}2?hl=ja",
+        f"{TEST_ALBUM_URL}1?page=2&hl=ja",
+    ]
+    assert AlbumUrl.normalize_many(urls) == [urls[0], urls[1], urls[3], urls[4]]
+
+
+def test_url_preprocessor(tmp_path):
+    base = "https://www.v2ph.com"
+    log_path = tmp_path / "downloaded_albums.txt"
+    log_path.write_text(f"{base}/album/done\n")
+    tracker = AlbumTracker(str(log_path))
+    url_file = tmp_path / "urls.txt"
+    url_file.write_text(
+        f"{base}/album/a?hl=en\n"
+        f"{base}/album/a\n"
+        f"{base}/album/a?page=2\n"
+        "# a comment\n"
+        f"{base}/album/done?hl=zh-Hant\n"
+        f"{base}/actor/b\n"
+        f"{base}/unknown/c\n"
+        f"{base}/actor/b?page=3\n"
+    )
+
+    preprocessor = UrlPreprocessor(tracker, logging.getLogger("test"), "ja")
+    urls = list(preprocessor.process(UrlHandler.iter_urls(str(url_file))))
+
+    assert urls == [f"{base}/album/a?hl=ja", f"{base}/actor/b?hl=ja"]
+    assert preprocessor.dropped == {"duplicate": 3, "downloaded": 1, "unsupported": 1}
+
+    done_url = f"{base}/album/done?hl=zh-Hant"
+    keep_downloaded = UrlPreprocessor(tracker, logging.getLogger("test"), skip_downloaded=False)
+    assert list(keep_downloaded.process([done_url])) == [done_url]
+
+
+def test_url_preprocessor_keeps_earlier_pages():
+    album = "https://www.v2ph.com/album/a"
+    preprocessor = UrlPreprocessor(MagicMock(index=set()), logging.getLogger("test"))
+    urls = [f"{album}?page=5", album, f"{album}?page=3", f"{album}?hl=en"]
+
+    # the full album comes after a page variant, it must not be dropped
+    assert list(preprocessor.process(urls)) == [f"{album}?page=5", album]
+    assert preprocessor.dropped == {"duplicate": 2}
+
+
+def test_album_tracker_index(tmp_path):
+    log_path = tmp_path / "downloaded_albums.txt"
+    tracker = AlbumTracker(str(log_path))
+    assert not tracker.is_downloaded(TEST_ALBUM_URL + "1")
+
+    tracker.log_downloaded(TEST_ALBUM_URL + "1?page=2")
+    with log_path.open("a") as f:
+        f.write(f"{TEST_ALBUM_URL}2\n{TEST_ALBUM_URL}3")  # another shard is still writing
+
+    assert tracker.is_downloaded(TEST_ALBUM_URL + "1?hl=ja")
+    assert tracker.is_downloaded(TEST_ALBUM_URL + "2")
+    assert not tracker.is_downloaded(TEST_ALBUM_URL + "3")
+    with log_path.open("a") as f:
+        f.write("\n")
+    assert tracker.is_downloaded(TEST_ALBUM_URL + "3")
+
+    log_path.write_text(f"{TEST_ALBUM_URL}4\n")
+    assert not tracker.is_downloaded(TEST_ALBUM_URL + "1")
+    assert tracker.is_downloaded(TEST_ALBUM_URL + "4")
+
+
+def test_url_file_reader(tmp_path):
+    logger = logging.getLogger("test")
+    url_file = tmp_path / "urls.txt"
+    url_file.write_text(f"{TEST_ALBUM_URL}1\n\n# done\n{TEST_ALBUM_URL}2\n")
+    state_dir = str(tmp_path / "state")
+
+    reader = UrlFileReader(str(url_file), logger, state_dir)
+    urls = iter(reader)
+    assert next(urls) == TEST_ALBUM_URL + "1"
+    reader.commit()
+    with url_file.open("a") as f:
+        f.write(f"{TEST_ALBUM_URL}3")  # appended while running, without a final newline
+    assert list(urls) == [TEST_ALBUM_URL + "2", TEST_ALBUM_URL + "3"]
+
+    # interrupted after the first URL
+    assert list(UrlFileReader(str(url_file), logger, state_dir)) == [
+        TEST_ALBUM_URL + "2",
+        TEST_ALBUM_URL + "3",
+    ]
+    reader.commit()
+    assert list(UrlFileReader(str(url_file), logger, state_dir)) == []
+    assert len(list(UrlFileReader(str(url_file), logger, state_dir, resume=False))) == 3
+
+    url_file.write_text(f"{TEST_ALBUM_URL}4\n{TEST_ALBUM_URL}5\n{TEST_ALBUM_URL}6\n")
+    assert len(list(UrlFileReader(str(url_file), logger, state_dir))) == 3
+
+
+async def test_scrape_url_file(real_scrape_manager, mock_config, tmp_path):
+    mock_config.static_config.language = "ja"
+    mock_config.static_config.force_download = False
+    album = "https://www.v2ph.com/album/"
+    url_file = tmp_path / "urls.txt"
+    url_file.write_text(f"{album}1\n{album}2\n{album}1?page=2\n")
+    real_scrape_manager.runtime_config.url_file = str(url_file)
+    real_scrape_manager.runtime_config.manifest_file = None
+    real_scrape_manager.scrape_url = AsyncMock(side_effect=[None, ScrapeError("stop")])
+
+    assert not await real_scrape_manager.start_scraping()
+    real_scrape_manager.scrape_url = AsyncMock()
+    with url_file.open("a") as f:
+        f.write(f"{album}3\n")
+    assert await real_scrape_manager.start_scraping()
+
+    scraped = [call.args[0] for call in real_scrape_manager.scrape_url.await_args_list]
+    assert scraped == [
+        album + "2?hl=ja",
+        album + "1?page=2&hl=ja",  # the download log drops it in a real run
+        album + "3?hl=ja",
+    ]
+    assert url_file.read_text().count("#") == 0  # the file is never rewritten
+    assert not await real_scrape_manager.start_scraping()
+
+    # --no-resume reads the file from the start, --force does not
+    mock_config.static_config.force_download = True
+    assert not await real_scrape_manager.start_scraping()
+    mock_config.static_config.resume = False
+    assert await real_scrape_manager.start_scraping()
+    assert real_scrape_manager.scrape_url.await_count == 6
+
+
+def test_partition_urls():
+    urls = [f"{TEST_ALBUM_URL}{i}" for i in range(50)]
+    partitions = partition_urls(urls, 4)
+
+    assert sorted(url for part in partitions for url in part) == sorted(urls)
+    # language and page variants of the same album land on the same shard
+    for url in urls:
+        index = get_shard_index(url, 4)
+        assert url in partitions[index]
+        assert get_shard_index(url + "?hl=ja&page=3", 4) == index
+
+
+def test_shard_workers_do_not_export(tmp_path, mock_config, real_scrape_manager):
+    mock_config.static_config.shards = 2
+    mock_config.static_config.chrome_profile_path = str(tmp_path / "profile")
+    mock_config.static_config.chrome_port = 9222
+    args = argparse.Namespace(
+        url=None,
+        url_file=str(tmp_path / "urls.txt"),
+        shards=2,
+        metrics_address="127.0.0.1:9108",
+        metrics_textfile=str(tmp_path / "v2dl.prom"),
+        trace_path=str(tmp_path / "trace.json"),
+        profile_dir=str(tmp_path / "profile"),
+    )
+    coordinator = ShardCoordinator(mock_config, args, real_scrape_manager)
+    spec = coordinator.prepare_shard(1, [f"{TEST_ALBUM_URL}1"], tmp_path)
+
+    assert spec.args.url_file == str(tmp_path / "shard_1.txt")
+    assert spec.args.metrics_address is None
+    assert spec.args.metrics_textfile is None
+    assert spec.args.trace_path is None
+    assert spec.args.profile_dir is None
+    assert args.metrics_address == "127.0.0.1:9108"  # the coordinator keeps exporting
+
+
+def test_album_planner(tmp_path):
+    planner = AlbumPlanner.from_state_dir(str(tmp_path))
+    planner.record(f"{TEST_ALBUM_URL}1?hl=ja&page=3", 2, 45)
+    planner.record(f"{TEST_ALBUM_URL}2", 5)  # scraped with a page range
+    planner.save()
+
+    # another shard records its album into the same plan
+    other = AlbumPlanner.from_state_dir(str(tmp_path))
+    other.record(f"{TEST_ALBUM_URL}3", 1, 3)
+    other.save()
+
+    planner = AlbumPlanner.from_state_dir(str(tmp_path))
+    assert planner.estimate(f"{TEST_ALBUM_URL}1") == 45
+    assert planner.estimate(f"{TEST_ALBUM_URL}2?hl=en") == 5 * IMAGE_PER_PAGE
+    assert planner.estimate(f"{TEST_ALBUM_URL}unknown") == (45 + 5 * IMAGE_PER_PAGE + 3) / 3
+
+    urls = [f"{TEST_ALBUM_URL}{i}" for i in (3, 1, "x", 2)]
+    assert planner.order(urls) == [urls[3], urls[1], urls[2], urls[0]]
+
+
+def test_partition_urls_by_size():
+    sizes = {f"{TEST_ALBUM_URL}{i}": size for i, size in enumerate([70, 50, 40, 30, 20, 10])}
+    urls = list(sizes)
+    partitions = partition_urls([*urls, urls[0] + "?page=2"], 2, lambda url: sizes.get(url, 0))
+
+    loads = [sum(sizes.get(url, 0) for url in part) for part in partitions]
+    assert loads == [110, 110]
+    assert urls[0] + "?page=2" in partitions[0]
+    # each shard starts with its biggest album
+    assert partitions[1][0] == urls[1]
+
+
+async def test_plan_albums(real_scrape_manager, mock_config, mock_web_bot):
+    mock_config.static_config.plan_albums = True
+    mock_config.static_config.force_download = False
+    pagination = "".join(
+        f'<li class="page-item"><a class="page-link" href="?page={i}">{i}</a></li>'
+        for i in (1, 2, 3)
+    )
+    photos = '<div class="album-photo"><img src="a.jpg" alt="a 1"></div>' * 2
+    pages = {
+        f"{TEST_ALBUM_URL}1?page=1": f"<html><body><ul>{pagination}</ul></body></html>",
+        f"{TEST_ALBUM_URL}2?page=1": f"<html><body>{photos}</body></html>",
+    }
+    mock_web_bot.auto_page_scroll = AsyncMock(side_effect=lambda url, page_sleep: pages[url])
+    real_scrape_manager.planner.record(f"{TEST_ALBUM_URL}3", 2)
+    real_scrape_manager.scrape_album = AsyncMock()
+    real_scrape_manager.update_runtime_config = MagicMock()
+
+    await real_scrape_manager.scrape_albums([f"{TEST_ALBUM_URL}{i}" for i in (2, 3, 1)])
+
+    # only the albums missing from the plan are loaded
+    assert mock_web_bot.auto_page_scroll.await_count == 2
+    assert real_scrape_manager.planner.albums[f"{TEST_ALBUM_URL}2"] == {"max_page": 1, "images": 2}
+    scraped = [call.args[0] for call in real_scrape_manager.scrape_album.await_args_list]
+    assert scraped == [f"{TEST_ALBUM_URL}{i}" for i in (1, 3, 2)]
+    assert AlbumPlanner.from_state_dir(mock_config.static_config.state_dir).is_recorded(
+        f"{TEST_ALBUM_URL}1"
+    )
+
+
+async def test_copy_body_pays_the_limiter_per_chunk(real_scrape_manager):
+    async def aiter_bytes():
+        for _ in range(10):
+            yield b"x" * 300
+
+    response = SimpleNamespace(aiter_bytes=aiter_bytes)
+    f = SimpleNamespace(buffer_size=1000, write=AsyncMock())
+    limiter = SimpleNamespace(consume=AsyncMock())
+    strategy = real_scrape_manager.strategies["album_image"]
+
+    assert await strategy.copy_body(response, f, limiter) == 3000
+    assert f.write.await_count == 10
+    assert [call.args[0] for call in limiter.consume.await_args_list] == [1200, 1200, 600]
+
+    limiter.consume.reset_mock()
+    assert await strategy.copy_body(response, f, limiter, limit=1000) == 1000
+    assert [call.args[0] for call in limiter.consume.await_args_list] == [1000]
+
+
+def test_shard_partition_uses_the_plan(mock_config, real_scrape_manager):
+    mock_config.static_config.shards = 2
+    coordinator = ShardCoordinator(mock_config, argparse.Namespace(), real_scrape_manager)
+    urls = [f"{TEST_ALBUM_URL}{i}" for i in range(6)]
+    # nothing planned yet, the URLs are split by hash
+    assert coordinator.partition(urls) == partition_urls(urls, 2)
+
+    for i, url in enumerate(urls):
+        real_scrape_manager.planner.record(url, 1, 10 * (i + 1))
+    loads = [
+        sum(real_scrape_manager.planner.estimate(url) for url in part)
+        for part in coordinator.partition(urls)
+    ]
+    assert loads == [110, 100]
+
+
+def test_scrape_progress_eta(caplog):
+    progress = ScrapeProgress(logging.getLogger("test"), [30.0, 10.0])
+    progress.started -= 6
+    with caplog.at_level(logging.INFO):
+        progress.advance(20.0)  # the real size replaces the estimate
+    assert progress.total == 30
+    assert 2.9 < progress.eta() < 3.5
+    assert "Progress 1/2, about 67% of the estimated images, ETA 3s" in caplog.text
+
+
+def test_metadata_journal_and_compaction(tmp_path):
+    metadata_path = tmp_path / "metadata.json"
+    static_config = SimpleNamespace(
+        no_metadata=False,
+        compact_metadata=True,
+        json_backend="auto",
+        metadata_path=str(metadata_path),
+    )
+    config = SimpleNamespace(
+        static_config=static_config,
+        runtime_config=SimpleNamespace(logger=logging.getLogger("test")),
+    )
+    tracker = AlbumTracker(str(tmp_path / "downloaded.txt"))
+    handler = MetadataHandler(config, tracker)
+
+    tracker.update_download_log("https://www.v2ph.com/album/a?page=2", {"expect_num": 3})
+    tracker.add_real_num("https://www.v2ph.com/album/a", 2)
+    tracker.add_real_num("https://www.v2ph.com/album/a", 1)
+    handler.handle_event("album_done", {"url": "https://www.v2ph.com/album/a"})
+
+    journal = [json.loads(line) for line in handler.journal_path.read_text().splitlines()]
+    assert journal == [
+        {
+            "url": "https://www.v2ph.com/album/a",
+            "status": "OK",
+            "dest": "",
+            "expect_num": 3,
+            "real_num": 3,
+        }
+    ]
+    # journaled albums leave memory, only their final status stays
+    assert tracker.download_status == {}
+    assert tracker.get_final_status("https://www.v2ph.com/album/a") == DownloadStatus.OK
+
+    # an album without album_done is flushed at exit
+    tracker.update_download_log("https://www.v2ph.com/album/b", {"status": DownloadStatus.VIP})
+    handler.write_metadata()
+
+    assert not handler.journal_path.exists()
+    # the legacy layout is indented by four spaces with every backend
+    assert metadata_path.read_text().startswith('{\n    "https://www.v2ph.com/album/a": {\n')
+    metadata = json.loads(metadata_path.read_text())
+    assert metadata["https://www.v2ph.com/album/a"]["real_num"] == 3
+    assert metadata["https://www.v2ph.com/album/b"]["status"] == "VIP"
+    assert tracker.get_final_status("https://www.v2ph.com/album/b") == DownloadStatus.VIP
@@ -4,12 +4,12 @@ import base64
 import shutil
 import logging
 import secrets
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytest
 from nacl.public import PrivateKey
 
-from v2dl.common import EncryptionConfig, SecurityError
+from v2dl.common import AccountError, EncryptionConfig, SecurityError
 from v2dl.security import AccountManager, Encryptor, KeyManager
 
 
@@ -163,3 +163,120 @@ def test_verify_password(account_manager: AccountManager):
 
     assert account_manager.verify_password(username, password, private_key) is True
     assert account_manager.verify_password(username, "wrong_password", private_key) is False
+
+
+def test_lease_round_robin_by_quota(account_manager: AccountManager):
+    for username in ("a", "b", "c"):
+        account_manager.create_cli_account(username, {})
+
+    first = account_manager.lease("bot1")
+    second = account_manager.lease("bot2")
+    assert first != second  # leased accounts are not shared while others are free
+
+    account_manager.record_read(first)
+    account_manager.record_read(second)
+    third = account_manager.lease("bot3")
+    assert third not in (first, second)
+    assert account_manager.remaining_quota(third) == AccountManager.MAX_QUOTA
+
+    # bot1 releases its account and takes the least recently used one of the most quota
+    for _ in range(3):
+        account_manager.record_read(third)
+    assert account_manager.lease("bot1") == first
+
+
+def test_lease_skips_exhausted_accounts(account_manager: AccountManager):
+    account_manager.create_cli_account("a", {})
+    account_manager.create_cli_account("b", {})
+
+    for _ in range(AccountManager.MAX_QUOTA):
+        account_manager.record_read("a")
+    assert not account_manager.is_available("a")
+    assert account_manager.lease("bot") == "b"
+
+    account_manager.mark_exhausted("b")
+    reset_at = account_manager.quota_reset_at("b")
+    assert reset_at is not None
+    assert reset_at - datetime.now() > AccountManager.QUOTA_RESET - timedelta(minutes=1)
+    # the forecast only ranks accounts, "a" never saw the read limit page
+    assert account_manager.is_available("a")
+    assert account_manager.lease("bot") == "a"
+
+    account_manager.mark_exhausted("a")
+    with pytest.raises(AccountError):
+        account_manager.lease("bot")
+
+
+def test_lease_falls_back_to_least_used_account(account_manager: AccountManager):
+    account_manager.create_cli_account("a", {})
+    account_manager.create_cli_account("b", {})
+    for _ in range(AccountManager.MAX_QUOTA + 2):
+        account_manager.record_read("a")
+    for _ in range(AccountManager.MAX_QUOTA):
+        account_manager.record_read("b")
+
+    assert account_manager.lease("bot") == "b"
+    assert account_manager.is_available("a")
+
+
+def test_exceeded_account_without_time_stays_ineligible(account_manager: AccountManager):
+    account_manager.create_cli_account("a", {})
+    account_manager.update_runtime_state("a", "exceed_quota", True)
+    account_manager.update_cli_account("a", "exceed_time", "not a time")
+
+    assert account_manager.quota_reset_at("a") == datetime.max
+    assert not account_manager.is_available("a")
+    with pytest.raises(AccountError):
+        account_manager.lease("bot")
+
+
+def test_quota_reset_forecast(account_manager: AccountManager):
+    account_manager.create_cli_account("a", {})
+    account_manager.mark_exhausted("a")
+    expired = datetime.now() - AccountManager.QUOTA_RESET - timedelta(minutes=1)
+    account_manager.update_cli_account("a", "exceed_time", expired.strftime("%Y-%m-%dT%H:%M:%S"))
+
+    assert account_manager.quota_reset_at("a") is None
+    assert account_manager.read("a")["exceed_quota"] is True  # queries never write
+    assert account_manager.lease() == "a"
+    assert account_manager.read("a")["exceed_quota"] is False
+    assert account_manager.remaining_quota("a") == AccountManager.MAX_QUOTA
+
+
+def test_account_store_debounces_writes(account_manager: AccountManager, tmp_path):
+    public_key = PrivateKey.generate().public_key
+    account_manager.create("test_user", "test_password", "", public_key)
+    yaml_path = tmp_path / "accounts.yaml"
+    created = yaml_path.read_text(encoding="utf-8")
+
+    account_manager.store.delay = 60
+    account_manager.update_runtime_state("test_user", "exceed_quota", True)
+    account_manager.update_runtime_state("test_user", "cookies_valid", False)
+    assert yaml_path.read_text(encoding="utf-8") == created
+    assert account_manager.store.dirty == {"test_user"}
+
+    account_manager.finalize()
+    reloaded = AccountManager(account_manager.logger, account_manager.key_manager, str(yaml_path))
+    atexit.unregister(reloaded.finalize)
+    account = reloaded.read("test_user")
+    assert account is not None
+    assert account["exceed_quota"] is True
+    assert account["cookies_valid"] is False
+    assert sorted(p.name for p in tmp_path.iterdir() if p.name.endswith(".tmp")) == []
+
+
+def test_account_store_timer_flush(account_manager: AccountManager, tmp_path):
+    public_key = PrivateKey.generate().public_key
+    account_manager.create("test_user", "test_password", "", public_key)
+    account_manager.delete("test_user")
+    # deleting the last account is persisted too
+    assert (tmp_path / "accounts.yaml").read_text(encoding="utf-8") == "{}\n"
+
+    account_manager.create("test_user", "test_password", "", public_key)
+    account_manager.store.delay = 0.01
+    account_manager.update_account("test_user", "exceed_quota", True)
+    timer = account_manager.store.timer
+    assert timer is not None
+    timer.join()
+    assert "exceed_quota: true" in (tmp_path / "accounts.yaml").read_text(encoding="utf-8")
+    assert not account_manager.store.dirty
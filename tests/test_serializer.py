@@ -0,0 +1,37 @@
+import importlib.util
+
+import pytest
+
+from v2dl.common.serializer import BACKENDS, get_serializer
+from v2dl.scraper import DownloadStatus
+
+AVAILABLE = [name for name in BACKENDS if importlib.util.find_spec(name) is not None]
+
+
+@pytest.mark.parametrize("backend", AVAILABLE)
+def test_serializer_roundtrip(backend):
+    serializer = get_serializer(backend)
+    data = {"https://www.v2ph.com/album/a": {"status": "OK", "dest": "相簿", "real_num": 3}}
+
+    compact = serializer.dumps(data)
+    assert b"\n" not in compact
+    assert "相簿".encode() in compact
+    assert serializer.loads(compact) == data
+    assert serializer.loads(serializer.dumps(data, pretty=True)) == data
+
+    with pytest.raises(ValueError):
+        serializer.loads(b"{not json")
+
+
+@pytest.mark.parametrize("backend", AVAILABLE)
+def test_serializer_encodes_enums_alike(backend):
+    serializer = get_serializer(backend)
+    assert serializer.dumps({"status": DownloadStatus.VIP}) == b'{"status":"VIP"}'
+    # no fallback hook, other types are still rejected
+    with pytest.raises(TypeError):
+        serializer.dumps({"status": object()})
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_serializer("yaml")
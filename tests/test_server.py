@@ -0,0 +1,88 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from v2dl.server import JobScheduler, JobState
+
+
+class FakeScrapeManager:
+    def __init__(self):
+        self.config = SimpleNamespace(
+            static_config=SimpleNamespace(
+                force_download=False, page_range=None, language="ja", json_backend="auto"
+            )
+        )
+        self.logger = logging.getLogger("test")
+        self.listeners = []
+        self.scraped = []
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    async def scrape_url(self, url):
+        self.scraped.append((url, self.config.static_config.force_download))
+        await asyncio.sleep(0.05)
+        for listener in self.listeners:
+            listener("album_done", {"url": url})
+        return url
+
+
+@pytest.mark.asyncio
+async def test_scheduler_priority_and_cancel():
+    manager = FakeScrapeManager()
+    scheduler = JobScheduler(manager)
+    events = scheduler.subscribe()
+
+    low = scheduler.submit("https://www.v2ph.com/album/low")
+    cancelled = scheduler.submit("https://www.v2ph.com/album/cancelled")
+    high = scheduler.submit(
+        "https://www.v2ph.com/album/high", priority=5, options={"force_download": True}
+    )
+    scheduler.cancel(cancelled.id)
+
+    worker = asyncio.create_task(scheduler.run())
+    while not (low.is_finished and high.is_finished):
+        await asyncio.sleep(0.01)
+    worker.cancel()
+
+    assert manager.scraped == [(high.url, True), (low.url, False)]
+    assert manager.config.static_config.force_download is False
+    assert (low.state, cancelled.state, high.state) == (
+        JobState.DONE,
+        JobState.CANCELLED,
+        JobState.DONE,
+    )
+
+    album_events = []
+    while not events.empty():
+        event = events.get_nowait()
+        if event["event"] == "album_done":
+            album_events.append(event)
+    assert [e["job_id"] for e in album_events] == [high.id, low.id]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_survives_failing_job():
+    manager = FakeScrapeManager()
+    scrape_url = manager.scrape_url
+
+    async def flaky_scrape_url(url):
+        if url.endswith("broken"):
+            raise TypeError("unexpected page layout")
+        return await scrape_url(url)
+
+    manager.scrape_url = flaky_scrape_url
+    scheduler = JobScheduler(manager)
+    broken = scheduler.submit("https://www.v2ph.com/album/broken", options={"language": "en"})
+    fine = scheduler.submit("https://www.v2ph.com/album/fine")
+
+    worker = asyncio.create_task(scheduler.run())
+    while not fine.is_finished:
+        await asyncio.sleep(0.01)
+    worker.cancel()
+
+    assert (broken.state, broken.error) == (JobState.FAILED, "unexpected page layout")
+    assert fine.state == JobState.DONE
+    assert manager.config.static_config.language == "ja"
@@ -0,0 +1,119 @@
+import logging
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from v2dl.scraper.core import AlbumScraper
+from v2dl.scraper.sync import SubscriptionRegistry, SubscriptionSync
+from v2dl.scraper.tools import AlbumTracker
+
+ACTOR = "https://www.v2ph.com/actor/someone"
+PER_PAGE = 3
+
+
+class ListBot:
+    """Serve an album list, newest first, `PER_PAGE` albums per page."""
+
+    page_concurrency = 4
+
+    def __init__(self, albums):
+        self.albums = albums
+        self.fetched = []
+
+    async def auto_page_scroll(self, url, page_sleep=0):
+        self.fetched.append(url)
+        page = int(url.split("page=")[1].split("&")[0]) if "page=" in url else 1
+        start = (page - 1) * PER_PAGE
+        links = "".join(
+            f'<a class="media-cover" href="/album/{a}"></a>'
+            for a in self.albums[start : start + PER_PAGE]
+        )
+        pages = range(1, (len(self.albums) - 1) // PER_PAGE + 2)
+        pagination = "".join(
+            f'<li class="page-item"><a class="page-link" href="?page={p}">{p}</a></li>'
+            for p in pages
+        )
+        return f"<html><body>{links}<ul>{pagination}</ul></body></html>"
+
+
+@pytest.fixture
+def scrape_manager(tmp_path):
+    logger = logging.getLogger("test")
+    config = SimpleNamespace(
+        runtime_config=SimpleNamespace(logger=logger),
+        static_config=SimpleNamespace(language="ja"),
+    )
+    tracker = AlbumTracker(str(tmp_path / "downloaded.txt"))
+    bot = ListBot([f"a{i}" for i in range(7, 0, -1)])
+    return SimpleNamespace(
+        config=config,
+        logger=logger,
+        strategies={"album_list": AlbumScraper(config, tracker)},
+        get_web_bot=lambda: bot,
+        bot=bot,
+        processed_urls=set(),
+        no_log=False,
+        scrape_albums=AsyncMock(),
+    )
+
+
+def test_registry(tmp_path):
+    registry = SubscriptionRegistry.from_state_dir(str(tmp_path))
+    registry.add(f"{ACTOR}?page=3&hl=en", 3600)
+    registry.add(ACTOR, 7200)  # the same list
+    with pytest.raises(ValueError):
+        registry.add("https://www.v2ph.com/album/a1", 3600)
+
+    reloaded = SubscriptionRegistry.from_state_dir(str(tmp_path))
+    assert list(reloaded.subscriptions) == [ACTOR]
+    assert reloaded.subscriptions[ACTOR].interval == 7200
+    assert [s.url for s in reloaded.due()] == [ACTOR]
+    assert reloaded.due(now=0) == []
+
+    assert registry.remove(f"{ACTOR}?hl=zh-Hant")
+    assert not registry.remove(ACTOR)
+    assert SubscriptionRegistry.from_state_dir(str(tmp_path)).subscriptions == {}
+
+
+async def test_incremental_sync(tmp_path, scrape_manager):
+    registry = SubscriptionRegistry.from_state_dir(str(tmp_path))
+    registry.add(ACTOR, 0)
+    bot = scrape_manager.bot
+
+    # the first sync scrapes the whole list
+    await SubscriptionSync(scrape_manager, registry, 2).run()
+    albums = scrape_manager.scrape_albums.await_args.args[0]
+    assert albums == [f"https://www.v2ph.com/album/a{i}" for i in range(7, 0, -1)]
+    assert len(bot.fetched) == 3
+
+    # two new albums, only the first page is fetched
+    bot.albums[:0] = ["a9", "a8"]
+    bot.fetched.clear()
+    await SubscriptionSync(scrape_manager, registry, 2).run()
+    albums = scrape_manager.scrape_albums.await_args.args[0]
+    assert albums == ["https://www.v2ph.com/album/a9", "https://www.v2ph.com/album/a8"]
+    assert bot.fetched == [f"{ACTOR}?hl=ja&page=1"]
+
+    # nothing new, nothing scraped
+    bot.fetched.clear()
+    await SubscriptionSync(scrape_manager, registry, 2).run()
+    assert scrape_manager.scrape_albums.await_count == 2
+    assert len(bot.fetched) == 1
+
+    seen = SubscriptionRegistry.from_state_dir(str(tmp_path)).subscriptions[ACTOR].seen
+    assert seen[:3] == [
+        "https://www.v2ph.com/album/a9",
+        "https://www.v2ph.com/album/a8",
+        "https://www.v2ph.com/album/a7",
+    ]
+
+
+async def test_sync_skips_subscriptions_not_due(tmp_path, scrape_manager):
+    registry = SubscriptionRegistry.from_state_dir(str(tmp_path))
+    registry.add(ACTOR, 3600)
+    sync = SubscriptionSync(scrape_manager, registry)
+    await sync.run()
+    await sync.run()
+    assert len(scrape_manager.bot.fetched) == 3
+    scrape_manager.scrape_albums.assert_awaited_once()
@@ -0,0 +1,49 @@
+import json
+import asyncio
+
+from v2dl.common.tracing import NULL_SPAN, Tracer
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+    assert tracer.span("album", url="x") is NULL_SPAN
+    with tracer.span("album"):
+        pass
+    assert tracer.events == []
+
+
+async def test_nested_spans_export(tmp_path):
+    tracer = Tracer()
+    tracer.enable()
+
+    async def image(i):
+        with tracer.span("image", index=i):
+            await asyncio.sleep(0.01)
+
+    with tracer.span("album", url="https://www.v2ph.com/album/a"):
+        with tracer.span("page"):
+            await asyncio.gather(*(image(i) for i in range(3)))
+        # the lanes of finished tasks are reused
+        await asyncio.gather(image(3))
+
+    trace_path = tmp_path / "trace.json"
+    tracer.export(trace_path)
+    trace = json.loads(trace_path.read_text(encoding="utf-8"))
+
+    spans = {}
+    for event in trace["traceEvents"]:
+        if event["ph"] == "X":
+            spans.setdefault(event["name"], []).append(event)
+
+    album, page = spans["album"][0], spans["page"][0]
+    assert page["args"]["parent"] == "album"
+    assert page["tid"] == album["tid"]
+    assert album["ts"] <= page["ts"]
+    assert page["ts"] + page["dur"] <= album["ts"] + album["dur"]
+
+    images = spans["image"]
+    assert len(images) == 4
+    assert {event["args"]["parent"] for event in images} == {"page", "album"}
+    assert len({event["tid"] for event in images[:3]}) == 3
+    assert album["tid"] not in {event["tid"] for event in images}
+    assert tracer.lane_count == 4
@@ -1,8 +1,15 @@
 import shutil
+import asyncio
 
 import pytest
 
-from v2dl.scraper.downloader import DirectoryCache, DownloadPathTool
+from v2dl.scraper.downloader import (
+    ChunkSizer,
+    DirectoryCache,
+    DownloadPathTool,
+    RateLimiter,
+    WriterPool,
+)
 
 
 @pytest.fixture
@@ -153,3 +160,77 @@ def test_get_image_ext():
     assert DownloadPathTool.get_image_ext("doc.docx") == "jpg"
     assert DownloadPathTool.get_image_ext("example") == "jpg"
     assert DownloadPathTool.get_image_ext("") == "jpg"
+
+
+async def test_writer_pool_buffers_writes(tmp_path, monkeypatch):
+    pool = WriterPool(max_workers=2, buffer_size=10)
+    dest = tmp_path / "image.jpg"
+    writes = []
+
+    async with await pool.open(dest) as f:
+        monkeypatch.setattr(f.file, "write", lambda data: writes.append(bytes(data)) or len(data))
+        for chunk in (b"abcd", b"efgh", b"ijkl", b"mn"):
+            await f.write(chunk)
+        assert f.buffered == 2  # the first 12 bytes were handed to the writer thread
+
+    assert writes == [b"abcdefghijkl", b"mn"]
+    assert f.file.closed
+
+    with pytest.raises(RuntimeError):
+        async with await pool.open(dest) as f:
+            await f.write(b"partial")
+            raise RuntimeError
+    assert f.file.closed
+    assert dest.read_bytes() == b""
+    pool.shutdown()
+
+
+def test_chunk_sizer():
+    sizer = ChunkSizer()
+    assert sizer.choose(None) == 64 * 1024
+    assert sizer.choose(100) == 64 * 1024
+    assert sizer.choose(4 * 2**20) == 2**20
+    assert sizer.choose(600 * 1024) == 256 * 1024
+    assert sizer.choose(64 * 2**20) == 2**20
+
+    sizer.record(20 * 2**20, 1.0)  # 20 MiB/s, one window is 1 MiB
+    assert sizer.choose(None) == 2**20
+    assert sizer.choose(300 * 1024) == 512 * 1024  # capped near the file size
+
+
+async def test_rate_limiter_is_shared(monkeypatch):
+    clock = [100.0]
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(asyncio.get_running_loop(), "time", lambda: clock[0])
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+
+    limiter = RateLimiter(100)
+    # two downloads at once split the rate, the idle time before grants one second
+    await limiter.consume(100 * 1024)
+    await limiter.consume(100 * 1024)
+    assert sleeps == [1.0]
+
+    clock[0] += 60  # a long pause earns no more than the burst
+    await limiter.consume(300 * 1024)
+    assert sleeps == [1.0, 2.0]
+
+
+async def test_preallocated_file_is_truncated(tmp_path):
+    pool = WriterPool(max_workers=1)
+    dest = tmp_path / "video.mp4"
+
+    async with await pool.open(dest, preallocate=4 * 2**20) as f:
+        if f.preallocated:
+            assert dest.stat().st_size == 4 * 2**20
+        await f.write(b"short body")
+
+    assert dest.read_bytes() == b"short body"
+    pool.shutdown()
+
+
+def test_free_space(tmp_path):
+    assert DownloadPathTool.free_space(tmp_path / "not" / "yet" / "made") > 0
@@ -0,0 +1,99 @@
+import logging
+
+import pytest
+
+from v2dl.scraper.verify import FileVerifier, check_file
+
+JPEG = b"\xff\xd8\xff\xe0" + bytes(100) + b"\xff\xd9"
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(50) + b"\x00\x00\x00\x00IEND\xaeB`\x82"
+GIF = b"GIF89a" + bytes(30) + b";"
+WEBP = b"RIFF" + (20).to_bytes(4, "little") + b"WEBPVP8 " + bytes(12)
+
+
+def box(kind, payload=b""):
+    return (8 + len(payload)).to_bytes(4, "big") + kind + payload
+
+
+MP4 = box(b"ftyp", b"isom" + bytes(4)) + box(b"moov", bytes(16)) + box(b"mdat", bytes(64))
+AVIF = box(b"ftyp", b"avif" + bytes(4)) + box(b"meta", bytes(16)) + box(b"mdat", bytes(64))
+
+
+@pytest.mark.parametrize(
+    ("data", "problem"),
+    [
+        (JPEG, None),
+        (JPEG[:-2], "truncated jpeg"),
+        (PNG, None),
+        (PNG[:-12], "truncated png"),
+        (GIF, None),
+        (GIF[:-1], "truncated gif"),
+        (WEBP, None),
+        (WEBP[:-4], "truncated"),
+        (MP4, None),
+        (MP4[:-10], "truncated"),
+        (box(b"ftyp", b"isom" + bytes(4)) + box(b"mdat", bytes(8)), "no movie box"),
+        (AVIF, None),
+        (b"<svg xmlns='http://www.w3.org/2000/svg'></svg>", None),
+        (b"<?xml version='1.0'?><!--" + b"x" * 600 + b"--><svg></svg>", None),
+        (b"\n<!DOCTYPE html><html><body>502 Bad Gateway</body></html>", "HTML page"),
+        (b"\x00\x00\x00\x0cjP  \r\n\x87\n", None),  # JPEG 2000, not recognized
+        (b"", "empty file"),
+    ],
+)
+def test_check_file(tmp_path, data, problem):
+    path = tmp_path / "001.jpg"
+    path.write_bytes(data)
+    reason = check_file(str(path))
+    if problem is None:
+        assert reason is None
+    else:
+        assert problem in reason
+
+
+def test_check_file_size(tmp_path):
+    path = tmp_path / "001.jxl"
+    path.write_bytes(b"\xff\x0a" + bytes(30))
+    assert check_file(str(path), expected_size=32) is None
+    assert check_file(str(path), expected_size=64) == "truncated, 32 of 64 bytes"
+
+
+def test_check_file_decode(tmp_path):
+    image = pytest.importorskip("PIL.Image")
+    path = tmp_path / "001.png"
+    image.new("RGB", (64, 64), "red").save(path)
+    assert check_file(str(path), decode=True) is None
+
+    # the end chunk is intact, only decoding finds the missing image data
+    data = path.read_bytes()
+    path.write_bytes(data[:40] + data[-12:])
+    assert check_file(str(path)) is None
+    assert "decode failed" in check_file(str(path), decode=True)
+
+
+async def test_verifier_quarantine(tmp_path):
+    verifier = FileVerifier("header", 1, tmp_path / "quarantine", logging.getLogger("test"))
+    album = tmp_path / "album"
+    album.mkdir()
+    (album / "001.jpg").write_bytes(JPEG)
+    (album / "002.jpg").write_bytes(b"<html>rate limited</html>")
+    try:
+        assert await verifier.check(album / "001.jpg") is None
+        reason = await verifier.check(album / "002.jpg")
+    finally:
+        verifier.shutdown()
+
+    assert reason == "HTML page instead of media"
+    dest = verifier.quarantine(album / "002.jpg")
+    assert dest == tmp_path / "quarantine" / "album" / "002.jpg"
+    assert dest.read_bytes() == b"<html>rate limited</html>"
+    assert not (album / "002.jpg").exists()
+
+
+async def test_verifier_off(tmp_path):
+    verifier = FileVerifier("off", 1, tmp_path, logging.getLogger("test"))
+    (tmp_path / "001.jpg").write_bytes(b"")
+    assert await verifier.check(tmp_path / "001.jpg") is None
+    assert verifier._executor is None
+
+    with pytest.raises(ValueError):
+        FileVerifier("full", 1, tmp_path, logging.getLogger("test"))
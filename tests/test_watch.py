@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from v2dl.common import AccountError
+from v2dl.scraper.tools import AlbumTracker, UrlPreprocessor
+from v2dl.scraper.watch import FileWatcher, UrlFileWatch, create_watcher
+
+ALBUM = "https://www.v2ph.com/album/"
+
+
+async def eventually(condition, timeout=3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.02)
+
+
+async def test_file_watchers(tmp_path):
+    url_file = tmp_path / "urls.txt"
+    url_file.write_text("")
+    factories = [
+        lambda: FileWatcher(url_file, interval=0.02),
+        lambda: create_watcher(url_file, MagicMock()),
+    ]
+    for factory in factories:
+        watcher = factory()
+        try:
+            assert not await watcher.wait(0.1)
+            waiting = asyncio.create_task(watcher.wait(5))
+            await asyncio.sleep(0.05)
+            with url_file.open("a") as f:
+                f.write(f"{ALBUM}1\n")
+            assert await asyncio.wait_for(waiting, 1)
+        finally:
+            watcher.close()
+
+
+def make_scrape_manager(tmp_path, bot, scrape_url):
+    logger = logging.getLogger("test")
+    return SimpleNamespace(
+        config=SimpleNamespace(
+            static_config=SimpleNamespace(
+                watch_idle_timeout=0.3, state_dir=str(tmp_path / "state"), resume=True
+            )
+        ),
+        logger=logger,
+        web_bot=bot,
+        client_pool=SimpleNamespace(aclose=AsyncMock()),
+        planner=MagicMock(),
+        scrape_url=scrape_url,
+        create_preprocessor=lambda: UrlPreprocessor(
+            AlbumTracker(str(tmp_path / "downloaded.txt")), logger, "ja"
+        ),
+    )
+
+
+async def test_url_file_watch(tmp_path):
+    url_file = tmp_path / "urls.txt"
+    url_file.write_text(f"{ALBUM}1\n")
+    bot = MagicMock()
+    scrape_url = AsyncMock(side_effect=[None, RuntimeError("unexpected layout"), None, None])
+    scrape_manager = make_scrape_manager(tmp_path, bot, scrape_url)
+    bot_factory = MagicMock()
+    watch = UrlFileWatch(scrape_manager, str(url_file), bot_factory)
+    task = asyncio.create_task(watch.run())
+    try:
+        await eventually(lambda: scrape_manager.scrape_url.await_count == 1)
+        with url_file.open("a") as f:
+            f.write(f"{ALBUM}2\n{ALBUM}1?page=2\n{ALBUM}3")  # the last line is incomplete
+        await eventually(lambda: scrape_manager.scrape_url.await_count == 2)
+        assert scrape_manager.web_bot is bot
+
+        # idle, the browser and the connections are released
+        await eventually(lambda: scrape_manager.web_bot is None)
+        bot.close_driver.assert_called_once()
+        scrape_manager.client_pool.aclose.assert_awaited_once()
+
+        # the url failing before did not stop the watch, the same bot is reopened
+        with url_file.open("a") as f:
+            f.write(f"\n{ALBUM}4\n")
+        await eventually(lambda: scrape_manager.scrape_url.await_count == 4)
+        assert scrape_manager.web_bot is bot
+        bot.reopen.assert_called_once()
+        bot_factory.assert_not_called()
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    scraped = [call.args[0] for call in scrape_manager.scrape_url.await_args_list]
+    assert scraped == [f"{ALBUM}{i}?hl=ja" for i in range(1, 5)]
+    # a restarted watch resumes after the last line
+    assert list(UrlFileWatch(scrape_manager, str(url_file), MagicMock()).reader) == []
+
+
+async def test_watch_stops_without_accounts(tmp_path):
+    url_file = tmp_path / "urls.txt"
+    url_file.write_text(f"{ALBUM}1\n{ALBUM}2\n")
+    scrape_url = AsyncMock(side_effect=AccountError("No account is available"))
+    scrape_manager = make_scrape_manager(tmp_path, MagicMock(), scrape_url)
+
+    assert await UrlFileWatch(scrape_manager, str(url_file), MagicMock()).run() is False
+    # the url is not consumed, the next watch starts from it
+    reader = UrlFileWatch(scrape_manager, str(url_file), MagicMock()).reader
+    assert list(reader) == [f"{ALBUM}1", f"{ALBUM}2"]
@@ -8,12 +8,13 @@ if sys.version_info < (3, 10):
     )
 import atexit
 import asyncio
+import logging
 from argparse import Namespace
 from typing import Any
 
-from v2dl import cli, common, scraper, security, version, web_bot
+from v2dl import cli, common, scraper, security, server, version, web_bot
 
-__all__ = ["cli", "common", "scraper", "security", "version", "web_bot"]
+__all__ = ["cli", "common", "scraper", "security", "server", "version", "web_bot"]
 
 
 class V2DLApp:
@@ -35,11 +36,47 @@ class V2DLApp:
             int: The runtime status
         """
         self.scraper: scraper.ScrapeManager
+        args = self.parse_arguments_wrapper(args)
+        profiler = self.get_profiler(args)
+        if profiler is None:
+            return await self._run(args)
+
+        await profiler.start()
+        try:
+            return await self._run(args)
+        finally:
+            await profiler.stop()
+
+    async def _run(self, args: Namespace) -> int:
         try:
-            args = self.parse_arguments_wrapper(args)
             await self.init(args)
             atexit.register(self.scraper.write_metadata)  # ensure write metadata
-            state = await self.scraper.start_scraping()
+            exporter = self.get_metrics_exporter()
+            if exporter is not None:
+                await exporter.start()
+            trace_path = self.config.static_config.trace_path
+            if trace_path:
+                common.tracing.TRACER.enable()
+            try:
+                if args.serve:
+                    state = await self.serve(args.serve)
+                elif getattr(args, "watch", False):
+                    state = await self.watch()
+                elif getattr(args, "subscribe", None) or getattr(args, "unsubscribe", None):
+                    state = self.manage_subscription(args)
+                elif getattr(args, "sync", False):
+                    state = await self.sync()
+                elif self._is_sharded():
+                    coordinator = scraper.ShardCoordinator(self.config, args, self.scraper)
+                    state = await coordinator.start_scraping()
+                else:
+                    state = await self.scraper.start_scraping()
+            finally:
+                if exporter is not None:
+                    await exporter.stop()
+                if trace_path:
+                    self.write_trace(trace_path)
+            await self.scraper.aclose()
             msg = "Successfully bypass Cloudflare" if state else "Blocked by Cloudflare"
             self.logger.debug(f"Scraping state: {msg}")
             if state:
@@ -52,6 +89,73 @@ class V2DLApp:
         except Exception as e:
             raise RuntimeError(f"Unexpected error {e}") from e
 
+    async def serve(self, address: str) -> bool:
+        """Keep the bot and scraper warm and accept scrape jobs over a local JSON API."""
+        scheduler = server.JobScheduler(self.scraper)
+        await server.JobServer(scheduler, address, self.logger).serve_forever()
+        return True
+
+    async def watch(self) -> bool:
+        """Keep the bot warm and scrape the URLs appended to the input file until stopped."""
+        url_file = self.config.runtime_config.url_file
+        watch = scraper.UrlFileWatch(self.scraper, url_file, lambda: self.get_bot(self.config))
+        return await watch.run()
+
+    def manage_subscription(self, args: Namespace) -> bool:
+        registry = scraper.SubscriptionRegistry.from_state_dir(self.config.static_config.state_dir)
+        self.scraper.no_log = True
+        if args.unsubscribe:
+            if registry.remove(args.unsubscribe):
+                self.logger.info("Unsubscribed from %s", args.unsubscribe)
+            else:
+                self.logger.warning("Not subscribed to %s", args.unsubscribe)
+            return True
+
+        interval = self.config.static_config.sync_interval
+        try:
+            subscription = registry.add(args.subscribe, interval * 3600)
+        except ValueError as e:
+            self.logger.error(e)
+            return False
+        self.logger.info("Subscribed to %s, synced every %g hours", subscription.url, interval)
+        return True
+
+    async def sync(self) -> bool:
+        """Download the new albums of every due subscription."""
+        static_config = self.config.static_config
+        registry = scraper.SubscriptionRegistry.from_state_dir(static_config.state_dir)
+        concurrency = min(
+            static_config.sync_concurrency, self.scraper.get_web_bot().page_concurrency
+        )
+        return await scraper.SubscriptionSync(self.scraper, registry, concurrency).run()
+
+    def get_profiler(self, args: Namespace) -> common.profiler.Profiler | None:
+        """Profile the run including the bot startup when `--profile` is given."""
+        if not getattr(args, "profile_dir", None):
+            return None
+        logger = logging.getLogger(version.__package_name__)
+        return common.profiler.Profiler(args.profile_dir, logger, args.profile_mode or "sample")
+
+    def get_metrics_exporter(self) -> common.MetricsExporter | None:
+        """Expose runtime metrics when `metrics_address` or `metrics_textfile` is configured."""
+        static_config = self.config.static_config
+        if not (static_config.metrics_address or static_config.metrics_textfile):
+            return None
+        return common.MetricsExporter(
+            self.logger, static_config.metrics_address, static_config.metrics_textfile
+        )
+
+    def write_trace(self, trace_path: str) -> None:
+        tracer = common.tracing.TRACER
+        tracer.enabled = False
+        serializer = common.get_serializer(self.config.static_config.json_backend)
+        try:
+            tracer.export(trace_path, serializer)
+        except OSError as e:
+            self.logger.error("Failed to write trace to %s: %s", trace_path, e)
+        else:
+            self.logger.info("Wrote %d trace spans to %s", len(tracer.events), trace_path)
+
     def parse_arguments_wrapper(
         self, args: Namespace | dict[Any, Any] | list[Any] | None
     ) -> Namespace:
@@ -95,7 +199,7 @@ class V2DLApp:
             a. Load arguments for StaticConfig.
             b. Initialize RuntimeConfig.
             c. Merge all configuration instances to create a Config instance.
-        5. Instantiate the web bot.
+        5. Instantiate the web bot, skipped in download-only, subscription and sharded mode.
         6. Instantiate the ScraperManager.
 
         Args:
@@ -107,8 +211,21 @@ class V2DLApp:
         await self._check_cli_inputs(args)
         self._initialize_config(args)
 
-        self.bot = self.get_bot(self.config)
-        self.scraper = scraper.ScrapeManager(self.config, self.bot)
+        # downloading a manifest, editing subscriptions or coordinating shards does not need
+        # the browser, a watch runs in a single process
+        watch = getattr(args, "watch", False)
+        subscription = getattr(args, "subscribe", None) or getattr(args, "unsubscribe", None)
+        browserless = bool(args.manifest_file or subscription) or (self._is_sharded() and not watch)
+        self.client_pool = common.ClientPool(self.config)
+        try:
+            self.bot = None if browserless else self.get_bot(self.config)
+        except common.AccountError as e:
+            self.logger.info("%s. Exiting.", e)
+            sys.exit(0)
+        self.scraper = scraper.ScrapeManager(self.config, self.bot, self.client_pool)
+
+    def _is_sharded(self) -> bool:
+        return self.config.static_config.shards > 1 and bool(self.config.runtime_config.url_file)
 
     async def _check_cli_inputs(self, args: Namespace) -> None:
         """Check command line inputs for quick return"""
@@ -152,12 +269,24 @@ class V2DLApp:
         if args.no_metadata:
             cset(section, "no_metadata", args.no_metadata)
 
+        if args.metadata_jsonl:
+            cset(section, "compact_metadata", False)
+
         if args.force_download:
             cset(section, "force_download", args.force_download)
 
+        if args.no_resume:
+            cset(section, "resume", False)
+
+        if args.plan_albums:
+            cset(section, "plan_albums", args.plan_albums)
+
         if args.terminate:
             cset(section, "terminate", args.terminate)
 
+        if args.dry_run:
+            cset(section, "dry_run", args.dry_run)
+
         if args.use_default_chrome_profile:
             cset(section, "use_default_chrome_profile", args.use_default_chrome_profile)
 
@@ -169,8 +298,18 @@ class V2DLApp:
         cset(section, "min_scroll_distance", min_s)
         cset(section, "max_scroll_distance", max_s)
         cset(section, "max_worker", args.max_worker)
+        if args.shards:
+            cset(section, "shards", args.shards)
+        if args.sync_interval is not None:
+            cset(section, "sync_interval", args.sync_interval)
+        if args.min_free_space is not None:
+            cset(section, "min_free_space", args.min_free_space)
+        if args.verify_mode:
+            cset(section, "verify_mode", args.verify_mode)
         cset(section, "rate_limit", args.rate_limit)
         cset(section, "page_range", args.page_range)
+        if args.metrics_address:
+            cset(section, "metrics_address", args.metrics_address)
 
         # path relative configurations
         args.cookies_path = args.cookies_path if args.cookies_path else ""
@@ -185,6 +324,15 @@ class V2DLApp:
         args.metadata_path = args.metadata_path if args.metadata_path else ""
         cset(section, "metadata_path", args.metadata_path)
 
+        if args.manifest_path:
+            cset(section, "manifest_path", args.manifest_path)
+
+        if args.metrics_textfile:
+            cset(section, "metrics_textfile", args.metrics_textfile)
+
+        if args.trace_path:
+            cset(section, "trace_path", args.trace_path)
+
         # not providing cli input
         if not sub_dict["download_log_path"]:
             path = str(config_dir / "downloaded_albums.txt")
@@ -195,6 +343,11 @@ class V2DLApp:
             path = str(config_dir / "v2dl.log")
             cset(section, "system_log_path", path)
 
+        # not providing cli input
+        if not sub_dict["state_dir"]:
+            path = str(config_dir / "state")
+            cset(section, "state_dir", path)
+
         # not providing cli input
         path = self.config_manager.get_chrome_exec_path(sub_dict["chrome_exec_path"])
         cset(section, "chrome_exec_path", path)
@@ -210,6 +363,7 @@ class V2DLApp:
 
         self.config_manager.set(section, "url", args.url)
         self.config_manager.set(section, "url_file", args.url_file)
+        self.config_manager.set(section, "manifest_file", args.manifest_file)
 
         log_path = self.config_manager.get("static_config", "system_log_path")
         logger_name = version.__package_name__
@@ -239,8 +393,8 @@ class V2DLApp:
         if hasattr(self, "bot_name") and self.bot_name in self.registered_bot:
             return self.registered_bot[self.bot_name](conf)
 
-        # use default bot, configured in config
-        return web_bot.get_bot(conf)
+        # use default bot, configured in config, the http bot shares the download client
+        return web_bot.get_bot(conf, getattr(self, "client_pool", None))
 
     def set_bot(self, bot_name: str) -> None:
         """Set the name of the custom bot"""
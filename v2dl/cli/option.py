@@ -3,7 +3,8 @@ import logging
 import argparse
 from typing import Any
 
-from v2dl.common.const import DEFAULT_CONFIG
+from v2dl.common.const import DEFAULT_CONFIG, DEFAULT_SERVE_ADDRESS, VERIFY_MODES
+from v2dl.common.profiler import PROFILE_MODES
 
 
 class ResolvePathAction(argparse.Action):
@@ -65,6 +66,41 @@ def parse_arguments(args: list[str] | None = None) -> argparse.Namespace:
         help="Path to file containing a list of URLs",
     )
 
+    input_group.add_argument(
+        "--download-only",
+        metavar="MANIFEST",
+        dest="manifest_file",
+        action=ResolvePathAction,
+        help="Download images listed in a manifest written by --manifest, no browser required",
+    )
+
+    input_group.add_argument(
+        "--serve",
+        nargs="?",
+        const=DEFAULT_SERVE_ADDRESS,
+        metavar="ADDR",
+        help="Run a local job server accepting scrape jobs over HTTP/JSON. ADDR is\n"
+        f"'host:port' or 'unix:/path/to/socket' (default: {DEFAULT_SERVE_ADDRESS})",
+    )
+
+    input_group.add_argument(
+        "--subscribe",
+        metavar="URL",
+        help="Subscribe to an album list, e.g. an actor, company or category, for --sync",
+    )
+
+    input_group.add_argument(
+        "--unsubscribe",
+        metavar="URL",
+        help="Remove a subscription",
+    )
+
+    input_group.add_argument(
+        "--sync",
+        action="store_true",
+        help="Download the new albums of the subscriptions whose interval has passed",
+    )
+
     input_group.add_argument(
         "-a",
         "--account",
@@ -86,9 +122,9 @@ def parse_arguments(args: list[str] | None = None) -> argparse.Namespace:
         dest="bot_type",
         default="",
         type=str,
-        choices=["selenium", "drissionpage"],
+        choices=["selenium", "drissionpage", "http"],
         required=False,
-        help="Type of bot to use (default: drissionpage)",
+        help="Type of bot to use, http starts the browser only when required (default: drissionpage)",
     )
 
     general.add_argument(
@@ -121,6 +157,13 @@ def parse_arguments(args: list[str] | None = None) -> argparse.Namespace:
         help="Force downloading, not skipping downloaded albums",
     )
 
+    general.add_argument(
+        "--no-resume",
+        dest="no_resume",
+        action="store_true",
+        help="Read the input file from the start instead of after its last checkpoint",
+    )
+
     general.add_argument(
         "-l",
         "--language",
@@ -138,6 +181,14 @@ def parse_arguments(args: list[str] | None = None) -> argparse.Namespace:
         help="Range of pages to download. (e.g. '5', '8-20', or '1:24:3')",
     )
 
+    general.add_argument(
+        "--plan",
+        dest="plan_albums",
+        action="store_true",
+        help="Load the first page of every new album of an album list to schedule the\n"
+        "biggest albums first, costs one page load per album",
+    )
+
     general.add_argument(
         "--no-metadata",
         dest="no_metadata",
@@ -145,6 +196,13 @@ def parse_arguments(args: list[str] | None = None) -> argparse.Namespace:
         help="Disable writing json download metadata",
     )
 
+    general.add_argument(
+        "--metadata-jsonl",
+        dest="metadata_jsonl",
+        action="store_true",
+        help="Keep the per-album JSONL metadata instead of compacting it into one json file",
+    )
+
     general.add_argument(
         "--metadata-path",
         dest="metadata_path",
@@ -153,6 +211,14 @@ def parse_arguments(args: list[str] | None = None) -> argparse.Namespace:
         help="Path to json file for the download metadata",
     )
 
+    general.add_argument(
+        "--manifest",
+        dest="manifest_path",
+        metavar="PATH",
+        action=ResolvePathAction,
+        help="Append scraped image records to a JSONL manifest for --download-only",
+    )
+
     general.add_argument(
         "--max-worker",
         type=int,
@@ -162,13 +228,95 @@ def parse_arguments(args: list[str] | None = None) -> argparse.Namespace:
         help="maximum download concurrency",
     )
 
+    general.add_argument(
+        "--shards",
+        type=int,
+        dest="shards",
+        metavar="N",
+        help="Split the input file across N worker processes, each with its own browser",
+    )
+
+    general.add_argument(
+        "--watch",
+        dest="watch",
+        action="store_true",
+        help="Keep running and scrape the URLs appended to the input file as they arrive",
+    )
+
+    general.add_argument(
+        "--sync-interval",
+        type=float,
+        dest="sync_interval",
+        metavar="HOURS",
+        help="Hours between two syncs of the subscription added by --subscribe\n"
+        f"(default: {DEFAULT_CONFIG['static_config']['sync_interval']})",
+    )
+
+    general.add_argument(
+        "--min-free-space",
+        type=int,
+        dest="min_free_space",
+        metavar="MB",
+        help="Stop before an album would leave less than MB MiB free in the download directory",
+    )
+
+    general.add_argument(
+        "--verify",
+        dest="verify_mode",
+        choices=VERIFY_MODES,
+        help="Check every download, broken files are quarantined and downloaded again.\n"
+        "header: magic bytes and completeness, decode: also decode images with Pillow\n"
+        f"(default: {DEFAULT_CONFIG['static_config']['verify_mode']})",
+    )
+
     general.add_argument(
         "--rate-limit",
         type=int,
         default=DEFAULT_CONFIG["static_config"]["rate_limit"],
         dest="rate_limit",
-        metavar="N",
-        help="maximum download concurrency",
+        metavar="KB",
+        help="download speed limit in KiB/s shared by all downloads, 0 disables",
+    )
+
+    general.add_argument(
+        "--metrics",
+        dest="metrics_address",
+        metavar="ADDR",
+        help="Serve Prometheus metrics on http://ADDR/metrics while running (e.g. '127.0.0.1:9108')",
+    )
+
+    general.add_argument(
+        "--metrics-textfile",
+        dest="metrics_textfile",
+        metavar="PATH",
+        action=ResolvePathAction,
+        help="Periodically write Prometheus metrics to PATH for the node-exporter textfile collector",
+    )
+
+    general.add_argument(
+        "--trace",
+        dest="trace_path",
+        metavar="PATH",
+        action=ResolvePathAction,
+        help="Record per-stage timing spans and write them as Chrome trace JSON for Perfetto",
+    )
+
+    general.add_argument(
+        "--profile",
+        dest="profile_dir",
+        metavar="DIR",
+        action=ResolvePathAction,
+        help="Profile the whole run and write the report, collapsed stacks and event loop\n"
+        "statistics to DIR",
+    )
+
+    general.add_argument(
+        "--profile-mode",
+        dest="profile_mode",
+        default=PROFILE_MODES[0],
+        choices=PROFILE_MODES,
+        help="sample: low overhead stack sampling, cprofile: deterministic call profile\n"
+        f"(default: {PROFILE_MODES[0]})",
     )
 
     general.add_argument(
@@ -207,7 +355,12 @@ def parse_arguments(args: list[str] | None = None) -> argparse.Namespace:
         help="Custom user-agent, independent of custom headers",
     )
 
-    general.add_argument("--dry-run", action="store_true", help="Dry run without downloading")
+    general.add_argument(
+        "--dry-run",
+        dest="dry_run",
+        action="store_true",
+        help="Dry run without downloading, useful with --manifest",
+    )
     general.add_argument("--terminate", action="store_true", help="Terminate chrome after scraping")
     general.add_argument(
         "--use-default-chrome-profile",
@@ -242,4 +395,7 @@ def parse_arguments(args: list[str] | None = None) -> argparse.Namespace:
         help="Print various debugging information",
     )
 
-    return parser.parse_args(args)
+    parsed = parser.parse_args(args)
+    if parsed.watch and not parsed.url_file:
+        parser.error("--watch requires --input-file")
+    return parsed
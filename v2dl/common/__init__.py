@@ -1,7 +1,24 @@
-from v2dl.common import config, const, cookies, error, logger, model, utils
+from v2dl.common import (
+    clearance,
+    client,
+    config,
+    const,
+    cookies,
+    error,
+    logger,
+    metrics,
+    model,
+    profiler,
+    serializer,
+    tracing,
+    utils,
+)
+from v2dl.common.clearance import ClearanceCache
+from v2dl.common.client import ClientPool
 from v2dl.common.config import ConfigManager
 from v2dl.common.const import DEFAULT_CONFIG, DEFAULT_USER_AGENT
 from v2dl.common.error import (
+    AccountError,
     BotError,
     DownloadError,
     FileProcessingError,
@@ -9,27 +26,41 @@ from v2dl.common.error import (
     SecurityError,
 )
 from v2dl.common.logger import setup_logging
+from v2dl.common.metrics import MetricsExporter
 from v2dl.common.model import Config, EncryptionConfig, RuntimeConfig, StaticConfig
+from v2dl.common.serializer import JSONSerializer, get_serializer
 
 __all__ = [
     "DEFAULT_CONFIG",
     "DEFAULT_USER_AGENT",
+    "AccountError",
     "BotError",
+    "ClearanceCache",
+    "ClientPool",
     "Config",
     "ConfigManager",
     "DownloadError",
     "EncryptionConfig",
     "FileProcessingError",
+    "JSONSerializer",
+    "MetricsExporter",
     "RuntimeConfig",
     "ScrapeError",
     "SecurityError",
     "StaticConfig",
+    "clearance",
+    "client",
     "config",
     "const",
     "cookies",
     "error",
+    "get_serializer",
     "logger",
+    "metrics",
     "model",
+    "profiler",
+    "serializer",
     "setup_logging",
+    "tracing",
     "utils",
 ]
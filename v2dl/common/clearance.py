@@ -0,0 +1,140 @@
+import os
+import time
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from v2dl.common import metrics
+from v2dl.common.serializer import JSONSerializer, get_serializer
+
+CLEARANCE_COOKIE = "cf_clearance"
+CLEARANCE_DOMAIN = ".v2ph.com"
+DEFAULT_LIFETIME = 30 * 60  # used when the expiry of the cookie is unknown
+RELOAD_INTERVAL = 5.0  # seconds a lookup trusts the entries before checking the file again
+
+
+@dataclass
+class Clearance:
+    value: str
+    user_agent: str
+    expires: float
+
+    @property
+    def expired(self) -> bool:
+        return self.expires <= time.time()
+
+    def cookie(self) -> dict[str, str | float]:
+        return {
+            "name": CLEARANCE_COOKIE,
+            "value": self.value,
+            "domain": CLEARANCE_DOMAIN,
+            "path": "/",
+            "expires": self.expires,
+        }
+
+
+class ClearanceCache:
+    """Cloudflare clearance cookies shared by the browser, page requests and downloads.
+
+    Cloudflare only accepts `cf_clearance` together with the user agent that solved the
+    challenge, so one cookie is kept per user agent with its expiry. The cache is a JSON
+    file in the state directory, it is read again whenever another run or shard replaced
+    it. Lookups, once per image download, check the file at most every `reload_interval`
+    seconds, writes always check it first. Without a state directory the cache only lives
+    in memory.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None,
+        serializer: JSONSerializer | None = None,
+        reload_interval: float = RELOAD_INTERVAL,
+    ) -> None:
+        self.path = Path(path) if path else None
+        self.serializer = serializer or get_serializer()
+        self.reload_interval = reload_interval
+        self.entries: list[Clearance] = []
+        self.mtime = 0
+        self.checked = float("-inf")  # monotonic time of the last check of the file
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_state_dir(cls, state_dir: str) -> "ClearanceCache":
+        return cls(Path(state_dir) / "clearance.json" if state_dir else None)
+
+    @staticmethod
+    def applies_to(url: str) -> bool:
+        host = urlsplit(url).hostname or ""
+        return f".{host}".endswith(CLEARANCE_DOMAIN)
+
+    def get(self, user_agent: str | None = None, source: str = "page") -> Clearance | None:
+        """Return the clearance for `user_agent`, or the newest one if no agent is given.
+
+        `source` labels the lookup in the metrics, image downloads look up the cache once
+        per file and would drown the page fetches.
+        """
+        with self.lock:
+            if time.monotonic() - self.checked >= self.reload_interval:
+                self.reload()
+            entries = [c for c in self.entries if not c.expired]
+        if user_agent is not None:
+            entries = [c for c in entries if c.user_agent == user_agent]
+        if not entries:
+            metrics.CLEARANCE_CACHE.inc(result="miss", source=source)
+            return None
+        metrics.CLEARANCE_CACHE.inc(result="hit", source=source)
+        return max(entries, key=lambda c: c.expires)
+
+    def store(self, value: str, user_agent: str, expires: float | None = None) -> None:
+        if not value or not user_agent:
+            return
+        if not expires or expires <= time.time():
+            expires = time.time() + DEFAULT_LIFETIME
+        with self.lock:
+            self.reload()
+            if any(c.value == value for c in self.entries):
+                return
+            self.entries = [c for c in self.entries if not c.expired and c.user_agent != user_agent]
+            self.entries.append(Clearance(value, user_agent, expires))
+            self.save()
+        metrics.CLEARANCE_CACHE.inc(result="stored", source="page")
+
+    def discard(self, value: str) -> None:
+        """Forget a clearance that Cloudflare no longer accepts."""
+        with self.lock:
+            self.reload()
+            entries = [c for c in self.entries if c.value != value]
+            if len(entries) == len(self.entries):
+                return
+            self.entries = entries
+            self.save()
+        metrics.CLEARANCE_CACHE.inc(result="rejected", source="page")
+
+    def reload(self) -> None:
+        if self.path is None:
+            return
+        self.checked = time.monotonic()
+        mtime = 0
+        try:
+            mtime = self.path.stat().st_mtime_ns
+            if mtime == self.mtime:
+                return
+            data = self.serializer.loads(self.path.read_bytes())
+            self.entries = [Clearance(**entry) for entry in data]
+        except (OSError, TypeError, ValueError):
+            self.entries = []
+        self.mtime = mtime
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        # other shards may read at any time, never let them see a partial file
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(self.serializer.dumps([asdict(c) for c in self.entries]))
+            os.replace(tmp_path, self.path)
+            self.mtime = self.path.stat().st_mtime_ns
+        except OSError:
+            pass  # best effort, the entries are still used by this run
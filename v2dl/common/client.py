@@ -0,0 +1,38 @@
+import httpx
+
+from v2dl.common.clearance import ClearanceCache
+from v2dl.common.const import HEADERS
+from v2dl.common.model import Config
+
+
+class ClientPool:
+    """Lazily created httpx client shared by all downloads.
+
+    Reusing one client keeps connections and HTTP/2 sessions warm instead of opening a new
+    connection pool for every file. The Cloudflare clearance cache is shared the same way.
+    """
+
+    def __init__(self, config: Config) -> None:
+        self.config = config
+        self._client: httpx.AsyncClient | None = None
+        self.clearance = ClearanceCache.from_state_dir(config.static_config.state_dir)
+
+    def get(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            max_worker = self.config.static_config.max_worker
+            self._client = httpx.AsyncClient(
+                headers=self.config.static_config.custom_headers or HEADERS,
+                http2=True,
+                timeout=httpx.Timeout(30.0),
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_keepalive_connections=max_worker,
+                    max_connections=max_worker * 2,
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
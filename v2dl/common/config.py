@@ -91,6 +91,7 @@ class ConfigManager(ConfigPathTool):
         return RuntimeConfig(
             url=sub_dict["url"],
             url_file=sub_dict["url_file"],
+            manifest_file=sub_dict["manifest_file"],
             logger=sub_dict["logger"],
         )
 
@@ -26,6 +26,8 @@ VALID_EXTENSIONS = (
     "m4v",
 )
 IMAGE_PER_PAGE = 10
+VERIFY_MODES = ("off", "header", "decode")
+DEFAULT_SERVE_ADDRESS = "127.0.0.1:8765"
 
 # For selenium webdriver
 USER_OS = platform.system()
@@ -55,8 +57,12 @@ DEFAULT_CONFIG: dict[str, dict[str, Any]] = {
         "language": "ja",
         "chrome_args": None,
         "no_metadata": False,
+        "compact_metadata": True,
+        "json_backend": "auto",
         "force_download": False,
+        "resume": True,
         "terminate": False,
+        "dry_run": False,
         "use_default_chrome_profile": False,
         "log_level": -1,
         "min_scroll_distance": 1000,
@@ -64,14 +70,33 @@ DEFAULT_CONFIG: dict[str, dict[str, Any]] = {
         "min_scroll_step": 300,
         "max_scroll_step": 500,
         "max_worker": 2,
+        "writer_threads": 4,
+        "preallocate": True,
+        "min_free_space": 0,
+        "download_segments": 4,
+        "verify_mode": "off",
+        "verify_workers": 2,
+        "verify_retries": 1,
+        "page_concurrency": 4,
+        "plan_albums": False,
+        "shards": 1,
+        "watch_idle_timeout": 600,
+        "sync_interval": 24,
+        "sync_concurrency": 2,
         "rate_limit": 1000,
         "page_range": "",
+        "metrics_address": "",
         # path relative configurations
         "cookies_path": "",
         "download_dir": "",
         "metadata_path": "",
+        "manifest_path": "",
+        "quarantine_dir": "",
+        "metrics_textfile": "",
+        "trace_path": "",
         "download_log_path": "",
         "system_log_path": "",
+        "state_dir": "",
         # Do NOT pass default user-agent to config, it corrupts drissionpage's fingerprint
         "chrome_exec_path": {
             "Linux": "/usr/bin/google-chrome",
@@ -79,10 +104,12 @@ DEFAULT_CONFIG: dict[str, dict[str, Any]] = {
             "Windows": r"C:\Program Files\Google\Chrome\Application\chrome.exe",
         },
         "chrome_profile_path": "",
+        "chrome_port": 9222,
     },
     "runtime_config": {
         "url": "",
         "url_file": "",
+        "manifest_file": "",
     },
     "encryption_config": {
         "key_bytes": 32,
@@ -10,6 +10,10 @@ class DownloadError(ScrapeError):
     """Downloading fail."""
 
 
+class AccountError(ScrapeError):
+    """No account can be used for login."""
+
+
 class SecurityError(Exception):
     """Password encryption/decryption fail."""
 
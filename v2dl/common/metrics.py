@@ -0,0 +1,262 @@
+import os
+import time
+import asyncio
+from collections.abc import Iterator
+from contextlib import contextmanager, suppress
+from logging import Logger
+from pathlib import Path
+from typing import ClassVar
+
+# seconds, from a cached page to a slow scroll through a long album
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = tuple[str, ...]
+
+
+class Metric:
+    """Base of the Prometheus-style metrics, values are kept per label set."""
+
+    type: ClassVar[str] = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        registry: "Registry | None" = None,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        (registry or REGISTRY).register(self)
+
+    def label_values(self, labels: dict[str, str]) -> LabelValues:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def format_labels(self, values: LabelValues, extra: str = "") -> str:
+        pairs = [f'{k}="{escape_label(v)}"' for k, v in zip(self.labelnames, values, strict=True)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines) + "\n"
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        registry: "Registry | None" = None,
+    ) -> None:
+        super().__init__(name, documentation, labelnames, registry)
+        self.values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self.label_values(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        for key, value in self.values.items():
+            yield f"{self.name}{self.format_labels(key)} {value:g}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self.values[self.label_values(labels)] = value
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        registry: "Registry | None" = None,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        self.counts: dict[LabelValues, list[int]] = {}
+        self.sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self.label_values(labels)
+        counts = self.counts.setdefault(key, [0] * (len(self.buckets) + 1))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        self.sums[key] = self.sums.get(key, 0.0) + value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> Iterator[str]:
+        for key, counts in self.counts.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts, strict=True):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                labels = self.format_labels(key, 'le="' + le + '"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{self.format_labels(key)} {self.sums[key]:g}"
+            yield f"{self.name}_count{self.format_labels(key)} {cumulative}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        return "".join(metric.render() for metric in self.metrics.values())
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+REGISTRY = Registry()
+
+PAGES_FETCHED = Counter("v2dl_pages_fetched_total", "Pages fetched by the web bot.", ("kind",))
+PAGE_FETCH_SECONDS = Histogram(
+    "v2dl_page_fetch_seconds", "Time to fetch a page including scrolling.", ("kind",)
+)
+SCROLL_SECONDS = Histogram("v2dl_scroll_seconds", "Time spent scrolling a page to the bottom.")
+CHALLENGES = Counter("v2dl_cloudflare_challenges_total", "Cloudflare challenges encountered.")
+CLEARANCE_CACHE = Counter(
+    "v2dl_clearance_cache_total",
+    "Clearance cache lookups and updates by result and source, page or image.",
+    ("result", "source"),
+)
+LOGIN_ATTEMPTS = Counter(
+    "v2dl_login_attempts_total", "Login attempts by method and result.", ("method", "result")
+)
+RETRIES = Counter("v2dl_retries_total", "Retried page requests.", ("stage",))
+DOWNLOADS = Counter("v2dl_downloads_total", "Finished image downloads by result.", ("result",))
+VERIFIED_FILES = Counter(
+    "v2dl_verified_files_total", "Downloaded files checked by the verifier by result.", ("result",)
+)
+DOWNLOADED_BYTES = Counter("v2dl_downloaded_bytes_total", "Bytes written by the downloader.")
+DOWNLOAD_SECONDS = Histogram("v2dl_download_seconds", "Time to download one image.")
+DOWNLOADS_IN_FLIGHT = Gauge("v2dl_downloads_in_flight", "Downloads holding a worker slot.")
+DOWNLOAD_QUEUE_DEPTH = Gauge("v2dl_download_queue_depth", "Downloads waiting for a worker slot.")
+ACCOUNTS_AVAILABLE = Gauge("v2dl_accounts_available", "Accounts eligible for login.")
+ACCOUNT_QUOTA_EXCEEDED = Counter(
+    "v2dl_account_quota_exceeded_total", "Times an account hit its read limit."
+)
+
+
+class MetricsExporter:
+    """Expose a registry on a local `/metrics` endpoint and/or a node-exporter textfile.
+
+    The textfile is rewritten atomically every `interval` seconds and once more on stop.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        address: str = "",
+        textfile: str = "",
+        interval: float = 15.0,
+        registry: Registry = REGISTRY,
+    ) -> None:
+        self.logger = logger
+        self.address = address
+        self.textfile = Path(textfile) if textfile else None
+        self.interval = interval
+        self.registry = registry
+        self.server: asyncio.Server | None = None
+        self.writer_task: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        if self.address:
+            host, _, port = self.address.rpartition(":")
+            self.server = await asyncio.start_server(self.handle, host or "127.0.0.1", int(port))
+            self.logger.info("Metrics available at http://%s/metrics", self.address)
+        if self.textfile is not None:
+            self.writer_task = asyncio.create_task(self.write_periodically())
+
+    async def stop(self) -> None:
+        if self.writer_task is not None:
+            self.writer_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.writer_task
+        if self.textfile is not None:
+            self.write_textfile()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def write_textfile(self) -> None:
+        if self.textfile is None:
+            return
+        self.textfile.parent.mkdir(parents=True, exist_ok=True)
+        # node-exporter may read at any time, never let it see a partial file
+        tmp_path = self.textfile.with_name(f".{self.textfile.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(self.registry.render(), encoding="utf-8")
+        os.replace(tmp_path, self.textfile)
+
+    async def write_periodically(self) -> None:
+        while True:
+            try:
+                self.write_textfile()
+            except OSError as e:
+                self.logger.error("Failed to write metrics to %s: %s", self.textfile, e)
+            await asyncio.sleep(self.interval)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            while (await reader.readline()).strip():
+                pass
+
+            if len(request_line) >= 2 and request_line[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", self.registry.render().encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"Not Found\n"
+            writer.write(
+                (
+                    f"HTTP/1.1 {status}\r\n"
+                    "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Connection: close\r\n\r\n"
+                ).encode("latin-1")
+                + body
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
@@ -18,8 +18,12 @@ class StaticConfig:
     language: str
     chrome_args: str
     no_metadata: bool
+    compact_metadata: bool
+    json_backend: str
     force_download: bool
+    resume: bool
     terminate: bool
+    dry_run: bool
     use_default_chrome_profile: bool
     log_level: int
     min_scroll_distance: int
@@ -27,23 +31,44 @@ class StaticConfig:
     min_scroll_step: int
     max_scroll_step: int
     max_worker: int
+    writer_threads: int
+    preallocate: bool
+    min_free_space: int
+    download_segments: int
+    verify_mode: str
+    verify_workers: int
+    verify_retries: int
+    page_concurrency: int
+    plan_albums: bool
+    shards: int
+    watch_idle_timeout: int
+    sync_interval: float
+    sync_concurrency: int
     rate_limit: int
     page_range: str | None
+    metrics_address: str
 
     # path relative configurations
     cookies_path: str
     download_dir: str
     metadata_path: str
+    manifest_path: str
+    quarantine_dir: str
+    metrics_textfile: str
+    trace_path: str
     download_log_path: str
     system_log_path: str
+    state_dir: str
     chrome_exec_path: str
     chrome_profile_path: str
+    chrome_port: int
 
 
 @dataclass
 class RuntimeConfig:
     url: str
     url_file: str
+    manifest_file: str
     logger: "Logger"
 
 
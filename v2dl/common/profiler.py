@@ -0,0 +1,214 @@
+import io
+import os
+import sys
+import time
+import pstats
+import asyncio
+import logging
+import cProfile
+import threading
+from collections import Counter
+from contextlib import suppress
+from pathlib import Path
+from types import FrameType
+
+PROFILE_MODES = ("sample", "cprofile")
+
+Stack = tuple[str, ...]
+
+
+class StackSampler:
+    """Sample the Python stack of one thread from a background thread.
+
+    Samples are aggregated per stack, which is exactly the collapsed format read by
+    flamegraph.pl, speedscope and Perfetto.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[Stack] = Counter()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="v2dl-sampler", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        self.thread.join()
+
+    def run(self) -> None:
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self.walk(frame)] += 1
+
+    @staticmethod
+    def walk(frame: FrameType | None) -> Stack:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+            frame = frame.f_back
+        return tuple(reversed(stack))
+
+    def collapsed(self) -> str:
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.items())
+
+    def top(self, limit: int) -> list[str]:
+        """Return the functions with the most samples, by self and by total time."""
+        total = sum(self.stacks.values()) or 1
+        own: Counter[str] = Counter()
+        inclusive: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for name in set(stack):
+                inclusive[name] += count
+
+        lines = [
+            f"{total} samples every {self.interval * 1000:g} ms",
+            "",
+            "self %  total %  function",
+        ]
+        for name, count in own.most_common(limit):
+            lines.append(f"{count / total:6.1%}  {inclusive[name] / total:7.1%}  {name}")
+        lines.extend(["", "total %  function"])
+        for name, count in inclusive.most_common(limit):
+            lines.append(f"{count / total:7.1%}  {name}")
+        return lines
+
+
+class SlowCallbackHandler(logging.Handler):
+    """Collect the slow callback warnings asyncio logs in debug mode."""
+
+    def __init__(self) -> None:
+        super().__init__(logging.WARNING)
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        message = record.getMessage()
+        if message.startswith("Executing"):
+            self.messages.append(message)
+
+
+class LoopMonitor:
+    """Record event loop lag and task counts, and turn on asyncio debug mode.
+
+    The lag is how late a `sleep(interval)` wakes up, i.e. how long something blocked
+    the loop. Callbacks running longer than `slow_callback` are reported by asyncio.
+    """
+
+    def __init__(self, interval: float = 0.05, slow_callback: float = 0.1) -> None:
+        self.interval = interval
+        self.slow_callback = slow_callback
+        self.lags: list[float] = []
+        self.task_counts: list[int] = []
+        self.handler = SlowCallbackHandler()
+        self.task: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.slow_callback
+        logging.getLogger("asyncio").addHandler(self.handler)
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.task
+        logging.getLogger("asyncio").removeHandler(self.handler)
+        asyncio.get_running_loop().set_debug(False)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(loop.time() - start - self.interval, 0.0))
+            self.task_counts.append(len(asyncio.all_tasks()))
+
+    def report(self, limit: int) -> list[str]:
+        lags = sorted(self.lags) or [0.0]
+        counts = self.task_counts or [0]
+        p50, p95 = lags[len(lags) // 2], lags[int(len(lags) * 0.95)]
+        lines = [
+            f"loop lag     p50 {p50 * 1000:.1f} ms  p95 {p95 * 1000:.1f} ms  max {lags[-1] * 1000:.1f} ms",
+            f"tasks        mean {sum(counts) / len(counts):.1f}  max {max(counts)}",
+            f"slow callbacks (> {self.slow_callback * 1000:g} ms): {len(self.handler.messages)}",
+        ]
+        lines.extend(f"  {message}" for message in self.handler.messages[:limit])
+        return lines
+
+
+class Profiler:
+    """Profile a whole run and write the reports to `output_dir`.
+
+    `sample` mode samples the main thread's stack and writes `profile.collapsed`,
+    `cprofile` mode traces every call and writes `profile.prof` for pstats or snakeviz.
+    Both write the top functions and the event loop statistics to `profile.txt`.
+    """
+
+    def __init__(
+        self,
+        output_dir: str | Path,
+        logger: logging.Logger,
+        mode: str = "sample",
+        limit: int = 30,
+        slow_callback: float = 0.1,
+    ) -> None:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}', expected one of {PROFILE_MODES}")
+        self.output_dir = Path(output_dir)
+        self.logger = logger
+        self.mode = mode
+        self.limit = limit
+        self.monitor = LoopMonitor(slow_callback=slow_callback)
+        self.sampler: StackSampler | None = None
+        self.profile: cProfile.Profile | None = None
+        self.started = 0.0
+
+    async def start(self) -> None:
+        self.started = time.perf_counter()
+        await self.monitor.start()
+        if self.mode == "sample":
+            self.sampler = StackSampler(threading.get_ident())
+            self.sampler.start()
+        else:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    async def stop(self) -> None:
+        if self.profile is not None:
+            self.profile.disable()
+        if self.sampler is not None:
+            self.sampler.stop()
+        await self.monitor.stop()
+        elapsed = time.perf_counter() - self.started
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        lines = [f"v2dl profile, mode {self.mode}, {elapsed:.2f} s wall time", ""]
+        lines.extend(self.monitor.report(self.limit))
+        lines.append("")
+
+        if self.sampler is not None:
+            (self.output_dir / "profile.collapsed").write_text(
+                self.sampler.collapsed(), encoding="utf-8"
+            )
+            lines.extend(self.sampler.top(self.limit))
+        if self.profile is not None:
+            self.profile.dump_stats(self.output_dir / "profile.prof")
+            lines.append(self.cprofile_top())
+
+        report_path = self.output_dir / "profile.txt"
+        report_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        self.logger.info("Profile written to %s", self.output_dir)
+
+    def cprofile_top(self) -> str:
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)  # type: ignore[arg-type]
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.limit)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(self.limit)
+        return stream.getvalue()
@@ -0,0 +1,85 @@
+import json
+import importlib.util
+from functools import lru_cache
+from typing import Any
+
+# tried in order when the backend is "auto"
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+class JSONSerializer:
+    """Standard library JSON backend, also the interface of the other backends.
+
+    `dumps` returns UTF-8 bytes without escaping non-ASCII characters. The pretty form is
+    indented, the compact form has no whitespace at all, which is what JSONL files need.
+    No fallback hook is installed, values to be written must be JSON types or subclasses of
+    them, e.g. `str` enums. `loads` raises `ValueError` on invalid input.
+    """
+
+    name = "json"
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        if pretty:
+            data = json.dumps(obj, ensure_ascii=False, indent=4)
+        else:
+            data = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+        return data.encode("utf-8")
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(JSONSerializer):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson  # noqa: PLC0415
+
+        self._orjson = orjson
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        # orjson only supports an indent of two spaces
+        option = self._orjson.OPT_INDENT_2 if pretty else 0
+        return self._orjson.dumps(obj, option=option)
+
+    def loads(self, data: bytes | str) -> Any:
+        return self._orjson.loads(data)
+
+
+class MsgspecSerializer(JSONSerializer):
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec  # noqa: PLC0415
+
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+        self._format = msgspec.json.format
+        self._decode_error = msgspec.DecodeError
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        data = self._encoder.encode(obj)
+        return self._format(data, indent=4) if pretty else data
+
+    def loads(self, data: bytes | str) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except self._decode_error as e:
+            raise ValueError(str(e)) from e
+
+
+_SERIALIZERS: dict[str, type[JSONSerializer]] = {
+    "orjson": OrjsonSerializer,
+    "msgspec": MsgspecSerializer,
+    "json": JSONSerializer,
+}
+
+
+@lru_cache
+def get_serializer(backend: str = "auto") -> JSONSerializer:
+    """Return the serializer of `backend`, "auto" picks the fastest one installed."""
+    if backend == "auto":
+        backend = next(name for name in BACKENDS if importlib.util.find_spec(name) is not None)
+    if backend not in _SERIALIZERS:
+        raise ValueError(f"Unknown JSON backend '{backend}', choose from {', '.join(BACKENDS)}")
+    return _SERIALIZERS[backend]()
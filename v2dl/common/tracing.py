@@ -0,0 +1,136 @@
+import os
+import time
+import heapq
+import asyncio
+import threading
+from contextlib import AbstractContextManager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+from v2dl.common.serializer import JSONSerializer, get_serializer
+
+NULL_SPAN: AbstractContextManager[None] = nullcontext()
+
+# the innermost open span, inherited by tasks created inside it
+current_span: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed region, recorded as a Chrome trace complete ("X") event on exit."""
+
+    __slots__ = ("args", "lane", "name", "parent", "start", "token", "tracer")
+
+    def __init__(self, tracer: "Tracer", name: str, args: dict[str, Any]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.parent: Span | None = None
+        self.lane = 0
+        self.start = 0
+
+    def __enter__(self) -> None:
+        self.parent = current_span.get()
+        self.token = current_span.set(self)
+        self.lane = self.tracer.acquire_lane()
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc: object) -> None:
+        end = time.perf_counter_ns()
+        current_span.reset(self.token)
+        self.tracer.release_lane()
+        self.tracer.record(self, end)
+
+
+class Tracer:
+    """Collect nested spans and export them as Chrome Trace Event JSON for Perfetto.
+
+    Spans of concurrent asyncio tasks are placed on separate lanes (trace "threads"), a
+    lane is reused once its task has closed all of its spans. When disabled, `span`
+    returns a shared no-op context manager.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.events: list[dict[str, Any]] = []
+        self.origin = time.perf_counter_ns()
+        self.pid = os.getpid()
+        self.lanes: dict[object, list[int]] = {}  # owner -> [lane, depth]
+        self.free_lanes: list[int] = []
+        self.lane_count = 0
+
+    def enable(self) -> None:
+        self.enabled = True
+        self.events.clear()
+        self.origin = time.perf_counter_ns()
+        self.pid = os.getpid()
+
+    def span(self, name: str, **args: Any) -> AbstractContextManager[None]:
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, args)
+
+    def acquire_lane(self) -> int:
+        owner = self.lane_owner()
+        entry = self.lanes.get(owner)
+        if entry is None:
+            if self.free_lanes:
+                lane = heapq.heappop(self.free_lanes)
+            else:
+                lane = self.lane_count
+                self.lane_count += 1
+            entry = self.lanes[owner] = [lane, 0]
+        entry[1] += 1
+        return entry[0]
+
+    def release_lane(self) -> None:
+        owner = self.lane_owner()
+        entry = self.lanes[owner]
+        entry[1] -= 1
+        if not entry[1]:
+            del self.lanes[owner]
+            heapq.heappush(self.free_lanes, entry[0])
+
+    def record(self, span: Span, end: int) -> None:
+        args = span.args
+        if span.parent is not None:
+            args["parent"] = span.parent.name
+        self.events.append({
+            "name": span.name,
+            "ph": "X",
+            "ts": (span.start - self.origin) / 1000,
+            "dur": (end - span.start) / 1000,
+            "pid": self.pid,
+            "tid": span.lane,
+            "args": args,
+        })
+
+    def export(self, path: str | Path, serializer: JSONSerializer | None = None) -> None:
+        metadata = [{"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": "v2dl"}}]
+        metadata.extend(
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": self.pid,
+                "tid": lane,
+                "args": {"name": f"lane {lane}"},
+            }
+            for lane in range(self.lane_count)
+        )
+        trace = {"traceEvents": metadata + self.events, "displayTimeUnit": "ms"}
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes((serializer or get_serializer()).dumps(trace))
+
+    @staticmethod
+    def lane_owner() -> object:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        return task if task is not None else threading.get_ident()
+
+
+TRACER = Tracer()
+span = TRACER.span
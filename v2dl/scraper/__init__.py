@@ -1,4 +1,17 @@
 from v2dl.scraper.manager import ScrapeManager
-from v2dl.scraper.tools import DownloadStatus, LogKey, UrlHandler
+from v2dl.scraper.shard import ShardCoordinator
+from v2dl.scraper.sync import SubscriptionRegistry, SubscriptionSync
+from v2dl.scraper.tools import AlbumUrl, DownloadStatus, LogKey, UrlHandler
+from v2dl.scraper.watch import UrlFileWatch
 
-__all__ = ["DownloadStatus", "LogKey", "ScrapeManager", "UrlHandler"]
+__all__ = [
+    "AlbumUrl",
+    "DownloadStatus",
+    "LogKey",
+    "ScrapeManager",
+    "ShardCoordinator",
+    "SubscriptionRegistry",
+    "SubscriptionSync",
+    "UrlFileWatch",
+    "UrlHandler",
+]
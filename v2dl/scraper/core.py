@@ -1,16 +1,39 @@
+import os
+import time
+import errno
 import asyncio
 from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any, Generic
 
 import httpx
 from lxml import html
 
-from v2dl.common import Config
+from v2dl.common import Config, DownloadError, metrics, tracing
+from v2dl.common.clearance import CLEARANCE_COOKIE, ClearanceCache
+from v2dl.common.client import ClientPool
 from v2dl.common.const import BASE_URL, HEADERS, IMAGE_PER_PAGE
-from v2dl.scraper.downloader import DirectoryCache, DownloadPathTool
+from v2dl.common.serializer import get_serializer
+from v2dl.scraper.downloader import (
+    PREALLOCATE_MIN_SIZE,
+    SEGMENT_MIN_SIZE,
+    BufferedFile,
+    ChunkSizer,
+    DirectoryCache,
+    DownloadPathTool,
+    RateLimiter,
+    WriterPool,
+)
+from v2dl.scraper.manifest import ManifestRecord, ManifestWriter
 from v2dl.scraper.tools import AlbumTracker, DownloadStatus, LogKey, UrlHandler
 from v2dl.scraper.types import AlbumResult, ImageResult, PageResultType
+from v2dl.scraper.verify import FileVerifier
+
+# assumed size of an image until the first downloads are measured
+DEFAULT_FILE_SIZE = 1024 * 1024
 
 
 class BaseScraper(Generic[PageResultType], ABC):
@@ -88,70 +111,309 @@ class ImageScraper(BaseScraper[ImageResult]):
     XPATH_ALTS = '//div[contains(@class,"album-photo")]/img/@alt'
     XPATH_VIP = ""
 
-    def __init__(self, config: Config, album_tracker: AlbumTracker) -> None:
+    def __init__(
+        self,
+        config: Config,
+        album_tracker: AlbumTracker,
+        client_pool: ClientPool | None = None,
+    ) -> None:
         super().__init__(config, album_tracker)
+        self.client_pool = client_pool or ClientPool(config)
         self.cache = DirectoryCache()
+        self.writer = WriterPool(config.static_config.writer_threads)
+        self.chunk_sizer = ChunkSizer()
+        self.limiter = RateLimiter(config.static_config.rate_limit)
+        static_config = config.static_config
+        self.verifier = FileVerifier(
+            static_config.verify_mode,
+            static_config.verify_workers,
+            static_config.quarantine_dir or Path(static_config.download_dir) / ".quarantine",
+            self.logger,
+        )
+        self.created_dirs: set[Path] = set()
+        self.bytes_downloaded = 0
+        self.files_downloaded = 0
+        self.disk_full: OSError | None = None
         self._semaphore = asyncio.Semaphore(config.static_config.max_worker)
+        manifest_path = config.static_config.manifest_path
+        self.manifest = (
+            ManifestWriter(manifest_path, get_serializer(config.static_config.json_backend))
+            if manifest_path
+            else None
+        )
 
     def get_xpath(self) -> str:
         return self.XPATH_ALBUM
 
     async def download_file(self, url: str, dest: Path) -> bool:
-        if DownloadPathTool.is_file_exists(
+        if await self.writer.run(
+            DownloadPathTool.is_file_exists,
             dest,
             self.config.static_config.force_download,
             self.cache,
             self.logger,
         ):
             self.logger.info("File exists: '%s'", dest)
+            metrics.DOWNLOADS.inc(result="skipped")
             return True
+        if self.disk_full is not None:
+            return False
 
-        headers = self.config.static_config.custom_headers or HEADERS
-
+        started = time.perf_counter()
         try:
-            DownloadPathTool.mkdir(dest.parent)
-            limits = httpx.Limits(
-                max_keepalive_connections=self.config.static_config.max_worker,
-                max_connections=self.config.static_config.max_worker * 2,
-            )
-            async with self._semaphore:
-                async with httpx.AsyncClient(
-                    headers=headers,
-                    http2=True,
-                    timeout=httpx.Timeout(30.0),
-                    follow_redirects=True,
-                    limits=limits,
-                ) as client:
-                    async with client.stream("GET", url, headers=HEADERS) as response:
-                        response.raise_for_status()
-                        ext = "." + DownloadPathTool.get_ext(response)
-                        dest = dest.with_suffix(ext)
-
-                        with open(dest, "wb") as f:
-                            speed_limit_kbps = self.config.static_config.rate_limit
-                            total_bytes = 0
-                            start_time = asyncio.get_running_loop().time()
-                            chunk_size = 8192
-
-                            async for chunk in response.aiter_bytes(chunk_size):
-                                f.write(chunk)
-
-                                if speed_limit_kbps:
-                                    total_bytes += len(chunk)
-                                    expected_time = total_bytes / (speed_limit_kbps * 1024)
-                                    elapsed_time = abs(
-                                        asyncio.get_running_loop().time() - start_time
-                                    )
-
-                                    if elapsed_time < expected_time:
-                                        await asyncio.sleep(expected_time - elapsed_time)
+            await self.ensure_dir(dest.parent)
+            dest = await self.fetch_verified(url, dest)
 
             self.logger.info("Downloaded: '%s'", dest)
+            metrics.DOWNLOADS.inc(result="ok")
+            metrics.DOWNLOAD_SECONDS.observe(time.perf_counter() - started)
             return True
         except Exception as e:
+            if isinstance(e, OSError) and e.errno == errno.ENOSPC:
+                self.disk_full = e  # the remaining downloads would fail the same way
             self.logger.error("Error downloading '%s': %s", dest, e)
+            metrics.DOWNLOADS.inc(result="failed")
             return False
 
+    async def fetch_verified(self, url: str, dest: Path) -> Path:
+        """Download `url` to `dest`, again while the verifier quarantines the file."""
+        retries = self.config.static_config.verify_retries
+        reason = None
+        for _ in range(retries + 1):
+            async with self.worker_slot():
+                path, content_length = await self.stream_to_file(url, dest)
+            reason = await self.verifier.check(path, content_length)
+            if reason is None:
+                return path
+            quarantined = await self.writer.run(self.verifier.quarantine, path)
+            self.logger.warning("Broken download '%s' moved to '%s': %s", path, quarantined, reason)
+        raise DownloadError(f"'{url}' failed verification {retries + 1} times: {reason}")
+
+    def get_headers(self, url: str) -> dict[str, str]:
+        """Send the cached Cloudflare clearance to v2ph hosts with the user agent it is bound to."""
+        if not ClearanceCache.applies_to(url):
+            return HEADERS
+        clearance = self.client_pool.clearance.get(source="image")
+        if clearance is None:
+            return HEADERS
+        return {
+            **HEADERS,
+            "User-Agent": clearance.user_agent,
+            "Cookie": f"{CLEARANCE_COOKIE}={clearance.value}",
+        }
+
+    async def stream_to_file(self, url: str, dest: Path) -> tuple[Path, int | None]:
+        """Write the response body to `dest` with the extension it declares.
+
+        Return the path and the body size declared by the response.
+        """
+        client = self.client_pool.get()
+        with tracing.span("image", url=url):
+            async with client.stream("GET", url, headers=self.get_headers(url)) as response:
+                response.raise_for_status()
+                ext = "." + DownloadPathTool.get_ext(response)
+                dest = dest.with_suffix(ext)
+
+                content_length = DownloadPathTool.get_content_length(response)
+                chunk_size = self.chunk_sizer.choose(content_length)
+                limiter = self.limiter
+                segments = self.plan_segments(response, content_length)
+                loop = asyncio.get_running_loop()
+                start_time = loop.time()
+
+                if len(segments) > 1:
+                    total_bytes = await self.download_segments(
+                        url, response, dest, segments, chunk_size, limiter
+                    )
+                else:
+                    preallocate = (
+                        content_length
+                        if self.config.static_config.preallocate
+                        and content_length
+                        and content_length >= PREALLOCATE_MIN_SIZE
+                        else None
+                    )
+                    # the body is read in the pieces the connection delivers, re-chunking them
+                    # in httpx copies every byte once more, and coalesced into chunk_size writes
+                    async with await self.writer.open(dest, chunk_size, preallocate) as f:
+                        total_bytes = await self.copy_body(response, f, limiter)
+
+                if not limiter.rate:
+                    elapsed = loop.time() - start_time
+                    self.chunk_sizer.record(total_bytes // len(segments), elapsed)
+                self.bytes_downloaded += total_bytes
+                self.files_downloaded += 1
+        return dest, content_length
+
+    async def copy_body(
+        self,
+        response: httpx.Response,
+        f: BufferedFile,
+        limiter: RateLimiter,
+        limit: int | None = None,
+    ) -> int:
+        """Copy the body, or its first `limit` bytes, to `f` and return the bytes copied.
+
+        The bytes are counted and paid to `limiter` once per write chunk of `f`, not per
+        network read, the rest at the end of the body.
+        """
+        total_bytes = 0
+        unpaid = 0
+        async for chunk in response.aiter_bytes():
+            if limit is not None and total_bytes + len(chunk) >= limit:
+                chunk = chunk[: limit - total_bytes]
+            await f.write(chunk)
+            total_bytes += len(chunk)
+            unpaid += len(chunk)
+            if unpaid >= f.buffer_size:
+                metrics.DOWNLOADED_BYTES.inc(unpaid)
+                await limiter.consume(unpaid)
+                unpaid = 0
+            if total_bytes == limit:
+                break
+        if unpaid:
+            metrics.DOWNLOADED_BYTES.inc(unpaid)
+            await limiter.consume(unpaid)
+        return total_bytes
+
+    def plan_segments(self, response: httpx.Response, content_length: int | None) -> list[range]:
+        """Return the byte ranges to fetch in parallel, a single range for a normal download."""
+        segments = self.config.static_config.download_segments
+        if (
+            segments < 2
+            or content_length is None
+            or content_length < SEGMENT_MIN_SIZE
+            or response.headers.get("Accept-Ranges") != "bytes"
+            or not hasattr(os, "pwrite")
+        ):
+            return [range(content_length or 0)]
+        return DownloadPathTool.split_ranges(content_length, segments)
+
+    async def download_segments(
+        self,
+        url: str,
+        response: httpx.Response,
+        dest: Path,
+        segments: list[range],
+        chunk_size: int,
+        limiter: RateLimiter,
+    ) -> int:
+        """Fetch the ranges of a large file concurrently and write them in place.
+
+        The first range is read from the already open `response`. Every other range is
+        taken by a helper once it gets a free worker slot, the slot of this download works
+        through whatever is left, so a busy limiter never blocks the file. Returns the
+        total length after checking that every range is complete.
+        """
+        size = segments[-1].stop
+        preallocate = size if self.config.static_config.preallocate else None
+        fileobj, _ = await self.writer.run(WriterPool.open_file, dest, preallocate)
+        queue = deque(segments[1:])
+        started = [False] * len(queue)
+
+        async def fetch(segment: range, source: httpx.Response | None = None) -> None:
+            part = BufferedFile(self.writer, fileobj, chunk_size, offset=segment.start)
+            with tracing.span("segment", start=segment.start, stop=segment.stop):
+                if source is not None:
+                    received = await self.copy_body(source, part, limiter, len(segment))
+                else:
+                    headers = {
+                        **self.get_headers(url),
+                        "Range": f"bytes={segment.start}-{segment.stop - 1}",
+                    }
+                    client = self.client_pool.get()
+                    async with client.stream("GET", url, headers=headers) as range_response:
+                        if range_response.status_code != 206:
+                            raise DownloadError(
+                                f"Range request for '{url}' answered {range_response.status_code}"
+                            )
+                        received = await self.copy_body(range_response, part, limiter, len(segment))
+                await part.drain()
+            if received != len(segment):
+                raise DownloadError(
+                    f"Incomplete range {segment.start}-{segment.stop - 1} of '{url}': "
+                    f"{received} of {len(segment)} bytes"
+                )
+
+        async def work_queue() -> None:
+            while queue:
+                await fetch(queue.popleft())
+
+        async def helper(index: int) -> None:
+            async with self.worker_slot():
+                if queue:
+                    started[index] = True
+                    await work_queue()
+
+        helpers = [asyncio.create_task(helper(i)) for i in range(len(queue))]
+        try:
+            await fetch(segments[0], response)
+            await work_queue()
+            # helpers still waiting for a slot have nothing left to do
+            for index, task in enumerate(helpers):
+                if not started[index]:
+                    task.cancel()
+            for result in await asyncio.gather(*helpers, return_exceptions=True):
+                if isinstance(result, Exception):
+                    raise result
+        except BaseException:
+            for task in helpers:
+                task.cancel()
+            await asyncio.gather(*helpers, return_exceptions=True)
+            await self.writer.run(fileobj.close)
+            # a file with missing ranges must not count as downloaded
+            await self.writer.run(dest.unlink, missing_ok=True)
+            raise
+        await self.writer.run(fileobj.close)
+        return size
+
+    async def check_free_space(self, files: int) -> None:
+        """Raise DownloadError if `files` more images would leave less than `min_free_space`."""
+        if self.disk_full is not None:
+            raise DownloadError(f"Download directory is full: {self.disk_full}")
+
+        min_free_space = self.config.static_config.min_free_space * 2**20
+        if not min_free_space or not files:
+            return
+
+        if self.files_downloaded:
+            file_size = self.bytes_downloaded / self.files_downloaded
+        else:
+            file_size = DEFAULT_FILE_SIZE
+        download_dir = self.config.static_config.download_dir
+        free_space = await self.writer.run(DownloadPathTool.free_space, download_dir)
+        if free_space < files * file_size + min_free_space:
+            raise DownloadError(
+                f"Not enough free space in '{download_dir}': {free_space / 2**20:.0f} MiB left, "
+                f"about {files * file_size / 2**20:.0f} MiB needed for {files} images "
+                f"and {min_free_space / 2**20:.0f} MiB to keep free"
+            )
+
+    async def ensure_dir(self, folder: Path) -> None:
+        if folder not in self.created_dirs:
+            await self.writer.run(DownloadPathTool.mkdir, folder)
+            self.created_dirs.add(folder)
+
+    def close(self) -> None:
+        self.writer.shutdown()
+        self.verifier.shutdown()
+
+    @asynccontextmanager
+    async def worker_slot(self) -> AsyncIterator[None]:
+        """Hold one of the `max_worker` slots, tracked by the queue and in-flight gauges."""
+        metrics.DOWNLOAD_QUEUE_DEPTH.inc()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            metrics.DOWNLOAD_QUEUE_DEPTH.dec()
+
+        metrics.DOWNLOADS_IN_FLIGHT.inc()
+        try:
+            yield
+        finally:
+            metrics.DOWNLOADS_IN_FLIGHT.dec()
+            self._semaphore.release()
+
     async def process_page_links(
         self,
         url: str,
@@ -172,8 +434,13 @@ class ImageScraper(BaseScraper[ImageResult]):
         album_name = UrlHandler.extract_album_name(alts)
         dir_ = self.config.static_config.download_dir
 
+        clean_url = UrlHandler.remove_query_params(url)
+        if not self.config.static_config.dry_run:
+            await self.check_free_space(len(page_links))
+
         download_tasks = []
         download_paths = []
+        records = []
         page_link_ctr = 0
         for i, available in enumerate(available_images):
             if not available:
@@ -186,9 +453,14 @@ class ImageScraper(BaseScraper[ImageResult]):
 
             filename = f"{(idx + i):03d}"
             dest = DownloadPathTool.get_file_dest(dir_, album_name, filename)
-            download_tasks.append(self.download_file(image_url, dest))
+            records.append(ManifestRecord(clean_url, album_name, filename, image_url))
+            if not self.config.static_config.dry_run:
+                download_tasks.append(self.download_file(image_url, dest))
             download_paths.append(dest)
 
+        if self.manifest is not None:
+            self.manifest.write(records)
+
         if download_tasks:
             download_results = await asyncio.gather(*download_tasks)
 
@@ -197,17 +469,51 @@ class ImageScraper(BaseScraper[ImageResult]):
 
             if failed_downloads > 0:
                 self.logger.warning("Failed to download %d images", failed_downloads)
+            self.album_tracker.add_real_num(clean_url, successful_downloads)
+            if self.disk_full is not None:
+                self.album_tracker.update_download_log(
+                    clean_url, {LogKey.status: DownloadStatus.FAIL}
+                )
+                raise DownloadError(f"Download directory is full: {self.disk_full}")
 
         self.logger.info("Found %d images on page %d", len(page_links), page_num)
 
         destination = download_paths[0].parent if download_paths else Path(dir_) / album_name
 
         album_status = DownloadStatus.VIP if is_VIP else DownloadStatus.OK
-        clean_url = UrlHandler.remove_query_params(url)
         self.album_tracker.update_download_log(
             clean_url, {LogKey.status: album_status, LogKey.dest: str(destination)}
         )
 
+    async def download_records(self, album_url: str, records: list[ManifestRecord]) -> bool:
+        """Download the manifest records of one album, return True if all succeeded.
+
+        The destination is resolved against the current download directory instead of the
+        one used while scraping.
+        """
+        dir_ = self.config.static_config.download_dir
+        await self.check_free_space(len(records))
+        download_results = await asyncio.gather(*[
+            self.download_file(record.url, record.get_dest(dir_)) for record in records
+        ])
+
+        failed_downloads = len(download_results) - sum(download_results)
+        if failed_downloads > 0:
+            self.logger.warning("Failed to download %d images", failed_downloads)
+
+        album_status = DownloadStatus.FAIL if failed_downloads else DownloadStatus.OK
+        destination = records[0].get_dest(dir_).parent
+        self.album_tracker.update_download_log(
+            album_url,
+            {
+                LogKey.status: album_status,
+                LogKey.dest: str(destination),
+                LogKey.expect_num: len(records),
+                LogKey.real_num: len(records) - failed_downloads,
+            },
+        )
+        return not failed_downloads
+
     def get_available_images(self, tree: html.HtmlElement) -> list[bool]:
         album_photos = tree.xpath('//div[contains(@class,"album-photo")]//img')
         result = []
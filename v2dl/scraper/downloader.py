@@ -1,11 +1,19 @@
+import io
 import os
 import re
 import sys
+import errno
+import shutil
+import asyncio
 import logging
+import threading
 from collections import OrderedDict
 from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from mimetypes import guess_extension
 from pathlib import Path
+from types import TracebackType
+from typing import ParamSpec, TypeVar
 
 import httpx
 from pathvalidate import sanitize_filename
@@ -15,16 +23,30 @@ from v2dl.common.model import PathType
 
 logger = logging.getLogger()
 
+P = ParamSpec("P")
+T = TypeVar("T")
+
+WRITE_BUFFER_SIZE = 256 * 1024
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 1024 * 1024
+# only reserve space for large files like videos, images are written in a few blocks anyway
+PREALLOCATE_MIN_SIZE = 1024 * 1024
+# files from this size are fetched as parallel byte ranges of at least SEGMENT_MIN_PART
+SEGMENT_MIN_SIZE = 16 * 1024 * 1024
+SEGMENT_MIN_PART = 4 * 1024 * 1024
+
 
 class DirectoryCache:
     def __init__(self, max_cache_size: int = 1024) -> None:
         self._cache: OrderedDict[Path, set[str]] = OrderedDict()
         self._max_cache_size = max_cache_size
+        self._lock = threading.Lock()  # filled from the writer threads
 
     def get_files(self, directory: Path) -> set[str]:
-        if directory in self._cache:
-            self._cache.move_to_end(directory)
-            return self._cache[directory]
+        with self._lock:
+            if directory in self._cache:
+                self._cache.move_to_end(directory)
+                return self._cache[directory]
 
         try:
             files = set()
@@ -38,12 +60,215 @@ class DirectoryCache:
             logging.error(f"Directory cache error: {directory}: {e}")
             files = set()
 
-        self._cache[directory] = files
-        if len(self._cache) > self._max_cache_size:
-            self._cache.popitem(last=False)
+        with self._lock:
+            self._cache[directory] = files
+            if len(self._cache) > self._max_cache_size:
+                self._cache.popitem(last=False)
         return files
 
 
+class WriterPool:
+    """Run the blocking file system calls of the downloader on a dedicated thread pool.
+
+    Slow disks, e.g. a NAS, then only delay the writer threads and never the event loop
+    that reads the network streams. The executor is created on first use.
+    """
+
+    def __init__(self, max_workers: int = 4, buffer_size: int = WRITE_BUFFER_SIZE) -> None:
+        self.max_workers = max_workers
+        self.buffer_size = buffer_size
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="v2dl-writer")
+        return self._executor
+
+    def submit(self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> Future[T]:
+        return self.executor.submit(func, *args, **kwargs)
+
+    async def run(self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    async def open(
+        self, path: Path, buffer_size: int | None = None, preallocate: int | None = None
+    ) -> "BufferedFile":
+        """Open `path` for writing, reserving `preallocate` bytes when given.
+
+        Raises OSError with ENOSPC right away if the reserved size does not fit.
+        """
+        f, preallocated = await self.run(self.open_file, path, preallocate)
+        return BufferedFile(self, f, buffer_size or self.buffer_size, preallocated)
+
+    @staticmethod
+    def open_file(path: Path, preallocate: int | None) -> tuple[io.FileIO, bool]:
+        f = io.FileIO(path, "wb")
+        try:
+            preallocated = DownloadPathTool.preallocate(f, preallocate) if preallocate else False
+        except BaseException:
+            f.close()
+            path.unlink(missing_ok=True)  # an empty file would count as downloaded
+            raise
+        return f, preallocated
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+class BufferedFile:
+    """Collect chunks in memory and write them in large blocks on the writer pool.
+
+    At most one write per file is in flight, the next full buffer waits for it. A file
+    therefore holds no more than two buffers, and a slow disk slows down its own stream
+    instead of buffering it without bound.
+
+    With an `offset`, the data is written with `os.pwrite` from that position on, so that
+    several instances can fill the ranges of one file. Those are drained, not closed.
+    """
+
+    def __init__(
+        self,
+        pool: WriterPool,
+        f: io.FileIO,
+        buffer_size: int,
+        preallocated: bool = False,
+        offset: int | None = None,
+    ) -> None:
+        self.pool = pool
+        self.file = f
+        self.buffer_size = buffer_size
+        self.preallocated = preallocated
+        self.offset = offset
+        self.chunks: list[bytes] = []
+        self.buffered = 0
+        self.pending: Future[None] | None = None
+
+    async def write(self, data: bytes) -> None:
+        self.chunks.append(data)
+        self.buffered += len(data)
+        if self.buffered >= self.buffer_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        await self.wait()
+        if self.chunks:
+            # a single chunk is handed over as is, several are joined with one copy
+            data = self.chunks[0] if len(self.chunks) == 1 else b"".join(self.chunks)
+            self.chunks, self.buffered = [], 0
+            if self.offset is None:
+                self.pending = self.pool.submit(self._write_all, data)
+            else:
+                self.pending = self.pool.submit(self._pwrite_all, data, self.offset)
+                self.offset += len(data)
+
+    async def wait(self) -> None:
+        if self.pending is not None:
+            pending, self.pending = self.pending, None
+            await asyncio.wrap_future(pending)
+
+    async def drain(self) -> None:
+        await self.flush()
+        await self.wait()
+
+    async def close(self) -> None:
+        try:
+            await self.drain()
+        finally:
+            await self.pool.run(self._close)
+
+    def _close(self) -> None:
+        try:
+            if self.preallocated:
+                # drop the reserved tail of a short or failed download
+                self.file.truncate(self.file.tell())
+        finally:
+            self.file.close()
+
+    def _write_all(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            written = self.file.write(view)
+            view = view[written:]
+
+    def _pwrite_all(self, data: bytes, offset: int) -> None:
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(self.file.fileno(), view, offset)
+            view, offset = view[written:], offset + written
+
+    async def __aenter__(self) -> "BufferedFile":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if exc_type is not None:
+            self.chunks, self.buffered = [], 0  # the download failed, only release the file
+        await self.close()
+
+
+class RateLimiter:
+    """Keep the bytes passed to `consume` under `rate_kbps`, shared by all downloads.
+
+    Every call books its bytes after the ones already booked and sleeps until they are
+    due, so concurrent downloads and ranges split the rate. Idle time is credited for at
+    most `burst` seconds, a pause between albums does not allow a burst afterwards.
+    """
+
+    def __init__(self, rate_kbps: int, burst: float = 1.0) -> None:
+        self.rate = rate_kbps * 1024
+        self.burst = burst
+        self.due = 0.0  # loop time when the booked bytes have been paid for
+
+    async def consume(self, nbytes: int) -> None:
+        if not self.rate:
+            return
+        now = asyncio.get_running_loop().time()
+        self.due = max(self.due, now - self.burst) + nbytes / self.rate
+        if self.due > now:
+            await asyncio.sleep(self.due - now)
+
+
+class ChunkSizer:
+    """Choose the write size of a download from its length and the recent throughput.
+
+    Larger writes mean fewer syscalls and writer thread hand-offs per file. A file is
+    written in at least a few chunks so its buffers stay small, and a fast connection
+    gets the data of `window` seconds per chunk.
+    """
+
+    def __init__(
+        self,
+        min_size: int = MIN_CHUNK_SIZE,
+        max_size: int = MAX_CHUNK_SIZE,
+        window: float = 0.05,
+    ) -> None:
+        self.min_size = min_size
+        self.max_size = max_size
+        self.window = window
+        self.throughput = 0.0  # bytes per second of one stream, smoothed
+
+    def choose(self, content_length: int | None) -> int:
+        size = self.throughput * self.window
+        if content_length:
+            size = min(max(size, content_length / 4), content_length)
+
+        size = 1 << max(int(size) - 1, 0).bit_length()  # round up to a power of two
+        return min(max(size, self.min_size), self.max_size)
+
+    def record(self, nbytes: int, seconds: float) -> None:
+        if seconds <= 0 or not nbytes:
+            return
+        rate = nbytes / seconds
+        self.throughput = rate if not self.throughput else 0.8 * self.throughput + 0.2 * rate
+
+
 class DownloadPathTool:
     @staticmethod
     def mkdir(folder_path: PathType) -> None:
@@ -103,6 +328,50 @@ class DownloadPathTool:
         logger.warning(f"Unrecognized extension of 'url', using default {default_ext}")
         return default_ext
 
+    @staticmethod
+    def preallocate(f: io.FileIO, size: int) -> bool:
+        """Reserve disk space for `size` bytes, return False if the file system can't.
+
+        Raises OSError with ENOSPC when the disk does not have the space. Without
+        `posix_fallocate` (macOS, Windows) only the free space is checked.
+        """
+        if not hasattr(os, "posix_fallocate"):
+            if shutil.disk_usage(os.path.dirname(f.name)).free < size:
+                raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC), f.name)
+            return False
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                raise
+            return False  # EOPNOTSUPP or EINVAL on file systems without support
+        return True
+
+    @staticmethod
+    def split_ranges(size: int, parts: int, min_part: int = SEGMENT_MIN_PART) -> list[range]:
+        """Split `size` bytes into at most `parts` ranges of at least `min_part` bytes."""
+        parts = max(1, min(parts, size // min_part))
+        step = -(-size // parts)
+        return [range(start, min(start + step, size)) for start in range(0, size, step)]
+
+    @staticmethod
+    def free_space(path: PathType) -> int:
+        """Return the free bytes of the file system `path` is, or will be, created on."""
+        path = Path(path).absolute()
+        while not path.exists() and path != path.parent:
+            path = path.parent
+        return shutil.disk_usage(path).free
+
+    @staticmethod
+    def get_content_length(response: httpx.Response) -> int | None:
+        """Return the declared body size, None if missing or the body is encoded."""
+        if response.headers.get("Content-Encoding", "identity") != "identity":
+            return None
+        try:
+            return int(response.headers["Content-Length"])
+        except (KeyError, ValueError):
+            return None
+
     @staticmethod
     def get_ext(
         response: httpx.Response,
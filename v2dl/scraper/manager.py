@@ -1,19 +1,45 @@
 import re
+import time
+import asyncio
+from collections.abc import Callable
 from logging import Logger
-from typing import TYPE_CHECKING, Any, Generic
-
-from v2dl.common import Config, RuntimeConfig, ScrapeError
+from typing import TYPE_CHECKING, Any, Generic, TypeAlias
+
+from lxml import html
+
+from v2dl.common import (
+    ClientPool,
+    Config,
+    DownloadError,
+    RuntimeConfig,
+    ScrapeError,
+    metrics,
+    tracing,
+)
 from v2dl.scraper.core import (
     AlbumScraper,
     BaseScraper,
     ImageScraper,
 )
-from v2dl.scraper.tools import AlbumTracker, DownloadStatus, LogKey, MetadataHandler, UrlHandler
+from v2dl.scraper.manifest import group_by_album, read_manifest
+from v2dl.scraper.planner import AlbumPlanner, ScrapeProgress, format_duration
+from v2dl.scraper.tools import (
+    AlbumTracker,
+    DownloadStatus,
+    LogKey,
+    MetadataHandler,
+    UrlFileReader,
+    UrlHandler,
+    UrlPreprocessor,
+)
 from v2dl.scraper.types import PageResultType, ScrapeType
 
 if TYPE_CHECKING:
     from v2dl.web_bot.base import BaseBot
 
+# receives the event name and its payload
+ScrapeListener: TypeAlias = Callable[[str, dict[str, Any]], None]
+
 
 class ScrapeManager:
     """Manage the starting and ending of the scraper."""
@@ -21,11 +47,13 @@ class ScrapeManager:
     def __init__(
         self,
         config: Config,
-        web_bot: "BaseBot",
+        web_bot: "BaseBot | None",
+        client_pool: ClientPool | None = None,
     ) -> None:
         self.config = config
         self.runtime_config = config.runtime_config
         self.web_bot = web_bot
+        self.client_pool = client_pool or ClientPool(config)
         self.logger = config.runtime_config.logger
 
         self.no_log = False  # flag to not log download status
@@ -39,36 +67,129 @@ class ScrapeManager:
             "album_image": ImageScraper(
                 config,
                 self.album_tracker,
+                self.client_pool,
             ),
         }
 
         self.metadata_handler = MetadataHandler(config, self.album_tracker)
+        self.planner = AlbumPlanner.from_state_dir(config.static_config.state_dir)
         self.processed_urls: set[str] = set()
+        self.listeners: list[ScrapeListener] = [self.metadata_handler.handle_event]
+
+    def add_listener(self, listener: ScrapeListener) -> None:
+        """Register a callback for scraping progress events."""
+        self.listeners.append(listener)
+
+    def emit(self, event: str, **data: Any) -> None:
+        for listener in self.listeners:
+            listener(event, data)
 
     async def start_scraping(self) -> bool:
         """Start scraping based on URL type."""
+        if self.runtime_config.manifest_file:
+            return await self.start_download_only()
+
         try:
-            urls = UrlHandler.load_urls(self.runtime_config.url, self.runtime_config.url_file)
+            if self.runtime_config.url_file:
+                return await self.scrape_url_file(self.runtime_config.url_file)
+
+            urls = self.load_input_urls()
             if self.__check_early_return(urls):
                 return False
 
             for url in urls:
-                url = UrlHandler.update_language(url, self.config.static_config.language)
-                self.runtime_config.url = url
-                self.update_runtime_config(self.runtime_config)
-                await self.scrape(url)
-
-                if self.runtime_config.url_file:
-                    UrlHandler.mark_processed_url(self.runtime_config.url_file, url)
+                await self.scrape_url(url)
 
         except ScrapeError as e:
             self.logger.exception("Scraping error: '%s'", e)
             return False
         finally:
-            if self.config.static_config.terminate:
+            if self.config.static_config.terminate and self.web_bot is not None:
                 self.web_bot.close_driver()
         return True
 
+    async def start_download_only(self) -> bool:
+        """Replay a manifest written by `ImageScraper`, no web bot involved."""
+        manifest_file = self.runtime_config.manifest_file
+        strategy = self.strategies["album_image"]
+        if not isinstance(strategy, ImageScraper):
+            raise TypeError(f"Expected an ImageScraper strategy, got {type(strategy).__name__}")
+
+        try:
+            for album_url, records in group_by_album(read_manifest(manifest_file)):
+                if (
+                    self.album_tracker.is_downloaded(album_url)
+                    and not self.config.static_config.force_download
+                ):
+                    self.logger.info("Album %s already downloaded, skipping.", album_url)
+                    continue
+
+                self.processed_urls.add(album_url)
+                self.logger.info("Downloading %d images of album %s", len(records), album_url)
+                if await strategy.download_records(album_url, records):
+                    self.album_tracker.log_downloaded(album_url)
+                self.emit("album_done", url=album_url, images=len(records))
+
+        except DownloadError as e:
+            self.logger.error("Download stopped: %s", e)
+            return False
+        except (OSError, ValueError, TypeError) as e:
+            self.logger.exception("Invalid manifest '%s': %s", manifest_file, e)
+            self.no_log = True
+            return False
+        return True
+
+    async def scrape_url_file(self, url_file: str) -> bool:
+        """Scrape a URL file in file order while reading it, resuming from its checkpoint.
+
+        The file is never loaded nor rewritten, the checkpoint advances after every URL.
+        """
+        reader = UrlFileReader(
+            url_file,
+            self.logger,
+            self.config.static_config.state_dir,
+            resume=self.config.static_config.resume,
+        )
+        preprocessor = self.create_preprocessor()
+        started = time.monotonic()
+        for url in preprocessor.process(reader):
+            await self.scrape_url(url)
+            reader.commit()
+            progress = reader.progress
+            eta = (time.monotonic() - started) * (1 - progress) / progress if progress else 0
+            self.logger.info(
+                "Progress %.0f%% of %s, ETA %s", 100 * progress, url_file, format_duration(eta)
+            )
+        reader.commit()  # skipped lines at the end of the file
+        preprocessor.report()
+
+        if not preprocessor.kept:
+            self.logger.info(f"No new urls found in {url_file}")
+            self.no_log = True
+            return False
+        return True
+
+    def load_input_urls(self, reader: UrlFileReader | None = None) -> list[str]:
+        """Read all the input URLs through `UrlPreprocessor` before any browser work."""
+        preprocessor = self.create_preprocessor()
+        urls = reader if reader is not None else [self.runtime_config.url]
+        input_urls = list(preprocessor.process(urls))
+        preprocessor.report()
+        return input_urls
+
+    def create_preprocessor(self) -> UrlPreprocessor:
+        return UrlPreprocessor(
+            self.album_tracker,
+            self.logger,
+            self.config.static_config.language,
+            skip_downloaded=not self.config.static_config.force_download,
+        )
+
+    def get_web_bot(self) -> "BaseBot":
+        if self.web_bot is None:
+            raise ScrapeError("Scraping requires a web bot, which is not available")
+        return self.web_bot
+
     def __check_early_return(self, urls: list[str]) -> bool:
         if not urls:
             if self.runtime_config.url:
@@ -80,6 +201,15 @@ class ScrapeManager:
             return True
         return False
 
+    async def scrape_url(self, url: str) -> str:
+        """Scrape one input URL in the configured language, return the URL actually used."""
+        url = UrlHandler.update_language(url, self.config.static_config.language)
+        self.runtime_config.url = url
+        self.update_runtime_config(self.runtime_config)
+        await self.scrape(url)
+        self.emit("url_done", url=url)
+        return url
+
     async def scrape(self, url: str) -> None:
         """Main entry point for scraping operations."""
         scrape_type = UrlHandler.get_scrape_type(url)
@@ -103,21 +233,66 @@ class ScrapeManager:
     async def scrape_album_list(self, url: str, target_page: int | list[int]) -> None:
         """Handle scraping of album lists."""
         strategy = self.strategies["album_list"]
-        scraper = PageScraper(self.web_bot, strategy, self.logger)
+        scraper = PageScraper(self.get_web_bot(), strategy, self.logger)
 
         album_links = await scraper.scrape_all_pages(url, target_page)
         self.logger.info("A total of %d albums found for %s", len(album_links), url)
-
+        await self.scrape_albums(album_links)
+
+    async def scrape_albums(self, album_links: list[str]) -> None:
+        """Scrape the albums found in an album list, the biggest recorded albums first."""
+        if self.config.static_config.plan_albums:
+            await self.plan_albums(album_links)
+        album_links = self.planner.order(album_links)
+        progress = ScrapeProgress(self.logger, [self.planner.estimate(u) for u in album_links])
         temp_original_url = self.runtime_config.url
         for album_url in album_links:
             self.runtime_config.url = album_url
             self.update_runtime_config(self.runtime_config)
             await self.scrape_album(album_url, 1)
             self.processed_urls.add(UrlHandler.remove_query_params(album_url))
+            progress.advance(self.planner.estimate(album_url))
 
         self.runtime_config.url = temp_original_url
         self.update_runtime_config(self.runtime_config)
 
+    async def plan_albums(self, album_links: list[str]) -> None:
+        """Record the size of the albums missing from the plan from their first page.
+
+        Costs one page load, and its read quota, per album never scraped before.
+        """
+        force_download = self.config.static_config.force_download
+        pending = [
+            url
+            for url in album_links
+            if not self.planner.is_recorded(url)
+            and (force_download or not self.album_tracker.is_downloaded(self.planner.get_key(url)))
+        ]
+        if not pending:
+            return
+
+        strategy = self.strategies["album_image"]
+        scraper = PageScraper(self.get_web_bot(), strategy, self.logger)
+        semaphore = asyncio.Semaphore(scraper.concurrency)
+
+        async def measure(url: str) -> None:
+            async with semaphore:
+                html_content = await scraper.fetch_page(UrlHandler.add_page_num(url, 1))
+            tree = scraper.parse_page(html_content)
+            if tree is None or strategy.is_vip_page(tree):
+                return
+            max_page = UrlHandler.get_max_page(tree)
+            # a single page album is measured completely
+            images = len(tree.xpath(strategy.get_xpath())) if max_page == 1 else None
+            self.planner.record(url, max_page, images)
+
+        self.logger.info("Planning %d albums from their first page", len(pending))
+        results = await asyncio.gather(*(measure(url) for url in pending), return_exceptions=True)
+        for url, result in zip(pending, results, strict=True):
+            if isinstance(result, Exception):
+                self.logger.warning("Failed to plan album %s: %s", url, result)
+        self.save_plan()
+
     async def scrape_album(self, album_url: str, target_page: int | list[int]) -> None:
         """Handle scraping of a single album page."""
         clean_url = UrlHandler.remove_query_params(album_url)
@@ -129,19 +304,27 @@ class ScrapeManager:
             return
 
         strategy = self.strategies["album_image"]
-        scraper = PageScraper(self.web_bot, strategy, self.logger)
-
-        image_links = await scraper.scrape_all_pages(album_url, target_page)
+        scraper = PageScraper(self.get_web_bot(), strategy, self.logger)
+        scraper.expected_pages = self.planner.get_max_page(clean_url)
+
+        # real_num is counted up by the downloader while the pages are processed
+        self.album_tracker.update_download_log(clean_url, {LogKey.real_num: 0})
+        with tracing.span("album", url=clean_url):
+            image_links = await scraper.scrape_all_pages(album_url, target_page)
+        if scraper.max_page:
+            # the image count is only known when the whole album was scraped
+            complete = target_page == 1
+            self.planner.record(clean_url, scraper.max_page, len(image_links) if complete else None)
         self.album_tracker.update_download_log(
             album_url,  # 使用專輯 URL 而不是 runtime_config.url
             {LogKey.expect_num: len(image_links)},
         )
-        if not image_links:
-            return
-
-        album_name = re.sub(r"\s*\d+$", "", image_links[0][1]) if image_links else "Unknown Album"
-        self.logger.info("Found %d images in album %s", len(image_links), album_name)
-        self.album_tracker.log_downloaded(clean_url)
+        if image_links:
+            album_name = re.sub(r"\s*\d+$", "", image_links[0][1])
+            self.logger.info("Found %d images in album %s", len(image_links), album_name)
+            if not self.config.static_config.dry_run:
+                self.album_tracker.log_downloaded(clean_url)
+        self.emit("album_done", url=clean_url, images=len(image_links))
 
     def update_runtime_config(self, runtime_config: RuntimeConfig) -> None:
         if not isinstance(runtime_config, RuntimeConfig):
@@ -152,24 +335,36 @@ class ScrapeManager:
             strategy.runtime_config = runtime_config
 
     def log_final_status(self) -> None:
-        download_status = self.album_tracker.get_download_status
-        if self.no_log or not download_status:
+        album_tracker = self.album_tracker
+        if self.no_log or not (album_tracker.get_download_status or album_tracker.final_status):
             return
 
         self.logger.info("Download finished, showing download status")
         for url in self.processed_urls:
-            if url in download_status:
-                album_status = download_status[url]
-                if album_status[LogKey.status] == DownloadStatus.FAIL:
-                    self.logger.error(f"{url}: Unexpected error")
-                elif album_status[LogKey.status] == DownloadStatus.VIP:
-                    self.logger.warning(f"{url}: VIP images found")
-                else:
-                    self.logger.info(f"{url}: Download successful")
+            status = album_tracker.get_final_status(url)
+            if status == DownloadStatus.FAIL:
+                self.logger.error(f"{url}: Unexpected error")
+            elif status == DownloadStatus.VIP:
+                self.logger.warning(f"{url}: VIP images found")
+            elif status is not None:
+                self.logger.info(f"{url}: Download successful")
 
     def write_metadata(self) -> None:
         self.metadata_handler.write_metadata()
 
+    def save_plan(self) -> None:
+        try:
+            self.planner.save()
+        except OSError as e:
+            self.logger.error("Failed to save the album plan: %s", e)
+
+    async def aclose(self) -> None:
+        self.save_plan()
+        strategy = self.strategies["album_image"]
+        if isinstance(strategy, ImageScraper):
+            strategy.close()
+        await self.client_pool.aclose()
+
 
 class PageScraper(Generic[PageResultType]):
     """Handles the scraping of individual pages."""
@@ -183,6 +378,11 @@ class PageScraper(Generic[PageResultType]):
         self.web_bot = web_bot
         self.strategy = strategy
         self.logger = logger
+        self.max_page = 0  # known after the first page is parsed
+        self.expected_pages = 0  # pages of the album in an earlier run, fetched ahead
+        self.concurrency = max(getattr(web_bot, "page_concurrency", 1), 1)
+        # stops the pagination after a page whose results it returns True for
+        self.stop_when: Callable[[list[Any]], bool] | None = None
 
     async def scrape_all_pages(self, url: str, target_page: int | list[int]) -> list[Any]:
         """Scrape multiple pages according to target configuration."""
@@ -197,6 +397,9 @@ class PageScraper(Generic[PageResultType]):
             url,
         )
 
+        if self.concurrency > 1 and not scrape_one_page:
+            return await self.scrape_pages_concurrently(url, page, target_page)
+
         while True:
             page_results, should_continue = await self.scrape_page(url, page)
             all_results.extend(page_results)
@@ -207,12 +410,82 @@ class PageScraper(Generic[PageResultType]):
 
         return all_results
 
+    async def scrape_pages_concurrently(
+        self, url: str, first_page: int, target_page: int | list[int]
+    ) -> list[Any]:
+        """Fetch up to `concurrency` pages at once and process them in page order.
+
+        Every fetched page may reveal more pages in its pagination, those are fetched as
+        soon as they are known. Processing stops like the sequential loop, the fetches of
+        pages after the last processed page are cancelled.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks: dict[int, asyncio.Task[html.HtmlElement | None]] = {}
+        next_page: int | None = first_page
+
+        def schedule(at_least_one: bool = False) -> None:
+            nonlocal next_page
+            last_known = max(self.max_page, self.expected_pages)
+            while next_page is not None and (at_least_one or next_page <= last_known):
+                tasks[next_page] = asyncio.create_task(fetch(next_page))
+                next_page = UrlHandler.handle_pagination(next_page, target_page)
+                at_least_one = False
+
+        async def fetch(page: int) -> html.HtmlElement | None:
+            async with semaphore:
+                html_content = await self.fetch_page(UrlHandler.add_page_num(url, page))
+            tree = self.parse_page(html_content)
+            if tree is not None:
+                self.max_page = max(self.max_page, UrlHandler.get_max_page(tree))
+                schedule()
+            return tree
+
+        all_results: list[Any] = []
+        page: int | None = first_page
+        schedule(at_least_one=True)
+        try:
+            while page is not None:
+                if page not in tasks:
+                    schedule(at_least_one=True)
+                full_url = UrlHandler.add_page_num(url, page)
+                tree = await tasks[page]
+                with tracing.span("page", url=full_url):
+                    page_results, should_continue = await self.process_page(
+                        url, page, full_url, tree
+                    )
+                all_results.extend(page_results)
+                if not should_continue:
+                    break
+                page = UrlHandler.handle_pagination(page, target_page)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        return all_results
+
     async def scrape_page(self, url: str, page: int) -> tuple[list[PageResultType], bool]:
         """Scrape a single page and return results and continuation flag."""
         full_url = UrlHandler.add_page_num(url, page)
-        html_content = await self.web_bot.auto_page_scroll(full_url, page_sleep=0)
-        tree = UrlHandler.parse_html(html_content, self.logger)
-
+        with tracing.span("page", url=full_url):
+            html_content = await self.fetch_page(full_url)
+            tree = self.parse_page(html_content)
+            return await self.process_page(url, page, full_url, tree)
+
+    async def fetch_page(self, full_url: str) -> str:
+        kind = "album_list" if isinstance(self.strategy, AlbumScraper) else "album_image"
+        with metrics.PAGE_FETCH_SECONDS.time(kind=kind), tracing.span("fetch"):
+            html_content = await self.web_bot.auto_page_scroll(full_url, page_sleep=0)
+        metrics.PAGES_FETCHED.inc(kind=kind)
+        return html_content
+
+    def parse_page(self, html_content: str) -> html.HtmlElement | None:
+        with tracing.span("parse"):
+            return UrlHandler.parse_html(html_content, self.logger)
+
+    async def process_page(
+        self, url: str, page: int, full_url: str, tree: html.HtmlElement | None
+    ) -> tuple[list[PageResultType], bool]:
         if tree is None:
             return [], False
 
@@ -239,8 +512,13 @@ class PageScraper(Generic[PageResultType]):
         await self.strategy.process_page_links(url, page_links, page_result, tree, page)
 
         # Check if we've reached the last page
-        should_continue = page < UrlHandler.get_max_page(tree)
+        max_page = UrlHandler.get_max_page(tree)
+        self.max_page = max(self.max_page, max_page)
+        should_continue = page < max_page
         if not should_continue:
             self.logger.info("Reach last page, stopping")
+        elif self.stop_when is not None and self.stop_when(page_result):
+            self.logger.info("Reach known content on page %d, stopping", page)
+            should_continue = False
 
         return page_result, should_continue
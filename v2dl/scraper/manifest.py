@@ -0,0 +1,65 @@
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from v2dl.common.model import PathType
+from v2dl.common.serializer import JSONSerializer, get_serializer
+from v2dl.scraper.downloader import DownloadPathTool
+
+
+@dataclass(frozen=True)
+class ManifestRecord:
+    """One image of a scraped album.
+
+    The destination is stored relative to the download root so a manifest can be replayed
+    into a different directory.
+    """
+
+    album_url: str
+    album: str  # album directory name
+    filename: str  # file stem, the extension is resolved from the response
+    url: str  # image url
+
+    def get_dest(self, download_root: PathType) -> Path:
+        return DownloadPathTool.get_file_dest(download_root, self.album, self.filename)
+
+
+class ManifestWriter:
+    """Append scraped image records to a JSONL manifest."""
+
+    def __init__(self, manifest_path: PathType, serializer: JSONSerializer | None = None) -> None:
+        self.manifest_path = Path(manifest_path)
+        self.serializer = serializer or get_serializer()
+
+    def write(self, records: Iterable[ManifestRecord]) -> None:
+        lines = [self.serializer.dumps(asdict(record)) + b"\n" for record in records]
+        if lines:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.manifest_path.open("ab") as f:
+                f.writelines(lines)
+
+
+def read_manifest(
+    manifest_path: PathType,
+    serializer: JSONSerializer | None = None,
+) -> Iterator[ManifestRecord]:
+    """Lazily read records from a JSONL manifest, skipping blank lines."""
+    serializer = serializer or get_serializer()
+    with Path(manifest_path).open("rb") as f:
+        for line in f:
+            if line.strip():
+                yield ManifestRecord(**serializer.loads(line))
+
+
+def group_by_album(
+    records: Iterable[ManifestRecord],
+) -> Iterator[tuple[str, list[ManifestRecord]]]:
+    """Group the records of every album, in the order the albums first appear.
+
+    Concurrent scrapes interleave the records of their albums, so the whole manifest is
+    read before the first album is returned.
+    """
+    albums: dict[str, list[ManifestRecord]] = {}
+    for record in records:
+        albums.setdefault(record.album_url, []).append(record)
+    yield from albums.items()
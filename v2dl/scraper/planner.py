@@ -0,0 +1,179 @@
+import os
+import time
+import heapq
+from collections.abc import Callable
+from logging import Logger
+from pathlib import Path
+
+from v2dl.common.const import IMAGE_PER_PAGE
+from v2dl.common.serializer import JSONSerializer, get_serializer
+from v2dl.scraper.tools import UrlHandler
+
+
+class AlbumPlanner:
+    """Remember the size of every scraped album for the scheduling of later runs.
+
+    The page count and image count of an album are recorded once its pages are scraped and
+    kept in `plan.json` in the state directory. An album recorded without its image
+    count, e.g. scraped with a page range, is estimated from its pages and
+    `IMAGE_PER_PAGE`. Albums never scraped before have no size and are estimated with the
+    average of the recorded albums, unless the opt-in planning pass (`plan_albums`)
+    measured them from their first page before the album list is scheduled.
+
+    The sizes order the albums of an album list and balance the shards. A URL file
+    scraped by a single process is read while it is scraped and keeps the file order.
+    """
+
+    def __init__(self, path: str | Path | None, serializer: JSONSerializer | None = None) -> None:
+        self.path = Path(path) if path else None
+        self.serializer = serializer or get_serializer()
+        self.albums: dict[str, dict[str, int]] = {}
+        self.changed: set[str] = set()
+        self.average: float | None = None
+        self.load()
+
+    @classmethod
+    def from_state_dir(cls, state_dir: str) -> "AlbumPlanner":
+        return cls(Path(state_dir) / "plan.json" if state_dir else None)
+
+    @staticmethod
+    def get_key(url: str) -> str:
+        return UrlHandler.remove_query_params(url)
+
+    def load(self) -> None:
+        self.albums = self.read()
+        self.average = None
+
+    def read(self) -> dict[str, dict[str, int]]:
+        if self.path is None:
+            return {}
+        try:
+            data = self.serializer.loads(self.path.read_bytes())
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def record(self, url: str, max_page: int, images: int | None = None) -> None:
+        """Record the size of an album, `images` is only given for a complete album."""
+        key = self.get_key(url)
+        entry = self.albums.setdefault(key, {})
+        entry["max_page"] = max_page
+        if images is not None:
+            entry["images"] = images
+        self.changed.add(key)
+        self.average = None
+
+    def is_recorded(self, url: str) -> bool:
+        return self.get_key(url) in self.albums
+
+    def get_max_page(self, url: str) -> int:
+        return self.albums.get(self.get_key(url), {}).get("max_page", 0)
+
+    def estimate(self, url: str) -> float:
+        """Return the estimated number of images of an album."""
+        entry = self.albums.get(self.get_key(url))
+        if entry is not None:
+            return self.entry_size(entry)
+        if self.average is None:
+            sizes = [self.entry_size(e) for e in self.albums.values()]
+            self.average = sum(sizes) / len(sizes) if sizes else IMAGE_PER_PAGE
+        return self.average
+
+    @staticmethod
+    def entry_size(entry: dict[str, int]) -> float:
+        return entry.get("images") or entry.get("max_page", 1) * IMAGE_PER_PAGE
+
+    def order(self, urls: list[str]) -> list[str]:
+        """Biggest recorded albums first, albums of equal estimates keep the input order."""
+        return sorted(urls, key=self.estimate, reverse=True)
+
+    def save(self) -> None:
+        """Merge the recorded albums into the plan file, shards write the same file."""
+        if self.path is None or not self.changed:
+            return
+        albums = self.read()
+        albums.update({key: self.albums[key] for key in self.changed})
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(self.serializer.dumps(albums))
+        os.replace(tmp_path, self.path)
+        self.albums = albums
+        self.changed.clear()
+        self.average = None
+
+
+def lpt_partition(
+    urls: list[str], workers: int, estimate: Callable[[str], float]
+) -> list[list[str]]:
+    """Assign the biggest remaining work to the least loaded worker.
+
+    Page and language variants of an album are kept together on one worker, as with
+    `get_shard_index`. Every worker receives its work biggest first.
+    """
+    groups: dict[str, list[str]] = {}
+    for url in urls:
+        groups.setdefault(AlbumPlanner.get_key(url), []).append(url)
+
+    weighted = sorted(
+        groups.values(), key=lambda group: sum(estimate(url) for url in group), reverse=True
+    )
+    partitions: list[list[str]] = [[] for _ in range(workers)]
+    loads = [(0.0, index) for index in range(workers)]
+    for group in weighted:
+        load, index = heapq.heappop(loads)
+        partitions[index].extend(group)
+        heapq.heappush(loads, (load + sum(estimate(url) for url in group), index))
+    return partitions
+
+
+class ScrapeProgress:
+    """Log the progress and a rough ETA of a batch of URLs from their estimated sizes.
+
+    Only the finished URLs have a measured size, the ETA is as good as the estimates of
+    the remaining ones.
+    """
+
+    def __init__(self, logger: Logger, sizes: list[float]) -> None:
+        self.logger = logger
+        self.sizes = sizes
+        self.total = sum(sizes)
+        self.done = 0
+        self.done_work = 0.0
+        self.started = time.monotonic()
+
+    def advance(self, size: float | None = None) -> None:
+        """Mark the next URL as done, `size` replaces its estimate once it is known."""
+        if self.done >= len(self.sizes):
+            return
+        if size is not None:
+            self.total += size - self.sizes[self.done]
+            self.sizes[self.done] = size
+        self.done_work += self.sizes[self.done]
+        self.done += 1
+        if len(self.sizes) < 2:
+            return
+
+        self.logger.info(
+            "Progress %d/%d, about %.0f%% of the estimated images, ETA %s",
+            self.done,
+            len(self.sizes),
+            100 * self.done_work / self.total if self.total else 100,
+            format_duration(self.eta()),
+        )
+
+    def eta(self) -> float:
+        """Seconds left, assuming the remaining images take as long as the finished ones."""
+        if not self.done_work:
+            return 0.0
+        elapsed = time.monotonic() - self.started
+        return elapsed / self.done_work * (self.total - self.done_work)
+
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
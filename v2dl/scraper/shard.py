@@ -0,0 +1,244 @@
+import queue
+import shutil
+import asyncio
+import multiprocessing
+from argparse import Namespace
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from v2dl.common import Config
+from v2dl.scraper.planner import lpt_partition
+from v2dl.scraper.tools import AlbumUrl, UrlFileReader
+
+if TYPE_CHECKING:
+    from multiprocessing.context import SpawnProcess
+
+    from v2dl.scraper.manager import ScrapeManager
+
+# files chrome keeps locked while running, copying them breaks the profile copy
+PROFILE_IGNORE = shutil.ignore_patterns("Singleton*", "*.lock", "lockfile", "DevToolsActivePort")
+
+
+def get_shard_index(url: str, shards: int) -> int:
+    """Return a stable shard index, page and language variants of a URL share one shard."""
+    return AlbumUrl.parse(url).digest % shards
+
+
+def partition_urls(
+    urls: list[str], shards: int, estimate: Callable[[str], float] | None = None
+) -> list[list[str]]:
+    """Split the URLs by hash, or by planned size to balance the shards when `estimate` is given."""
+    if estimate is not None:
+        return lpt_partition(urls, shards, estimate)
+    partitions: list[list[str]] = [[] for _ in range(shards)]
+    for url in urls:
+        partitions[get_shard_index(url, shards)].append(url)
+    return partitions
+
+
+@dataclass
+class ShardResult:
+    index: int
+    success: bool
+    processed_urls: set[str] = field(default_factory=set)
+    download_status: dict[str, dict[str, Any]] = field(default_factory=dict)
+    error: str = ""
+
+
+@dataclass
+class ShardSpec:
+    index: int
+    count: int
+    args: Namespace
+    chrome_profile_path: str
+    chrome_port: int
+
+
+class ShardCoordinator:
+    """Split the input file across worker processes and merge their results.
+
+    Each worker runs a full `V2DLApp` with its own chrome profile copy, debugging port and
+    account partition. The coordinator itself does not start a browser, it only collects
+    progress events and merges the album status into `scrape_manager`, so the metadata and
+    final status are reported once as in a single process run.
+    """
+
+    def __init__(self, config: Config, args: Namespace, scrape_manager: "ScrapeManager") -> None:
+        self.config = config
+        self.args = args
+        self.scrape_manager = scrape_manager
+        self.logger = config.runtime_config.logger
+        self.shards = config.static_config.shards
+
+    async def start_scraping(self) -> bool:
+        url_file = self.config.runtime_config.url_file
+        # checkpointed like a single process run, once every shard finished its URLs
+        reader = UrlFileReader(
+            url_file,
+            self.logger,
+            self.config.static_config.state_dir,
+            resume=self.config.static_config.resume,
+        )
+        urls = self.scrape_manager.load_input_urls(reader)
+        if not urls:
+            self.logger.info(f"No valid urls found in {url_file}")
+            self.scrape_manager.no_log = True
+            return False
+
+        work_dir = (
+            Path(self.config.static_config.state_dir)
+            / "shards"
+            / datetime.now().strftime("%Y%m%d_%H%M%S")
+        )
+        work_dir.mkdir(parents=True, exist_ok=True)
+
+        ctx = multiprocessing.get_context("spawn")
+        event_queue: multiprocessing.Queue[tuple[str, int, Any]] = ctx.Queue()
+        processes: dict[int, SpawnProcess] = {}
+        partitions = self.partition(urls)
+        for index, shard_urls in enumerate(partitions):
+            if not shard_urls:
+                continue
+            spec = self.prepare_shard(index, shard_urls, work_dir)
+            process = ctx.Process(
+                target=run_shard,
+                args=(spec, event_queue),
+                name=f"v2dl-shard-{index}",
+            )
+            process.start()
+            processes[index] = process
+            self.logger.info("Shard %d started with %d urls", index, len(shard_urls))
+
+        results = await self.collect(event_queue, processes, len(urls))
+        for process in processes.values():
+            await asyncio.to_thread(process.join)
+
+        self.merge(results)
+        success = all(result.success for result in results)
+        if success:
+            reader.commit()
+        return success
+
+    def partition(self, urls: list[str]) -> list[list[str]]:
+        """Balance the shards by planned size, or split by hash when no URL was planned."""
+        planner = self.scrape_manager.planner
+        if any(planner.is_recorded(url) for url in urls):
+            return partition_urls(urls, self.shards, planner.estimate)
+        return partition_urls(urls, self.shards)
+
+    def prepare_shard(self, index: int, urls: list[str], work_dir: Path) -> ShardSpec:
+        url_file = work_dir / f"shard_{index}.txt"
+        url_file.write_text("".join(url + "\n" for url in urls), encoding="utf-8")
+
+        base_profile = Path(self.config.static_config.chrome_profile_path)
+        profile = base_profile.with_name(f"{base_profile.name}_shard{index}")
+        if base_profile.is_dir() and not profile.exists():
+            self.logger.debug("Copying chrome profile to %s", profile)
+            shutil.copytree(base_profile, profile, ignore=PROFILE_IGNORE)
+
+        shard_args = Namespace(**vars(self.args))
+        shard_args.url = None
+        shard_args.url_file = str(url_file)
+        shard_args.shards = 1
+        # metrics, traces and profiles are the coordinator's, workers would fight over them
+        shard_args.metrics_address = None
+        shard_args.metrics_textfile = None
+        shard_args.trace_path = None
+        shard_args.profile_dir = None
+
+        return ShardSpec(
+            index=index,
+            count=self.shards,
+            args=shard_args,
+            chrome_profile_path=str(profile),
+            chrome_port=self.config.static_config.chrome_port + index + 1,
+        )
+
+    async def collect(
+        self,
+        event_queue: "multiprocessing.Queue[tuple[str, int, Any]]",
+        processes: "dict[int, SpawnProcess]",
+        total: int,
+    ) -> list[ShardResult]:
+        results: dict[int, ShardResult] = {}
+        done = 0
+        while len(results) < len(processes):
+            try:
+                event, index, data = await asyncio.to_thread(event_queue.get, True, 1.0)
+            except queue.Empty:
+                # a worker killed by the OS never reports back
+                for index, process in processes.items():
+                    if index not in results and not process.is_alive() and event_queue.empty():
+                        self.logger.error("Shard %d exited with code %s", index, process.exitcode)
+                        results[index] = ShardResult(index, False, error="worker died")
+                continue
+
+            if event == "url_done":
+                done += 1
+                self.logger.info("[%d/%d] Shard %d finished %s", done, total, index, data["url"])
+            elif event == "result":
+                if not data.success:
+                    self.logger.error("Shard %d failed: %s", index, data.error)
+                results[index] = data
+
+        return list(results.values())
+
+    def merge(self, results: list[ShardResult]) -> None:
+        album_tracker = self.scrape_manager.album_tracker
+        for result in results:
+            for url, status in result.download_status.items():
+                album_tracker.update_download_log(url, status)
+            self.scrape_manager.processed_urls.update(result.processed_urls)
+
+
+def run_shard(spec: ShardSpec, event_queue: "multiprocessing.Queue[tuple[str, int, Any]]") -> None:
+    """Entry point of a shard worker process."""
+    # imported here, v2dl and the web bots import the scraper package
+    from v2dl import V2DLApp  # noqa: PLC0415
+    from v2dl.web_bot.base import BaseBot  # noqa: PLC0415
+
+    def forward(event: str, data: dict[str, Any]) -> None:
+        event_queue.put((event, spec.index, data))
+
+    class ShardApp(V2DLApp):
+        async def init(self, args: Namespace) -> None:
+            await super().init(args)
+            self.scraper.add_listener(forward)
+
+        def _initialize_config(self, args: Namespace) -> None:
+            super()._initialize_config(args)
+            static_config = self.config.static_config
+            static_config.shards = 1
+            static_config.no_metadata = True  # written once by the coordinator
+            static_config.metrics_address = ""  # also when set in config.yaml
+            static_config.metrics_textfile = ""
+            static_config.trace_path = ""
+            static_config.use_default_chrome_profile = False
+            static_config.chrome_profile_path = spec.chrome_profile_path
+            static_config.chrome_port = spec.chrome_port
+
+        def get_bot(self, conf: Config) -> Any:
+            bot = super().get_bot(conf)
+            if isinstance(bot, BaseBot):
+                bot.account_manager.set_partition(spec.index, spec.count)
+                bot.account = bot.account_manager.lease(bot)
+            return bot
+
+    app = ShardApp()
+    try:
+        asyncio.run(app.run(spec.args))
+        result = ShardResult(
+            spec.index,
+            True,
+            processed_urls=app.scraper.processed_urls,
+            download_status=app.scraper.album_tracker.get_download_status,
+        )
+    except BaseException as e:  # SystemExit included, the coordinator must hear back
+        result = ShardResult(spec.index, False, error=repr(e))
+        if hasattr(app, "scraper"):
+            result.processed_urls = app.scraper.processed_urls
+            result.download_status = app.scraper.album_tracker.get_download_status
+    event_queue.put(("result", spec.index, result))
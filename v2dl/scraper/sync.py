@@ -0,0 +1,171 @@
+import os
+import time
+import asyncio
+from dataclasses import asdict, dataclass, field
+from logging import Logger
+from pathlib import Path
+
+from v2dl.common import ScrapeError
+from v2dl.common.serializer import JSONSerializer, get_serializer
+from v2dl.scraper.manager import PageScraper, ScrapeManager
+from v2dl.scraper.tools import AlbumUrl, UrlHandler
+
+SEEN_LIMIT = 30  # newest albums remembered per subscription, more than one list page
+
+
+@dataclass
+class Subscription:
+    url: str
+    interval: float  # seconds between two syncs
+    last_run: float = 0.0
+    seen: list[str] = field(default_factory=list)  # album keys, newest first
+
+    def is_due(self, now: float) -> bool:
+        return now - self.last_run >= self.interval
+
+
+class SubscriptionRegistry:
+    """Album lists to keep in sync, e.g. actors, companies and categories.
+
+    Every subscription remembers the newest albums of its list and when it was last
+    synced. The registry is `subscriptions.json` in the state directory, saving merges
+    the changed subscriptions into the file so concurrent runs do not lose each other's.
+    """
+
+    def __init__(self, path: str | Path, serializer: JSONSerializer | None = None) -> None:
+        self.path = Path(path)
+        self.serializer = serializer or get_serializer()
+        self.subscriptions = self.read()
+
+    @classmethod
+    def from_state_dir(cls, state_dir: str) -> "SubscriptionRegistry":
+        return cls(Path(state_dir) / "subscriptions.json")
+
+    @staticmethod
+    def get_key(url: str) -> str:
+        """Page and language variants of a list are the same subscription."""
+        return AlbumUrl.parse(url).with_params(page=None, hl=None)
+
+    def read(self) -> dict[str, Subscription]:
+        try:
+            data = self.serializer.loads(self.path.read_bytes())
+            return {key: Subscription(**entry) for key, entry in data.items()}
+        except (OSError, ValueError, TypeError, AttributeError):
+            return {}
+
+    def add(self, url: str, interval: float) -> Subscription:
+        if UrlHandler.get_scrape_type(url) != "album_list":
+            raise ValueError(f"Only album lists can be subscribed, got {url}")
+        key = self.get_key(url)
+        subscription = self.subscriptions.get(key)
+        if subscription is None:
+            subscription = Subscription(key, interval)
+        subscription.interval = interval
+        self.save(key, subscription)
+        return subscription
+
+    def remove(self, url: str) -> bool:
+        key = self.get_key(url)
+        if key not in self.subscriptions:
+            return False
+        self.save(key, None)
+        return True
+
+    def due(self, now: float | None = None) -> list[Subscription]:
+        now = time.time() if now is None else now
+        return [s for s in self.subscriptions.values() if s.is_due(now)]
+
+    def save(self, key: str, subscription: Subscription | None) -> None:
+        """Write one subscription, or remove it when `subscription` is None."""
+        subscriptions = self.read()
+        if subscription is None:
+            subscriptions.pop(key, None)
+        else:
+            subscriptions[key] = subscription
+        data = {key: asdict(s) for key, s in subscriptions.items()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(self.serializer.dumps(data))
+        os.replace(tmp_path, self.path)
+        self.subscriptions = subscriptions
+
+
+class SubscriptionSync:
+    """Scrape the albums added to the due subscriptions since their last sync.
+
+    The list pages of all due subscriptions are checked concurrently, newest first, and
+    stop at the first page holding an already seen album, so an unchanged list costs one
+    page. A subscription without seen albums is scraped completely once. The new albums
+    are then scraped one subscription after another, and the subscription is saved only
+    after all of its albums are done, an interrupted sync finds them again.
+    """
+
+    def __init__(
+        self,
+        scrape_manager: ScrapeManager,
+        registry: SubscriptionRegistry,
+        concurrency: int = 1,
+    ) -> None:
+        self.scrape_manager = scrape_manager
+        self.registry = registry
+        self.concurrency = max(concurrency, 1)
+        self.logger: Logger = scrape_manager.logger
+        self.language = scrape_manager.config.static_config.language
+
+    async def run(self) -> bool:
+        subscriptions = self.registry.due()
+        if not subscriptions:
+            self.logger.info("No subscription is due for a sync")
+            self.scrape_manager.no_log = True
+            return True
+
+        self.logger.info("Syncing %d subscriptions", len(subscriptions))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        checks = await asyncio.gather(
+            *(self.find_new_albums(s, semaphore) for s in subscriptions), return_exceptions=True
+        )
+
+        for subscription, result in zip(subscriptions, checks, strict=True):
+            if isinstance(result, BaseException):
+                if not isinstance(result, ScrapeError | KeyError | ValueError):
+                    raise result
+                self.logger.error("Failed to check %s: %s", subscription.url, result)
+                continue
+            await self.sync(subscription, result)
+        return True
+
+    async def find_new_albums(
+        self, subscription: Subscription, semaphore: asyncio.Semaphore
+    ) -> list[str]:
+        """Return the albums of the list newer than the newest seen one."""
+        strategy = self.scrape_manager.strategies["album_list"]
+        scraper = PageScraper(self.scrape_manager.get_web_bot(), strategy, self.logger)
+        scraper.concurrency = 1  # never fetch a page after the first known album
+        seen = set(subscription.seen)
+        if seen:
+            scraper.stop_when = lambda links: any(AlbumUrl.get_key(u) in seen for u in links)
+
+        url = UrlHandler.update_language(subscription.url, self.language)
+        async with semaphore:
+            album_links = await scraper.scrape_all_pages(url, 1)
+
+        new_albums: list[str] = []
+        for album_url in album_links:
+            if AlbumUrl.get_key(album_url) in seen:
+                break
+            new_albums.append(album_url)
+        return list(dict.fromkeys(new_albums))
+
+    async def sync(self, subscription: Subscription, new_albums: list[str]) -> None:
+        self.logger.info("%d new albums in %s", len(new_albums), subscription.url)
+        if new_albums:
+            self.scrape_manager.processed_urls.add(subscription.url)
+            await self.scrape_manager.scrape_albums(new_albums)
+
+        new_keys = [AlbumUrl.get_key(u) for u in new_albums]
+        subscription.seen = list(dict.fromkeys(new_keys + subscription.seen))[:SEEN_LIMIT]
+        subscription.last_run = time.time()
+        try:
+            self.registry.save(self.registry.get_key(subscription.url), subscription)
+        except OSError as e:
+            self.logger.error("Failed to save the subscription %s: %s", subscription.url, e)
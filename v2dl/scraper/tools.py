@@ -1,19 +1,30 @@
 import os
 import re
-import json
+import hashlib
+from collections import Counter
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from functools import cached_property, lru_cache
 from logging import Logger
 from pathlib import Path
-from typing import Any, ClassVar, Optional
-from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+from typing import Any, BinaryIO, ClassVar, Optional
+from urllib.parse import (
+    ParseResult,
+    parse_qs,
+    urlencode,
+    urlparse,
+    urlsplit,
+    urlunparse,
+    urlunsplit,
+)
 
 from lxml import html
 
 from v2dl.common import Config
 from v2dl.common.const import BASE_URL
-from v2dl.common.utils import count_files, enum_to_string
+from v2dl.common.serializer import JSONSerializer, get_serializer
 from v2dl.scraper.types import ScrapeType
 
 
@@ -25,56 +36,84 @@ class LogKey:
     real_num: str = "real_num"
 
 
-class DownloadStatus(Enum):
-    OK = 10
-    VIP = 20
-    FAIL = 30
+class DownloadStatus(str, Enum):
+    """Status of an album, ordered from OK to FAIL.
+
+    A `str` enum, so every JSON backend writes it as its value without a hook.
+    """
+
+    OK = "OK"
+    VIP = "VIP"
+    FAIL = "FAIL"
+
+    @property
+    def rank(self) -> int:
+        return _STATUS_RANKS[self]
 
     def __lt__(self, other: Any) -> bool:
         if isinstance(other, DownloadStatus):
-            return self.value < other.value
+            return self.rank < other.rank
         return NotImplemented
 
     def __le__(self, other: Any) -> bool:
         if isinstance(other, DownloadStatus):
-            return self.value <= other.value
+            return self.rank <= other.rank
         return NotImplemented
 
     def __gt__(self, other: Any) -> bool:
         if isinstance(other, DownloadStatus):
-            return self.value > other.value
+            return self.rank > other.rank
         return NotImplemented
 
     def __ge__(self, other: Any) -> bool:
         if isinstance(other, DownloadStatus):
-            return self.value >= other.value
+            return self.rank >= other.rank
         return NotImplemented
 
-    def __eq__(self, other: Any) -> bool:
-        if isinstance(other, DownloadStatus):
-            return self.value == other.value
-        return NotImplemented
 
-    def __ne__(self, other: Any) -> bool:
-        if isinstance(other, DownloadStatus):
-            return self.value != other.value
-        return NotImplemented
+_STATUS_RANKS = {status: rank for rank, status in enumerate(DownloadStatus)}
 
 
 class AlbumTracker:
-    """Download log in units of albums."""
+    """Download log in units of albums.
+
+    The downloaded albums are indexed by the digest of their key. The log is only
+    appended to, so the index reads the lines added since the last lookup, e.g. by shards.
+    The status of an album is kept until it is journaled, afterwards only its final
+    `DownloadStatus` is kept for the summary at exit.
+    """
 
     def __init__(self, download_log_path: str):
         self.album_log_path = download_log_path
         self.download_status: dict[str, dict[str, Any]] = {}
+        self.final_status: dict[str, DownloadStatus] = {}
         self.keys = LogKey()
+        self.index: set[int] = set()
+        self.index_offset = 0
 
     def is_downloaded(self, album_url: str) -> bool:
-        if os.path.exists(self.album_log_path):
-            with open(self.album_log_path) as f:
-                downloaded_albums = f.read().splitlines()
-            return album_url in downloaded_albums
-        return False
+        self.refresh_index()
+        return AlbumUrl.parse(album_url).digest in self.index
+
+    def refresh_index(self) -> None:
+        try:
+            size = os.path.getsize(self.album_log_path)
+        except OSError:
+            size = 0
+        if size < self.index_offset:  # the log was replaced
+            self.index.clear()
+            self.index_offset = 0
+        if size == self.index_offset:
+            return
+
+        with open(self.album_log_path, "rb") as f:
+            f.seek(self.index_offset)
+            data = f.read(size - self.index_offset)
+        complete = data.rfind(b"\n") + 1  # a line being written is read next time
+        for line in data[:complete].decode("utf-8", "replace").splitlines():
+            if line.strip():
+                self.index.add(AlbumUrl.get_digest(AlbumUrl.get_key(line.strip())))
+        self.index_offset += complete
 
     def log_downloaded(self, album_url: str) -> None:
         album_url = UrlHandler.remove_page_num(album_url)
@@ -96,6 +135,12 @@ class AlbumTracker:
             if key in self.keys.__dict__.values():
                 self.download_status[album_url][key] = value
 
+    def add_real_num(self, album_url: str, count: int) -> None:
+        """Add files completed by the downloader to the album's `real_num`."""
+        album_url = UrlHandler.remove_query_params(album_url)
+        real_num = self.download_status.get(album_url, {}).get(self.keys.real_num, 0)
+        self.update_download_log(album_url, {self.keys.real_num: real_num + count})
+
     def init_download_log(self, album_url: str, **kwargs: Any) -> None:
         album_url = UrlHandler.remove_query_params(album_url)
         default_metadata = {
@@ -107,11 +152,110 @@ class AlbumTracker:
         default_metadata.update(kwargs)
         self.download_status[album_url] = default_metadata
 
+    def evict(self, album_url: str) -> None:
+        """Drop the status of a journaled album, keep only its final status."""
+        album_url = UrlHandler.remove_query_params(album_url)
+        album_status = self.download_status.pop(album_url, None)
+        if album_status is not None:
+            self.final_status[album_url] = album_status[self.keys.status]
+
+    def get_final_status(self, album_url: str) -> DownloadStatus | None:
+        if album_url in self.download_status:
+            return self.download_status[album_url][self.keys.status]
+        return self.final_status.get(album_url)
+
     @property
     def get_download_status(self) -> dict[str, dict[str, Any]]:
         return self.download_status
 
 
+URL_CACHE_SIZE = 4096  # URLs of the albums in progress, looked up over and over
+
+
+@dataclass(frozen=True)
+class AlbumUrl:
+    """A URL parsed once, with its canonical key, page and language.
+
+    `key` is the URL without its query, it identifies an album or an album list across
+    pages and languages. Instances are immutable and memoized by `parse`, the same URL is
+    handled by the tracker, the planner and the page scraper many times per album.
+    """
+
+    parsed: ParseResult
+    query: tuple[tuple[str, tuple[str, ...]], ...]
+    key: str
+    digest: int
+
+    @staticmethod
+    @lru_cache(maxsize=URL_CACHE_SIZE)
+    def parse(url: str) -> "AlbumUrl":
+        return AlbumUrl.from_string(url)
+
+    @staticmethod
+    def from_string(url: str) -> "AlbumUrl":
+        """Parse without the memo, for URLs seen only once."""
+        parsed = urlparse(url)
+        query = tuple((name, tuple(values)) for name, values in parse_qs(parsed.query).items())
+        key = urlunparse(parsed._replace(query=""))
+        return AlbumUrl(parsed, query, key, AlbumUrl.get_digest(key))
+
+    @staticmethod
+    def get_key(url: str) -> str:
+        """The key of a URL without parsing its query."""
+        return urlunsplit(urlsplit(url)._replace(query=""))
+
+    @staticmethod
+    def get_digest(key: str) -> int:
+        """A stable 64-bit hash of a key, the same in every process."""
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    @property
+    def path_parts(self) -> tuple[str, ...]:
+        return tuple(self.parsed.path.split("/"))
+
+    @property
+    def page(self) -> int:
+        page = self.get_param("page")
+        return 1 if page is None else int(page)
+
+    @property
+    def language(self) -> str | None:
+        return self.get_param("hl")
+
+    def get_param(self, name: str) -> str | None:
+        return next((values[0] for key, values in self.query if key == name), None)
+
+    def with_params(self, **params: str | None) -> str:
+        """Return the URL with the given query parameters replaced, `None` removes one."""
+        query = dict(self.encoded_query)
+        for name, value in params.items():
+            if value is None:
+                query.pop(name, None)
+            else:
+                query[name] = urlencode({name: value})
+        return urlunparse(self.parsed._replace(query="&".join(query.values())))
+
+    @cached_property
+    def encoded_query(self) -> dict[str, str]:
+        """Every parameter encoded once, joined they give `urlencode(query, doseq=True)`."""
+        return {name: urlencode({name: values}, doseq=True) for name, values in self.query}
+
+    @staticmethod
+    def normalize_many(urls: Iterable[str], language: str | None = None) -> list[str]:
+        """Normalize a whole URL list, URLs equal after normalization are kept once.
+
+        The query is re-encoded and `hl` set to `language` if given, as done before each
+        URL is scraped. The memo is bypassed, a large URL file would only evict the URLs
+        being scraped.
+        """
+        params = {} if language is None else {"hl": language}
+        normalized: dict[str, None] = {}
+        for url in dict.fromkeys(urls):  # exact duplicates are not even parsed
+            normalized.setdefault(AlbumUrl.from_string(url).with_params(**params))
+        return list(normalized)
+
+
 class UrlHandler:
     """Handles URL parsing and management."""
 
@@ -127,7 +271,10 @@ class UrlHandler:
     @classmethod
     def get_scrape_type(cls, url: str) -> Optional[ScrapeType]:
         """Get the appropriate handler method based on URL path."""
-        path_parts, _ = UrlHandler.parse_input_url(url)
+        return cls.match_scrape_type(AlbumUrl.parse(url).path_parts)
+
+    @classmethod
+    def match_scrape_type(cls, path_parts: Iterable[str]) -> ScrapeType | None:
         for part in path_parts:
             if part in cls.URL_HANDLERS:
                 return cls.URL_HANDLERS[part]
@@ -137,21 +284,43 @@ class UrlHandler:
     def load_urls(url: str, url_file: Optional[str]) -> list[str]:
         """Load URLs from config (URL or txt file)."""
         if url_file:
-            with open(url_file) as file:
-                urls = [line.strip() for line in file if line.strip() and not line.startswith("#")]
-        else:
-            urls = [url]
-        return urls
+            return list(UrlHandler.iter_urls(url_file))
+        return [url]
+
+    @staticmethod
+    def iter_urls(url_file: str) -> Iterator[str]:
+        """Yield the URLs of a URL file line by line, skipping blanks and comments."""
+        with open(url_file) as file:
+            for line in file:
+                if line.strip() and not line.startswith("#"):
+                    yield line.strip()
 
     @staticmethod
     def mark_processed_url(url_file: str, target_url: str) -> None:
         """Mark URL as processed in the URL file."""
+        UrlHandler.mark_processed_urls(url_file, [target_url])
+
+    @staticmethod
+    def mark_processed_urls(url_file: str, target_urls: Iterable[str]) -> None:
+        """Mark multiple URLs as processed with a single rewrite of the URL file.
+
+        Every variant of a processed URL is marked, i.e. lines with the same key.
+        """
+        digests = {AlbumUrl.parse(url).digest for url in target_urls}
+        if not digests:
+            return
+
         with open(url_file, "r+") as file:
             lines = file.readlines()
             file.seek(0)
 
             for line in lines:
-                if line.strip().startswith(UrlHandler.remove_query_params(target_url)):
+                url = line.strip()
+                if (
+                    url
+                    and not url.startswith("#")
+                    and AlbumUrl.get_digest(AlbumUrl.get_key(url)) in digests
+                ):
                     file.write(f"# {line}")
                 else:
                     file.write(line)
@@ -169,11 +338,8 @@ class UrlHandler:
         Returns:
             tuple[list[str], int]: Path segments and the starting page number.
         """
-        parsed_url = urlparse(url)
-        path_parts = parsed_url.path.split("/")
-        query_params = parse_qs(parsed_url.query)
-        start_page: int = int(query_params.get("page", [1])[0])  # default page=1
-        return path_parts, start_page
+        album_url = AlbumUrl.parse(url)
+        return list(album_url.path_parts), album_url.page
 
     @staticmethod
     def parse_html(html_content: str, logger: Logger) -> html.HtmlElement | None:
@@ -236,21 +402,11 @@ class UrlHandler:
         Returns:
             str: Updated URL with the specified page number.
         """
-        parsed_url = urlparse(url)  # 解析 URL
-        query_params = parse_qs(parsed_url.query)  # 解析查詢參數
-        query_params["page"] = [str(page)]  # 修改頁碼
-
-        new_query = urlencode(query_params, doseq=True)  # 組合成字串
-        new_url = parsed_url._replace(query=new_query)  # 替換頁碼
-
         # Example
         # url = "https://example.com/search?q=test&sort=asc", page = 3
-        # parsed_url: ParseResult(scheme='https', netloc='example.com', path='/search', params='', query='q=test&sort=asc', fragment='')
-        # query_params: {'q': ['test'], 'sort': ['asc'], 'page': ['3']}
-        # new_query: 'q=test&sort=asc&page=3'
-        # new_url: ParseResult(scheme='https', netloc='example.com', path='/search', params='', query='q=test&sort=asc&page=3', fragment='')
-        # urlunparse: 'https://example.com/search?q=test&sort=asc&page=3'
-        return urlunparse(new_url)
+        # query: (('q', ('test',)), ('sort', ('asc',)))
+        # return: 'https://example.com/search?q=test&sort=asc&page=3'
+        return AlbumUrl.parse(url).with_params(page=str(page))
 
     @staticmethod
     def remove_page_num(url: str) -> str:
@@ -263,28 +419,15 @@ class UrlHandler:
         Returns:
             str: URL without the page parameter.
         """
-        parsed_url = urlparse(url)
-        query_params = parse_qs(parsed_url.query)
-
-        if "page" in query_params:
-            del query_params["page"]
-
-        new_query = urlencode(query_params, doseq=True)
-
-        return urlunparse(parsed_url._replace(query=new_query))
+        return AlbumUrl.parse(url).with_params(page=None)
 
     @staticmethod
     def remove_query_params(url: str) -> str:
-        parsed_url = urlparse(url)
-        return urlunparse(parsed_url._replace(query=""))
+        return AlbumUrl.parse(url).key
 
     @staticmethod
     def update_language(url: str, lang: str) -> str:
-        parsed_url = urlparse(url)
-        query = parse_qs(parsed_url.query)
-        query["hl"] = [lang]
-        updated_query = urlencode(query, doseq=True)
-        return urlunparse(parsed_url._replace(query=updated_query))
+        return AlbumUrl.parse(url).with_params(hl=lang)
 
     @staticmethod
     def handle_first_page(target_page: int | list[int]) -> tuple[int, bool]:
@@ -347,40 +490,266 @@ class UrlHandler:
             return [int(page_range)]
 
 
+class UrlPreprocessor:
+    """Canonicalize, de-duplicate and filter the input URLs in one streaming pass.
+
+    URLs sharing a key, i.e. language and page variants of the same album or album list,
+    are kept once. A later variant is only kept when it starts on an earlier page than the
+    kept one, it covers the pages the first one skipped. Albums already in the download log
+    are dropped unless `skip_downloaded` is off. Only the 64-bit digest and the start page
+    of every key are kept in memory, so files with millions of lines are read without
+    being loaded.
+    """
+
+    def __init__(
+        self,
+        album_tracker: AlbumTracker,
+        logger: Logger,
+        language: str | None = None,
+        skip_downloaded: bool = True,
+    ) -> None:
+        self.album_tracker = album_tracker
+        self.logger = logger
+        self.params = {} if language is None else {"hl": language}
+        self.skip_downloaded = skip_downloaded
+        self.kept = 0
+        # start page by key digest, kept across calls, e.g. batches of a watched file
+        self.seen: dict[int, int] = {}
+        self.dropped: Counter[str] = Counter()
+
+    def process(self, urls: Iterable[str]) -> Iterator[str]:
+        seen = self.seen
+        if self.skip_downloaded:
+            self.album_tracker.refresh_index()
+
+        for url in urls:
+            # most lines have no page, their query is only parsed when they are kept
+            key = AlbumUrl.get_key(url)
+            digest = AlbumUrl.get_digest(key)
+            page = AlbumUrl.parse(url).page if "page=" in url else 1
+            if seen.get(digest, page + 1) <= page:
+                self.drop("duplicate", url)
+                continue
+
+            seen[digest] = page
+            scrape_type = UrlHandler.match_scrape_type(urlsplit(key).path.split("/"))
+            if scrape_type is None:
+                self.drop("unsupported", url)
+            elif (
+                self.skip_downloaded
+                and scrape_type == "album_image"
+                and digest in self.album_tracker.index
+            ):
+                self.drop("downloaded", url)
+            else:
+                self.kept += 1
+                yield AlbumUrl.from_string(url).with_params(**self.params)
+
+    def drop(self, reason: str, url: str) -> None:
+        self.dropped[reason] += 1
+        self.logger.debug("Skipping %s input URL %s", reason, url)
+
+    def report(self) -> None:
+        if not self.dropped:
+            return
+        reasons = ", ".join(f"{count} {reason}" for reason, count in self.dropped.most_common())
+        self.logger.info(
+            "Kept %d input URLs, dropped %d: %s", self.kept, self.dropped.total(), reasons
+        )
+
+
+class UrlFileReader:
+    """Read a URL file lazily and remember how far it was processed.
+
+    The checkpoint is the byte offset after the last processed line, kept per URL file in
+    `url_files.json` in the state directory together with a hash of that line. A file
+    edited before the checkpoint is read from the start again, lines appended while the
+    job runs are read as they come. Iterating again continues after the last line read.
+
+    With `follow`, a last line without a newline is left for the next iteration, it may
+    still be being written.
+    """
+
+    def __init__(
+        self,
+        url_file: str,
+        logger: Logger,
+        state_dir: str = "",
+        resume: bool = True,
+        follow: bool = False,
+        serializer: JSONSerializer | None = None,
+    ) -> None:
+        self.url_file = url_file
+        self.key = str(Path(url_file).resolve())
+        self.logger = logger
+        self.checkpoint_path = Path(state_dir) / "url_files.json" if state_dir else None
+        self.follow = follow
+        self.serializer = serializer or get_serializer()
+        self.line = b""
+        self.committed = self.load_checkpoint() if resume else 0
+        self.offset = self.committed  # after the line last yielded
+
+    def __iter__(self) -> Iterator[str]:
+        with open(self.url_file, "rb") as f:
+            if self.offset and self.read_line_before(f, self.offset, len(self.line)) != self.line:
+                self.logger.warning("%s was replaced, reading it again", self.url_file)
+                self.offset = 0
+            f.seek(self.offset)
+            # readline sees lines appended after the previous EOF
+            while line := f.readline():
+                if self.follow and not line.endswith(b"\n"):
+                    break
+                self.offset += len(line)
+                self.line = line
+                url = line.decode("utf-8", "replace").strip()
+                if url and not url.startswith("#"):
+                    yield url
+
+    @property
+    def progress(self) -> float:
+        try:
+            size = os.path.getsize(self.url_file)
+        except OSError:
+            return 1.0
+        return min(self.offset / size, 1.0) if size else 1.0
+
+    def load_checkpoint(self) -> int:
+        checkpoint = self.read_checkpoints().get(self.key)
+        if not checkpoint:
+            return 0
+
+        offset = checkpoint["offset"]
+        try:
+            with open(self.url_file, "rb") as f:
+                line = self.read_line_before(f, offset, checkpoint["length"])
+        except OSError:
+            return 0
+        if self.hash_line(line) != checkpoint["line"]:
+            self.logger.warning("%s changed since the last run, reading it again", self.url_file)
+            return 0
+
+        self.logger.info("Resuming %s after byte %d", self.url_file, offset)
+        self.line = line
+        return offset
+
+    def commit(self) -> None:
+        """Checkpoint the file after the line last yielded."""
+        if self.checkpoint_path is None or self.offset == self.committed:
+            return
+
+        checkpoints = self.read_checkpoints()
+        checkpoints[self.key] = {
+            "offset": self.offset,
+            "length": len(self.line),
+            "line": self.hash_line(self.line),
+        }
+        tmp_path = self.checkpoint_path.with_name(f".{self.checkpoint_path.name}.{os.getpid()}.tmp")
+        try:
+            self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(self.serializer.dumps(checkpoints))
+            os.replace(tmp_path, self.checkpoint_path)
+        except OSError as e:
+            self.logger.warning("Failed to checkpoint %s: %s", self.url_file, e)
+            return
+        self.committed = self.offset
+
+    def read_checkpoints(self) -> dict[str, dict[str, Any]]:
+        if self.checkpoint_path is None:
+            return {}
+        try:
+            data = self.serializer.loads(self.checkpoint_path.read_bytes())
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    @staticmethod
+    def read_line_before(f: BinaryIO, offset: int, length: int) -> bytes:
+        if offset < length:
+            return b""
+        f.seek(offset - length)
+        return f.read(length)
+
+    @staticmethod
+    def hash_line(line: bytes) -> str:
+        return hashlib.blake2b(line, digest_size=8).hexdigest()
+
+
 class MetadataHandler:
-    """Handles metadata operations."""
+    """Handles metadata operations.
+
+    The status of each album is appended to a JSONL journal as soon as the album finishes,
+    so a crash loses at most the album in progress. At exit the journal is optionally
+    compacted into the single JSON file written by older versions.
+    """
 
     def __init__(self, config: Config, album_tracker: AlbumTracker) -> None:
         self.config = config
         self.album_tracker = album_tracker
+        self.logger = config.runtime_config.logger
+        self.serializer = get_serializer(config.static_config.json_backend)
+
+        if config.static_config.metadata_path:
+            self.metadata_dest = Path(config.static_config.metadata_path)
+        else:
+            metadata_name = "metadata_" + str(datetime.now().strftime("%Y%m%d_%H%M%S")) + ".json"
+            self.metadata_dest = Path(config.static_config.download_dir) / metadata_name
+        self.journal_path = self.metadata_dest.with_suffix(".jsonl")
+
+    def handle_event(self, event: str, data: dict[str, Any]) -> None:
+        """Scrape listener, journal the album when it is done."""
+        if event == "album_done":
+            self.append(data["url"])
+
+    def append(self, album_url: str) -> None:
+        """Append the current status of an album to the journal and evict it from memory."""
+        if self.config.static_config.no_metadata:
+            return
+
+        album_url = UrlHandler.remove_query_params(album_url)
+        album_status = self.album_tracker.get_download_status.get(album_url)
+        if album_status is None:
+            return
+
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        record = {"url": album_url, **album_status}
+        with self.journal_path.open("ab") as f:
+            f.write(self.serializer.dumps(record) + b"\n")
+        self.album_tracker.evict(album_url)
 
     def write_metadata(self) -> None:
-        """Write metadata to a file."""
+        """Journal the albums not finished yet and compact the journal if configured."""
         if self.config.static_config.no_metadata:
             return
 
-        download_status = self.album_tracker.get_download_status
+        # albums interrupted by an error never emit album_done, e.g. the shard coordinator
+        # only receives the merged status
+        for url in list(self.album_tracker.get_download_status):
+            self.append(url)
 
-        # count real files
-        for url, album_status in download_status.items():
-            dest = album_status[LogKey.dest]
-            real_num = 0 if not dest else count_files(Path(dest))
-            self.album_tracker.update_download_log(url, {LogKey.real_num: real_num})
+        if self.config.static_config.compact_metadata and self.journal_path.exists():
+            self.compact(self.journal_path, self.metadata_dest, self.serializer)
+            self.journal_path.unlink()
+            self.logger.debug("Metadata written to %s", self.metadata_dest)
 
-        # write metadata
-        if self.config.static_config.metadata_path:
-            metadata_dest = Path(self.config.static_config.metadata_path)
-        else:
-            metadata_name = "metadata_" + str(datetime.now().strftime("%Y%m%d_%H%M%S")) + ".json"
-            metadata_dest = Path(self.config.static_config.download_dir) / metadata_name
+    @staticmethod
+    def compact(
+        journal_path: Path,
+        metadata_dest: Path,
+        serializer: JSONSerializer | None = None,
+    ) -> None:
+        """Fold a JSONL journal into the legacy `{url: status}` JSON file, last record wins.
+
+        The file is written by the standard library with its indent of four spaces,
+        whatever backend reads the journal.
+        """
+        serializer = serializer or get_serializer()
+        download_status: dict[str, dict[str, Any]] = {}
+        with journal_path.open("rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = serializer.loads(line)
+                download_status[record.pop("url")] = record
 
         metadata_dest.parent.mkdir(parents=True, exist_ok=True)
-        with metadata_dest.open("w", encoding="utf-8") as f:
-            f.write(
-                json.dumps(
-                    download_status,
-                    indent=4,
-                    ensure_ascii=False,
-                    default=enum_to_string,
-                )
-            )
+        metadata_dest.write_bytes(JSONSerializer().dumps(download_status, pretty=True))
@@ -0,0 +1,190 @@
+import os
+import shutil
+import asyncio
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from logging import Logger
+from pathlib import Path
+from typing import BinaryIO
+
+from v2dl.common import metrics
+from v2dl.common.const import VERIFY_MODES
+
+HEAD_SIZE = 512
+TAIL_SIZE = 4096  # end markers are searched here, some encoders append padding
+
+# ISO base media files holding still images, they have no movie box
+IMAGE_BRANDS = (b"avif", b"avis", b"heic", b"heix", b"mif1", b"msf1")
+DECODED_FORMATS = ("jpeg", "png", "gif", "bmp", "tiff")
+HTML_TAGS = (b"<!doctype html", b"<html", b"<head", b"<body")
+
+
+def sniff(head: bytes) -> str | None:
+    """Return the format of a file from its first bytes."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] in (b"WEBP", b"AVI "):
+        return "riff"
+    if head[4:8] == b"ftyp":
+        return "isobmff"
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return "matroska"
+    if head.startswith(b"BM"):
+        return "bmp"
+    if head[:4] in (b"II*\x00", b"MM\x00*"):
+        return "tiff"
+    if head.startswith(b"FLV"):
+        return "flv"
+    if head.startswith(b"\x30\x26\xb2\x75\x8e\x66\xcf\x11"):
+        return "asf"
+    if head.lstrip().startswith(b"<"):
+        lower = head.lower()
+        if any(tag in lower for tag in HTML_TAGS):
+            return "html"
+        # the svg tag may follow a long prolog, such markup stays unrecognized
+        return "svg" if b"<svg" in lower else None
+    return None
+
+
+def check_boxes(f: BinaryIO, size: int, brand: bytes) -> str | None:
+    """Walk the top level boxes of an MP4/MOV file, the last one must end with the file."""
+    offset = 0
+    boxes = set()
+    while offset + 8 <= size:
+        f.seek(offset)
+        header = f.read(16)
+        box_size = int.from_bytes(header[:4], "big")
+        if box_size == 1:
+            box_size = int.from_bytes(header[8:16], "big")
+        elif box_size == 0:
+            box_size = size - offset
+        if box_size < 8:
+            return f"invalid box at offset {offset}"
+        boxes.add(header[4:8])
+        offset += box_size
+    if offset != size:
+        return f"truncated, {offset} of {size} bytes"
+    if b"moov" not in boxes and brand not in IMAGE_BRANDS:
+        return "no movie box"
+    return None
+
+
+def check_file(path: str, decode: bool = False, expected_size: int | None = None) -> str | None:
+    """Return why a downloaded file is not a complete image or video, None if it is.
+
+    The file must have the `expected_size` declared by the server, if any. The magic
+    bytes give the format, the end marker or the sizes in the header tell whether it is
+    complete. A format not recognized passes with the size check alone, only HTML pages
+    are rejected. With `decode`, images are also decoded by Pillow. Runs in the
+    verifier's worker processes.
+    """
+    with open(path, "rb") as f:
+        head = f.read(HEAD_SIZE)
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(size - TAIL_SIZE, 0))
+        tail = f.read()
+
+        kind = sniff(head)
+        if not head:
+            return "empty file"
+        if expected_size is not None and size != expected_size:
+            return f"truncated, {size} of {expected_size} bytes"
+        if kind is None:
+            return None
+        if kind == "html":
+            return "HTML page instead of media"
+        if kind == "isobmff":
+            if reason := check_boxes(f, size, head[8:12]):
+                return reason
+
+    if kind == "jpeg" and b"\xff\xd9" not in tail:
+        return "truncated jpeg, no end of image marker"
+    if kind == "png" and b"IEND" not in tail:
+        return "truncated png, no end chunk"
+    if kind == "gif" and not tail.rstrip(b"\x00").endswith(b";"):
+        return "truncated gif, no trailer"
+    if kind == "svg" and b"</svg>" not in tail:
+        return "truncated svg"
+    if kind == "riff" and size < int.from_bytes(head[4:8], "little") + 8:
+        return f"truncated, {size} of {int.from_bytes(head[4:8], 'little') + 8} bytes"
+    if kind == "bmp" and size < int.from_bytes(head[2:6], "little"):
+        return f"truncated, {size} of {int.from_bytes(head[2:6], 'little')} bytes"
+    if decode and (kind in DECODED_FORMATS or (kind == "riff" and head[8:12] == b"WEBP")):
+        return decode_image(path)
+    return None
+
+
+def decode_image(path: str) -> str | None:
+    from PIL import Image  # noqa: PLC0415
+
+    try:
+        with Image.open(path) as image:
+            image.load()
+    except Exception as e:
+        return f"decode failed: {e}"
+    return None
+
+
+class FileVerifier:
+    """Check downloaded files in a process pool and move the broken ones to quarantine.
+
+    CDNs sometimes answer with an HTML error page or cut the body short while still
+    reporting success. `header` mode checks the magic bytes and the completeness of the
+    header, `decode` mode also decodes images, which requires Pillow. The pool is
+    started on the first check, off the event loop and the writer threads.
+    """
+
+    def __init__(self, mode: str, workers: int, quarantine_dir: str | Path, logger: Logger) -> None:
+        if mode not in VERIFY_MODES:
+            raise ValueError(f"Unknown verify mode '{mode}', expected one of {VERIFY_MODES}")
+        if mode == "decode" and importlib.util.find_spec("PIL") is None:
+            logger.warning("Pillow is not installed, images are verified without decoding")
+            mode = "header"
+        self.mode = mode
+        self.workers = max(workers, 1)
+        self.quarantine_dir = Path(quarantine_dir)
+        self.logger = logger
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # forking a process with running threads is unsafe, the workers start clean
+            context = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=context)
+        return self._executor
+
+    async def check(self, path: Path, expected_size: int | None = None) -> str | None:
+        """Return why the file at `path` is broken, None if it is fine or checks are off."""
+        if self.mode == "off":
+            return None
+        loop = asyncio.get_running_loop()
+        try:
+            reason = await loop.run_in_executor(
+                self.executor, check_file, str(path), self.mode == "decode", expected_size
+            )
+        except OSError as e:
+            reason = f"unreadable: {e}"
+        except BrokenProcessPool:
+            self._executor = None  # a worker died, e.g. in a decoder, the next check restarts
+            reason = "verifier worker crashed"
+        metrics.VERIFIED_FILES.inc(result="ok" if reason is None else "corrupt")
+        return reason
+
+    def quarantine(self, path: Path) -> Path:
+        """Move a broken file under the quarantine directory, in a folder of its album."""
+        dest = self.quarantine_dir / path.parent.name / path.name
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(path, dest)
+        return dest
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
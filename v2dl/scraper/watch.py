@@ -0,0 +1,213 @@
+import os
+import sys
+import ctypes
+import asyncio
+import ctypes.util
+from collections.abc import Callable
+from contextlib import suppress
+from logging import Logger
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from v2dl.common import AccountError
+from v2dl.scraper.tools import UrlFileReader
+
+if TYPE_CHECKING:
+    from v2dl.scraper.manager import ScrapeManager
+    from v2dl.web_bot.base import BaseBot
+
+POLL_INTERVAL = 2.0  # seconds between two checks of the file without inotify
+RESCAN_INTERVAL = 60.0  # inotify misses changes on network file systems
+
+# inotify(7) events of the watched directory
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+FileSignature = tuple[int, int, int]
+
+
+class FileWatcher:
+    """Wait for a file to change by polling its inode, size and mtime."""
+
+    def __init__(self, path: str | Path, interval: float = POLL_INTERVAL) -> None:
+        self.path = Path(path)
+        self.interval = interval
+        self.signature = self.stat()
+
+    def stat(self) -> FileSignature | None:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def changed(self) -> bool:
+        signature = self.stat()
+        if signature == self.signature:
+            return False
+        self.signature = signature
+        return True
+
+    async def wait(self, timeout: float | None = None) -> bool:
+        """Return True once the file changed, False after `timeout` seconds without change."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while not self.changed():
+            remaining = self.interval if deadline is None else deadline - loop.time()
+            if remaining <= 0:
+                return False
+            await self.sleep(min(self.interval, remaining))
+        return True
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher(FileWatcher):
+    """Sleep until inotify reports a change in the directory of the file.
+
+    The directory is watched rather than the file, editors and `mv` replace the file by
+    another inode. Every event only wakes up the stat check of `FileWatcher`.
+    """
+
+    def __init__(self, path: str | Path, interval: float = RESCAN_INTERVAL) -> None:
+        super().__init__(path, interval)
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        directory = os.fsencode(self.path.resolve().parent)
+        if libc.inotify_add_watch(self.fd, directory, WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {self.path.parent}")
+
+        self.event = asyncio.Event()
+        self.loop = asyncio.get_running_loop()
+        self.loop.add_reader(self.fd, self.on_readable)
+
+    def on_readable(self) -> None:
+        with suppress(BlockingIOError):
+            while os.read(self.fd, 4096):
+                pass
+        self.event.set()
+
+    async def sleep(self, seconds: float) -> None:
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self.event.wait(), seconds)
+        self.event.clear()
+
+    def close(self) -> None:
+        self.loop.remove_reader(self.fd)
+        os.close(self.fd)
+
+
+def create_watcher(path: str | Path, logger: Logger) -> FileWatcher:
+    """Use inotify on Linux, poll the file elsewhere or when inotify is not available."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(path)
+        except (OSError, AttributeError) as e:
+            logger.debug("inotify is not available, polling %s: %s", path, e)
+    return FileWatcher(path)
+
+
+class UrlFileWatch:
+    """Scrape a URL file, then keep scraping the lines appended to it.
+
+    The bot and the download client stay alive between batches, so new URLs start without
+    any startup cost. After `watch_idle_timeout` seconds without new URLs the browser, the
+    account and the connections are released, and the same bot is reopened for the next
+    batch. `bot_factory` only builds the bot when the scrape manager has none. Runs until
+    cancelled or until no account is left.
+    """
+
+    def __init__(
+        self,
+        scrape_manager: "ScrapeManager",
+        url_file: str,
+        bot_factory: Callable[[], "BaseBot"],
+    ) -> None:
+        self.scrape_manager = scrape_manager
+        self.url_file = url_file
+        self.bot_factory = bot_factory
+        self.bot = scrape_manager.web_bot
+        self.config = scrape_manager.config
+        self.logger = scrape_manager.logger
+        self.idle_timeout = self.config.static_config.watch_idle_timeout
+        self.reader = UrlFileReader(
+            url_file,
+            self.logger,
+            self.config.static_config.state_dir,
+            resume=self.config.static_config.resume,
+            follow=True,
+        )
+        self.preprocessor = scrape_manager.create_preprocessor()
+
+    async def run(self) -> bool:
+        watcher = create_watcher(self.url_file, self.logger)
+        self.logger.info("Watching %s for new urls", self.url_file)
+        try:
+            while True:
+                try:
+                    scraped = await self.scrape_new_urls()
+                except AccountError as e:
+                    # the url stays in the file, a later watch starts from it
+                    self.logger.error("%s, stopping the watch", e)
+                    return False
+                if scraped:
+                    self.logger.info("Waiting for new urls in %s", self.url_file)
+                released = self.scrape_manager.web_bot is None
+                if released or not self.idle_timeout:
+                    await watcher.wait()
+                elif not await watcher.wait(self.idle_timeout):
+                    await self.release()
+        finally:
+            watcher.close()
+            self.preprocessor.report()
+
+    async def scrape_new_urls(self) -> int:
+        scraped = 0
+        for url in self.preprocessor.process(self.reader):
+            if self.scrape_manager.web_bot is None:
+                self.logger.info("New urls in %s, starting the bot", self.url_file)
+                self.scrape_manager.web_bot = self.start_bot()
+            try:
+                await self.scrape_manager.scrape_url(url)
+            except AccountError:
+                raise
+            except Exception as e:
+                # a bad line must not stop the watch nor be retried forever
+                self.logger.exception("Failed to scrape %s: %s", url, e)
+            self.reader.commit()
+            scraped += 1
+        self.reader.commit()  # skipped lines
+        return scraped
+
+    def start_bot(self) -> "BaseBot":
+        """Build the bot once, it keeps its account manager and read counts afterwards."""
+        if self.bot is None:
+            self.bot = self.bot_factory()
+        else:
+            self.bot.reopen()
+        return self.bot
+
+    async def release(self) -> None:
+        """Close the browser and the connections, the album plan is saved meanwhile."""
+        self.logger.info("No new urls for %ds, releasing the bot", self.idle_timeout)
+        web_bot = self.scrape_manager.web_bot
+        self.scrape_manager.web_bot = None
+        if web_bot is not None:
+            web_bot.close_driver()
+            web_bot.account_manager.release(web_bot)
+        await self.scrape_manager.client_pool.aclose()
+        try:
+            self.scrape_manager.planner.save()
+        except OSError as e:
+            self.logger.error("Failed to save the album plan: %s", e)
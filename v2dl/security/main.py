@@ -1,13 +1,15 @@
 import os
-import sys
+import copy
 import atexit
 import base64
 import ctypes
 import random
 import secrets
+import tempfile
 import threading
+from contextlib import suppress
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from logging import Logger
 from typing import Any, Literal, overload
 
@@ -18,7 +20,18 @@ from nacl.pwhash import argon2id
 from nacl.secret import SecretBox
 from nacl.utils import EncryptedMessage, random as nacl_random
 
-from v2dl.common import ConfigManager, EncryptionConfig, SecurityError, cookies
+from v2dl.common import (
+    AccountError,
+    ConfigManager,
+    EncryptionConfig,
+    SecurityError,
+    cookies,
+    metrics,
+)
+
+# libyaml is much faster for large account pools, PyYAML may be built without it
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 
 
 @dataclass
@@ -251,8 +264,89 @@ class KeyManager(KeyIOHelper):
         return KeyPair(private_key, private_key.public_key)
 
 
+class AccountStore:
+    """Persist YAML accounts with debounced, atomic writes.
+
+    Changed records are marked dirty and written together by a background timer
+    `delay` seconds after the first change. The file is replaced atomically, a crash
+    leaves either the old or the new file, never a partial one.
+    """
+
+    def __init__(
+        self, logger: Logger, path: str, lock: threading.RLock, delay: float = 2.0
+    ) -> None:
+        self.logger = logger
+        self.path = path
+        self.lock = lock
+        self.delay = delay
+        self.data: dict[str, Any] = {}
+        self.dirty: set[str] = set()
+        self.timer: threading.Timer | None = None
+
+    def load(self) -> dict[str, Any]:
+        try:
+            with open(self.path, "rb") as file:
+                self.data = yaml.load(file, Loader=YamlLoader) or {}
+        except FileNotFoundError:
+            self.data = {}
+        return self.data
+
+    def mark_dirty(self, *usernames: str) -> None:
+        with self.lock:
+            self.dirty.update(usernames)
+            if self.timer is None:
+                self.timer = threading.Timer(self.delay, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self) -> None:
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.dirty:
+                return
+            dirty, self.dirty = self.dirty, set()
+            snapshot = copy.deepcopy(self.data)
+
+        try:
+            self.write(snapshot)
+        except OSError as e:
+            self.logger.error("Failed to save accounts to %s: %s", self.path, e)
+            with self.lock:
+                self.dirty |= dirty
+        else:
+            self.logger.debug("Saved %d changed accounts to %s", len(dirty), self.path)
+
+    def write(self, data: dict[str, Any]) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".accounts.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                yaml.dump(data, file, Dumper=YamlDumper, default_flow_style=False)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            with suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+
+        if os.name != "nt":  # persist the rename itself
+            dir_fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    def close(self) -> None:
+        self.flush()
+
+
 class AccountManager:
     MAX_QUOTA = 16
+    QUOTA_RESET = timedelta(days=1)
+    TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
     DEFAULT_RUNTIME_STATUS = {
         "cookies_valid": True,
         "password_valid": True,
@@ -271,25 +365,29 @@ class AccountManager:
         self.key_manager = key_manager
         self.lock = threading.RLock()
 
+        self.store = AccountStore(logger, self.yaml_file_path, self.lock)
         self.yaml_accounts = self._load_yaml_accounts()
         self.cli_accounts = self.load_runtime_account(cookies_path)
+        self.partition: tuple[int, int] | None = None
+
+        # 排程狀態：本次執行的閱讀次數、租用者、租用順序（用於輪替）
+        self.reads: dict[str, int] = {}
+        self.leases: dict[str, object] = {}
+        self.lease_order: dict[str, int] = {}
+        self.lease_count = 0
 
         atexit.register(self.finalize)
 
     # === YAML 帳號管理方法 (具備CRUD功能，會持久化) ===
     def _load_yaml_accounts(self) -> dict[str, Any]:
         """從 YAML 檔案載入帳號資料"""
-        try:
-            with open(self.yaml_file_path) as file:
-                return yaml.safe_load(file) or {}
-        except FileNotFoundError:
-            return {}
+        return self.store.load()
 
-    def _save_yaml_accounts(self) -> None:
-        if self.yaml_accounts:
-            with self.lock:
-                with open(self.yaml_file_path, "w") as file:
-                    yaml.dump(self.yaml_accounts, file, default_flow_style=False)
+    def _save_yaml_accounts(self, *usernames: str, immediate: bool = True) -> None:
+        """標記變更的帳號，執行期間的狀態更新延遲合併寫入，使用者操作立即寫入"""
+        self.store.mark_dirty(*usernames)
+        if immediate:
+            self.store.flush()
 
     def create_yaml_account(
         self, username: str, password: str, cookies: str, public_key: PublicKey
@@ -303,7 +401,7 @@ class AccountManager:
                 **self.DEFAULT_RUNTIME_STATUS,
             }
         self.logger.info("Account %s has been created.", username)
-        self._save_yaml_accounts()
+        self._save_yaml_accounts(username)
 
     def read_yaml_account(self, username: str) -> dict[str, Any] | None:
         return self.yaml_accounts.get(username)
@@ -316,7 +414,7 @@ class AccountManager:
                 self.logger.debug(
                     "Updated field '%s' for account '%s' with value: %s", field, username, value
                 )
-                self._save_yaml_accounts()
+                self._save_yaml_accounts(username, immediate=False)
             else:
                 self.logger.error("Account '%s' not found.", username)
 
@@ -325,7 +423,7 @@ class AccountManager:
             if username in self.yaml_accounts:
                 del self.yaml_accounts[username]
                 self.logger.info("Account %s has been deleted.", username)
-                self._save_yaml_accounts()
+                self._save_yaml_accounts(username)
             else:
                 self.logger.error("Account %s not found.", username)
 
@@ -500,7 +598,7 @@ class AccountManager:
             return "both"  # 帳號存在於兩個來源中
 
     def finalize(self) -> None:
-        self._save_yaml_accounts()
+        self.store.close()
 
     # === 原有功能保持不變 ===
     def verify_password(self, account: str, password: str, private_key: PublicKey) -> bool:
@@ -523,17 +621,129 @@ class AccountManager:
             print("*------------------*")
             return False
 
+    def set_partition(self, index: int, count: int) -> None:
+        """只使用第 index 份帳號，供多程序分片時每個 worker 使用不同帳號"""
+        self.partition = (index, count)
+
     def random_pick(self) -> str:
-        """隨機選擇有效帳號"""
-        all_accounts = self.list_all_accounts()
-        valid_accounts = {k: v for k, v in all_accounts.items() if self.is_valid_account(k)}
+        """選擇帳號 - 向後相容，改用 lease"""
+        return self.lease()
+
+    def lease(self, holder: object = None) -> str:
+        """租用剩餘額度最多的帳號給 holder，額度相同時輪替最久未使用的帳號
+
+        holder 先前租用的帳號會被釋放，已被其他 holder 租用的帳號只在沒有空閒帳號時才會共用。
+        預估額度只用於排序，所有帳號都達到預估上限時退回閱讀次數最少的帳號，只有實際遇到
+        閱讀上限頁面的帳號才會被排除。沒有可用帳號時拋出 AccountError。
+        """
+        with self.lock:
+            self.release(holder)
+            for account in self.yaml_accounts.keys() | self.cli_accounts.keys():
+                self.refresh_quota(account)
+            candidates = self.eligible_accounts()
+            metrics.ACCOUNTS_AVAILABLE.set(len(candidates))
+            if not candidates:
+                message = "No eligible accounts available for login"
+                reset_at = self.next_quota_reset()
+                if reset_at is not None and reset_at != datetime.max:
+                    message += f", the earliest quota reset is at {reset_at:{self.TIME_FORMAT}}"
+                raise AccountError(message)
+
+            random.shuffle(candidates)  # 從未租用過的帳號隨機排序
+            account = min(
+                candidates,
+                key=lambda k: (
+                    not self.remaining_quota(k),
+                    k in self.leases,
+                    -self.remaining_quota(k),
+                    self.reads.get(k, 0),
+                    self.lease_order.get(k, -1),
+                ),
+            )
+
+            self.leases[account] = holder
+            self.lease_order[account] = self.lease_count
+            self.lease_count += 1
+            self.logger.debug(
+                "Leased account %s, %d reads left", account, self.remaining_quota(account)
+            )
+            return account
+
+    def release(self, holder: object = None) -> None:
+        """釋放 holder 租用的帳號"""
+        with self.lock:
+            for account in [k for k, v in self.leases.items() if v is holder]:
+                del self.leases[account]
+
+    def eligible_accounts(self) -> list[str]:
+        """返回有效帳號，設定分片時只返回該分片的帳號"""
+        accounts = self.yaml_accounts.keys() | self.cli_accounts.keys()
+        valid = sorted(k for k in accounts if self.is_valid_account(k))
+
+        if self.partition is not None:
+            index, count = self.partition
+            owned = valid[index::count]
+            # 帳號比分片少時退回共用全部帳號
+            if owned:
+                return owned
+        return valid
+
+    def is_available(self, account: str) -> bool:
+        """帳號有效，且還有預估額度或其他帳號也沒有預估額度"""
+        if not self.is_valid_account(account):
+            return False
+        if self.remaining_quota(account):
+            return True
+        return not any(self.remaining_quota(k) for k in self.eligible_accounts() if k != account)
+
+    def record_read(self, account: str) -> None:
+        """記錄一次頁面閱讀"""
+        with self.lock:
+            self.reads[account] = self.reads.get(account, 0) + 1
+
+    def remaining_quota(self, account: str) -> int:
+        """預估帳號剩餘的閱讀額度，超額的帳號在預估重置時間前為 0"""
+        if self.quota_reset_at(account) is not None:
+            return 0
+        return max(self.MAX_QUOTA - self.reads.get(account, 0), 0)
+
+    def quota_reset_at(self, account: str) -> datetime | None:
+        """預估超額帳號的額度重置時間，未超額或已重置時返回 None，不修改帳號狀態
 
-        if not valid_accounts:
-            self.logger.info("No eligible accounts available for login. Existing.")
-            sys.exit(0)
+        沒有或無法解析超額時間時無法預估，返回 datetime.max，帳號維持不可用。
+        """
+        state = self.get_account(account) or {}
+        if not state.get("exceed_quota", False):
+            return None
+
+        try:
+            reset_at = datetime.strptime(state.get("exceed_time", ""), self.TIME_FORMAT)
+            reset_at += self.QUOTA_RESET
+        except (TypeError, ValueError):
+            return datetime.max
+
+        return reset_at if reset_at > datetime.now() else None
+
+    def refresh_quota(self, account: str) -> None:
+        """清除已過預估重置時間帳號的超額狀態和閱讀次數，由 lease 呼叫"""
+        state = self.get_account(account) or {}
+        if not state.get("exceed_quota", False) or self.quota_reset_at(account) is not None:
+            return
+        with self.lock:
+            self.update_runtime_state(account, "exceed_quota", False)
+            self.reads.pop(account, None)
+
+    def next_quota_reset(self) -> datetime | None:
+        times = [self.quota_reset_at(k) for k in self.yaml_accounts.keys() | self.cli_accounts]
+        return min((t for t in times if t is not None), default=None)
 
-        account, _ = random.choice(list(valid_accounts.items()))
-        return account
+    def mark_exhausted(self, account: str) -> None:
+        """標記帳號已用盡閱讀額度"""
+        now = datetime.now().strftime(self.TIME_FORMAT)
+        with self.lock:
+            self.reads[account] = self.MAX_QUOTA
+            self.update_runtime_state(account, "exceed_quota", True)
+            self.update_runtime_state(account, "exceed_time", now)
 
     def get_pw(self, account: str, private_key: PrivateKey) -> str:
         account_info = self.yaml_accounts[account]
@@ -553,7 +763,7 @@ class AccountManager:
 
         return (
             state.get("cookies_valid", True) or state.get("password_valid", True)
-        ) and not state.get("exceed_quota", False)
+        ) and self.quota_reset_at(account) is None
 
     def edit_yaml_account(
         self,
@@ -576,7 +786,7 @@ class AccountManager:
                 if new_cookies:
                     self.yaml_accounts[new_username or old_username]["cookies"] = new_cookies
                 self.logger.info("Account %s has been updated.", old_username)
-                self._save_yaml_accounts()
+                self._save_yaml_accounts(old_username, new_username or old_username)
             else:
                 self.logger.error("Account not found.")
 
@@ -683,10 +893,12 @@ class AccountManager:
             self.logger.info("Account %s has been updated.", old_username)
 
             if is_yaml:
-                self._save_yaml_accounts()
+                self._save_yaml_accounts(old_username, target_username)
 
     def update_runtime_state(self, account: str, field: str, value: Any) -> None:
         updated = False
+        if field == "exceed_quota" and value:
+            metrics.ACCOUNT_QUOTA_EXCEEDED.inc()
 
         if account in self.cli_accounts:
             self.update_cli_account(account, field, value)
@@ -0,0 +1,4 @@
+from v2dl.server.api import JobServer
+from v2dl.server.jobs import Job, JobScheduler, JobState
+
+__all__ = ["Job", "JobScheduler", "JobServer", "JobState"]
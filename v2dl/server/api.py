@@ -0,0 +1,171 @@
+import asyncio
+import contextlib
+from http import HTTPStatus
+from logging import Logger
+from typing import Any
+
+from v2dl.common.const import DEFAULT_SERVE_ADDRESS
+from v2dl.common.serializer import get_serializer
+from v2dl.scraper.tools import UrlHandler
+from v2dl.server.jobs import JobScheduler
+
+MAX_BODY_SIZE = 1 << 20
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str = "") -> None:
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class JobServer:
+    """Minimal HTTP/1.1 JSON API in front of a `JobScheduler`.
+
+    Endpoints:
+        GET    /health       server and queue status
+        GET    /jobs         list all jobs
+        POST   /jobs         submit `{"url": ..., "priority": 0, "options": {...}}`
+        GET    /jobs/<id>    show one job
+        DELETE /jobs/<id>    cancel a queued or running job
+        GET    /events       stream progress events as newline delimited JSON
+
+    Every response closes the connection, there is no keep-alive.
+    """
+
+    def __init__(self, scheduler: JobScheduler, address: str, logger: Logger) -> None:
+        self.scheduler = scheduler
+        self.address = address or DEFAULT_SERVE_ADDRESS
+        self.logger = logger
+        self.serializer = get_serializer(scheduler.config.static_config.json_backend)
+
+    async def serve_forever(self) -> None:
+        if self.address.startswith("unix:"):
+            path = self.address.removeprefix("unix:")
+            server = await asyncio.start_unix_server(self.handle, path=path)
+        else:
+            host, _, port = self.address.rpartition(":")
+            server = await asyncio.start_server(self.handle, host or "127.0.0.1", int(port))
+
+        self.logger.info("Job server listening on %s", self.address)
+        worker = asyncio.create_task(self.scheduler.run())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await worker  # let the running job restore the config and publish its end
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            method, path, body = await self.read_request(reader)
+            if method == "GET" and path == "/events":
+                await self.stream_events(writer)
+            else:
+                status, payload = self.route(method, path, body)
+                await self.respond(writer, status, payload)
+        except HTTPError as e:
+            await self.respond(writer, e.status, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader: asyncio.StreamReader) -> tuple[str, str, Any]:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        try:
+            method, target, _ = request_line.split(" ", 2)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+        headers = {}
+        while line := (await reader.readline()).decode("latin-1").strip():
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+
+        body = None
+        if length:
+            try:
+                body = self.serializer.loads(await reader.readexactly(length))
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be JSON")
+
+        return method.upper(), target.split("?", 1)[0].rstrip("/") or "/", body
+
+    def route(self, method: str, path: str, body: Any) -> tuple[HTTPStatus, Any]:
+        scheduler = self.scheduler
+        if path == "/health" and method == "GET":
+            queued = sum(1 for job in scheduler.jobs.values() if not job.is_finished)
+            current = scheduler.current.id if scheduler.current else None
+            return HTTPStatus.OK, {"status": "ok", "pending": queued, "running": current}
+
+        if path == "/jobs":
+            if method == "GET":
+                return HTTPStatus.OK, {"jobs": [job.to_dict() for job in scheduler.jobs.values()]}
+            if method == "POST":
+                return HTTPStatus.CREATED, self.submit(body).to_dict()
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+
+        if path.startswith("/jobs/"):
+            job_id = path.removeprefix("/jobs/")
+            if method == "GET":
+                job = scheduler.jobs.get(job_id)
+            elif method == "DELETE":
+                job = scheduler.cancel(job_id)
+            else:
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+            if job is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"Job {job_id} not found")
+            return HTTPStatus.OK, job.to_dict()
+
+        raise HTTPError(HTTPStatus.NOT_FOUND)
+
+    def submit(self, body: Any) -> Any:
+        if not isinstance(body, dict) or not isinstance(body.get("url"), str):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Field 'url' is required")
+        if UrlHandler.get_scrape_type(body["url"]) is None:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Unsupported URL: {body['url']}")
+
+        priority = body.get("priority", 0)
+        options = body.get("options", {})
+        if not isinstance(priority, int) or not isinstance(options, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid 'priority' or 'options'")
+        return self.scheduler.submit(body["url"], priority, options)
+
+    async def respond(self, writer: asyncio.StreamWriter, status: HTTPStatus, payload: Any) -> None:
+        body = self.serializer.dumps(payload)
+        writer.write(
+            (
+                f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode("latin-1")
+            + body
+        )
+        await writer.drain()
+
+    async def stream_events(self, writer: asyncio.StreamWriter) -> None:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: application/x-ndjson\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        await writer.drain()
+
+        subscriber = self.scheduler.subscribe()
+        try:
+            while True:
+                event = await subscriber.get()
+                writer.write(self.serializer.dumps(event) + b"\n")
+                await writer.drain()
+        finally:
+            self.scheduler.unsubscribe(subscriber)
@@ -0,0 +1,164 @@
+import time
+import uuid
+import asyncio
+import itertools
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from v2dl.scraper import ScrapeManager
+
+
+class JobState(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+# per-job overrides of the static config, restored after the job finishes
+JOB_OPTIONS = ("force_download", "page_range", "language")
+
+
+@dataclass
+class Job:
+    url: str
+    priority: int = 0
+    options: dict[str, Any] = field(default_factory=dict)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    state: JobState = JobState.QUEUED
+    error: str = ""
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    task: "asyncio.Task[str] | None" = field(default=None, repr=False)
+    cancel_requested: bool = field(default=False, repr=False)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.state in (JobState.DONE, JobState.FAILED, JobState.CANCELLED)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "url": self.url,
+            "priority": self.priority,
+            "options": self.options,
+            "state": self.state.value,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobScheduler:
+    """Run scrape jobs one at a time on a long-lived `ScrapeManager`.
+
+    Jobs with a higher priority run first, jobs of the same priority run in submission
+    order. Progress events of the scrape manager are tagged with the running job and
+    broadcast to all subscribers together with the job state changes.
+    """
+
+    def __init__(self, scrape_manager: "ScrapeManager", max_events: int = 1000) -> None:
+        self.scrape_manager = scrape_manager
+        self.config = scrape_manager.config
+        self.logger = scrape_manager.logger
+        self.max_events = max_events
+
+        self.jobs: dict[str, Job] = {}
+        self.current: Job | None = None
+        self._queue: asyncio.PriorityQueue[tuple[int, int, str]] = asyncio.PriorityQueue()
+        self._counter = itertools.count()
+        self._subscribers: set[asyncio.Queue[dict[str, Any]]] = set()
+
+        self.scrape_manager.add_listener(self._forward)
+
+    def submit(self, url: str, priority: int = 0, options: dict[str, Any] | None = None) -> Job:
+        options = {k: v for k, v in (options or {}).items() if k in JOB_OPTIONS}
+        job = Job(url=url, priority=priority, options=options)
+        self.jobs[job.id] = job
+        self._queue.put_nowait((-priority, next(self._counter), job.id))
+        self.publish("job_queued", job)
+        return job
+
+    def cancel(self, job_id: str) -> Job | None:
+        job = self.jobs.get(job_id)
+        if job is None or job.is_finished:
+            return job
+
+        if job.state == JobState.QUEUED:
+            # the worker skips it when it is popped
+            self._finish(job, JobState.CANCELLED)
+        elif job.task is not None:
+            job.cancel_requested = True
+            job.task.cancel()
+        return job
+
+    def subscribe(self) -> "asyncio.Queue[dict[str, Any]]":
+        subscriber: asyncio.Queue[dict[str, Any]] = asyncio.Queue(self.max_events)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: "asyncio.Queue[dict[str, Any]]") -> None:
+        self._subscribers.discard(subscriber)
+
+    def publish(self, event: str, job: Job | None, **data: Any) -> None:
+        message = {"event": event, "time": time.time(), **data}
+        if job is not None:
+            message["job"] = job.to_dict()
+        for subscriber in self._subscribers:
+            if subscriber.full():
+                # drop the oldest event of a slow consumer instead of blocking the jobs
+                subscriber.get_nowait()
+            subscriber.put_nowait(message)
+
+    async def run(self) -> None:
+        """Worker loop, runs until cancelled."""
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self.jobs[job_id]
+            if job.state != JobState.QUEUED:
+                continue
+            await self._run_job(job)
+
+    async def _run_job(self, job: Job) -> None:
+        static_config = self.config.static_config
+        previous = {key: getattr(static_config, key) for key in job.options}
+        for key, value in job.options.items():
+            setattr(static_config, key, value)
+
+        job.state = JobState.RUNNING
+        job.started_at = time.time()
+        self.current = job
+        self.publish("job_started", job)
+        job.task = asyncio.create_task(self.scrape_manager.scrape_url(job.url))
+        try:
+            await job.task
+            self._finish(job, JobState.DONE)
+        except asyncio.CancelledError:
+            self._finish(job, JobState.CANCELLED)
+            # propagate only when the scheduler itself is being cancelled
+            if not job.cancel_requested:
+                raise
+        except Exception as e:
+            # one broken job must not stop the worker and the jobs queued behind it
+            job.error = str(e) or type(e).__name__
+            self.logger.exception("Job %s failed: %s", job.id, e)
+            self._finish(job, JobState.FAILED)
+        finally:
+            self.current = None
+            for key, value in previous.items():
+                setattr(static_config, key, value)
+
+    def _finish(self, job: Job, state: JobState) -> None:
+        job.state = state
+        job.finished_at = time.time()
+        job.task = None
+        self.publish(f"job_{state.value}", job)
+
+    def _forward(self, event: str, data: dict[str, Any]) -> None:
+        job_id = self.current.id if self.current is not None else None
+        self.publish(event, None, job_id=job_id, **data)
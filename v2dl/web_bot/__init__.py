@@ -3,8 +3,9 @@ import importlib
 from v2dl.common.cookies import load_cookies
 from v2dl.web_bot.drission_bot import DrissionBot
 from v2dl.web_bot.get import get_bot
+from v2dl.web_bot.http_bot import HttpBot
 
-__all__ = ["DrissionBot", "get_bot", "load_cookies"]
+__all__ = ["DrissionBot", "HttpBot", "get_bot", "load_cookies"]
 
 
 def __getattr__(name: str) -> None:
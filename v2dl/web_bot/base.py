@@ -13,11 +13,15 @@ from v2dl.security import AccountManager, KeyManager
 class BaseBot(ABC):
     """Abstract base class for bots, defining shared behaviors."""
 
+    # pages `auto_page_scroll` may fetch at the same time, a browser has a single tab
+    page_concurrency = 1
+
     def __init__(
         self,
         config: Config,
         key_manager: KeyManager,
         account_manager: AccountManager,
+        holder: "BaseBot | None" = None,
     ):
         self.config = config
         self.runtime_config = config.runtime_config
@@ -26,7 +30,9 @@ class BaseBot(ABC):
 
         self.key_manager = key_manager
         self.account_manager = account_manager
-        self.account = account_manager.random_pick()
+        # a bot working for `holder`, e.g. the browser of the http bot, shares its lease
+        self.holder = holder or self
+        self.account: str = holder.account if holder is not None else account_manager.lease(self)
         key_pair = self.key_manager.load_keys()
         self.private_key, self.public_key = key_pair.private_key, key_pair.public_key
 
@@ -40,6 +46,11 @@ class BaseBot(ABC):
     def close_driver(self) -> None:
         """Close the browser and handle cleanup."""
 
+    def reopen(self) -> None:
+        """Lease an account and start the driver again after `close_driver`."""
+        self.account = self.account_manager.lease(self.holder)
+        self.init_driver()
+
     def prepare_chrome_profile(self) -> str:
         user_data_dir = self.config.static_config.chrome_profile_path
 
@@ -71,10 +82,24 @@ class BaseBot(ABC):
         """
         raise NotImplementedError("Subclasses must implement automated retry logic.")
 
+    def export_session(self) -> tuple[dict[str, str], str]:
+        """Return the cookies and user agent of the browser session for HTTP requests."""
+        raise NotImplementedError("Subclasses must implement session export.")
+
     def handle_login(self) -> bool:
         """Login logic, implemented by subclasses."""
         raise NotImplementedError("Subclasses must implement login logic.")
 
+    def logout(self) -> None:
+        """Log out of the current account, implemented by subclasses."""
+        raise NotImplementedError("Subclasses must implement logout.")
+
+    def rotate_account(self) -> None:
+        """Switch to another account before the current one runs out of reads."""
+        self.logger.info("Account %s has no reads left, switching account", self.account)
+        self.logout()
+        self.account = self.account_manager.lease(self.holder)
+
     def human_like_type(self, element: Any, text: str) -> None:
         """Simulate human-like typing into a field."""
         raise NotImplementedError("Subclasses must implement scroll behavior.")
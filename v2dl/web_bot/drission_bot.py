@@ -2,6 +2,7 @@ import sys
 import time
 import random
 import asyncio
+from contextlib import suppress
 from datetime import datetime
 from logging import Logger
 from typing import TYPE_CHECKING, Any
@@ -10,9 +11,11 @@ from DrissionPage import ChromiumOptions, ChromiumPage
 from DrissionPage.common import wait_until
 from DrissionPage.errors import ContextLostError, ElementNotFoundError, WaitTimeoutError
 
+from v2dl.common import metrics, tracing
+from v2dl.common.clearance import CLEARANCE_COOKIE, ClearanceCache
 from v2dl.common.const import BASE_URL
 from v2dl.common.cookies import load_cookies
-from v2dl.common.error import BotError
+from v2dl.common.error import AccountError, BotError
 from v2dl.web_bot.base import BaseBehavior, BaseBot, BaseScroll
 
 if TYPE_CHECKING:
@@ -26,14 +29,16 @@ class DrissionBot(BaseBot):
         config: "Config",
         key_manager: "KeyManager",
         account_manager: "AccountManager",
+        holder: "BaseBot | None" = None,
     ) -> None:
-        super().__init__(config, key_manager, account_manager)
+        super().__init__(config, key_manager, account_manager, holder)
         self.config = config
+        self.clearance = ClearanceCache.from_state_dir(config.static_config.state_dir)
         self.init_driver()
-        self.cloudflare = DriCloudflareHandler(self.page, self.logger)
 
     def init_driver(self) -> None:
         co = ChromiumOptions()
+        co.set_local_port(self.config.static_config.chrome_port)
         args = self.parse_chrome_args()
         if len(args) > 0:
             for arg in args:
@@ -58,10 +63,28 @@ class DrissionBot(BaseBot):
         self.page.set.scroll.wait_complete(on_off=True)
 
         self.scroller = DriScroll(self.page, self.config, self.logger)
+        self.cloudflare = DriCloudflareHandler(self.page, self.logger)
+        self.load_clearance()
 
     def close_driver(self) -> None:
         self.page.quit()
 
+    def export_session(self) -> tuple[dict[str, str], str]:
+        cookies = {cookie["name"]: cookie["value"] for cookie in self.page.cookies()}
+        return cookies, self.page.user_agent
+
+    def load_clearance(self) -> None:
+        """Start with a cached clearance of the same user agent to skip the challenge."""
+        clearance = self.clearance.get(self.page.user_agent)
+        if clearance is not None:
+            self.page.set.cookies(clearance.cookie())
+            self.logger.debug("Loaded cached Cloudflare clearance")
+
+    def save_clearance(self) -> None:
+        for cookie in self.page.cookies(all_info=True):
+            if cookie["name"] == CLEARANCE_COOKIE:
+                self.clearance.store(cookie["value"], self.page.user_agent, cookie.get("expires"))
+
     async def auto_page_scroll(
         self,
         url: str,
@@ -69,10 +92,15 @@ class DrissionBot(BaseBot):
         page_sleep: int = 5,
     ) -> str:
         self.url = url
+        if not self.account_manager.is_available(self.account):
+            self.rotate_account()
 
         for attempt in range(max_retry):
+            if attempt:
+                metrics.RETRIES.inc(stage="page")
             try:
-                self.page.get(url)
+                with tracing.span("page.get", attempt=attempt):
+                    self.page.get(url)
 
                 # handle page redirection fail
                 if not self.handle_redirection_fail(url, max_retry, page_sleep):
@@ -86,11 +114,17 @@ class DrissionBot(BaseBot):
                     continue
 
                 # main business
-                self.handle_login()
+                with tracing.span("handle_login"):
+                    self.handle_login()
                 self.handle_read_limit()
                 self.handle_image_captcha()
                 self.page.run_js("document.body.style.zoom='50%'")
-                await self.scroller.scroll_to_bottom()
+                with metrics.SCROLL_SECONDS.time(), tracing.span("scroll_to_bottom"):
+                    await self.scroller.scroll_to_bottom()
+                self.account_manager.record_read(self.account)
+                if self.cloudflare.challenged:
+                    self.cloudflare.challenged = False
+                    self.save_clearance()
 
                 # Sleep to avoid Cloudflare blocking
                 self.logger.debug("Scrolling finished, pausing to avoid blocking")
@@ -100,6 +134,9 @@ class DrissionBot(BaseBot):
             except ContextLostError:
                 self.handle_login()
 
+            except AccountError:
+                raise
+
             except Exception as e:
                 self.logger.exception(
                     "Request failed for URL %s - Attempt %d/%d. Error: %s",
@@ -161,8 +198,9 @@ class DrissionBot(BaseBot):
             try:
                 accounts = self.account_manager.get_all_accounts()
                 for _ in accounts:
-                    # if no any available account, `AccountManager.random_pick` will execute sys.exit
-                    self.account = self.account_manager.random_pick()
+                    # if no any available account, `AccountManager.lease` raises AccountError
+                    if not self.account_manager.is_available(self.account):
+                        self.account = self.account_manager.lease(self.holder)
 
                     # this will update cookies_valid
                     if self.cookies_login():
@@ -192,9 +230,11 @@ class DrissionBot(BaseBot):
                         timeout=0.5,
                     ):
                         success = True
+                        metrics.LOGIN_ATTEMPTS.inc(method="password", result="success")
                         self.logger.info("Account %s login successful with password", self.account)
                         return success
                     else:
+                        metrics.LOGIN_ATTEMPTS.inc(method="password", result="failure")
                         self.logger.info(
                             "Account %s Login failed. Checking error messages",
                             self.account,
@@ -268,9 +308,12 @@ class DrissionBot(BaseBot):
         if not self.page(
             'xpath=//div[contains(@class, "alert-danger") and @role="alert"]', timeout=0.5
         ):
+            metrics.LOGIN_ATTEMPTS.inc(method="cookies", result="success")
             self.logger.info("Account %s login successful with cookies", self.account)
             return True
 
+        metrics.LOGIN_ATTEMPTS.inc(method="cookies", result="failure")
+
         now = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
         self.account_manager.update_runtime_state(self.account, "cookies_valid", False)
         self.account_manager.update_account(self.account, "exceed_time", now)
@@ -286,19 +329,21 @@ class DrissionBot(BaseBot):
 
     def handle_read_limit(self) -> None:
         if self.check_read_limit():
-            # click logout
-            self.page(
-                'xpath=//ul[@class="nav justify-content-end"]//a[contains(@href, "/user/logout")]'
-            ).click()
-            now = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
-            self.account_manager.update_runtime_state(self.account, "exceed_quota", True)
-            self.account_manager.update_account(self.account, "exceed_quota", True)
-            self.account_manager.update_account(self.account, "exceed_time", now)
-            self.account = self.account_manager.random_pick()
+            self.logout()
+            self.account_manager.mark_exhausted(self.account)
+            self.account = self.account_manager.lease(self.holder)
 
     def check_read_limit(self) -> bool:
         return "https://www.v2ph.com/user/upgrade" in self.page.url
 
+    def logout(self) -> None:
+        logout_link = self.page(
+            'xpath=//ul[@class="nav justify-content-end"]//a[contains(@href, "/user/logout")]',
+            timeout=0.5,
+        )
+        if logout_link:
+            logout_link.click()
+
     def click_logout(self) -> None:
         self.page.ele("@href=/user/logout").click()
 
@@ -323,11 +368,14 @@ class DriCloudflareHandler:
     def __init__(self, page: ChromiumPage, logger: Logger) -> None:
         self.page = page
         self.logger = logger
+        self.challenged = False
 
     def handle_simple_block(self, attempt: int, retries: int) -> bool:
         """Check, handle, and return whether blocked or not."""
         blocked = False
         if self.is_simple_blocked():
+            self.challenged = True
+            metrics.CHALLENGES.inc()
             self.logger.info(
                 "Cloudflare challenge detected - Solve attempt %d/%d",
                 attempt + 1,
@@ -366,10 +414,11 @@ class DriCloudflareHandler:
             turnstile_box = container.s_ele(".turnstile-box")
             turnstile_div = turnstile_box.s_ele("#cf-turnstile")
             turnstile_div.rect.click_point()  # type: ignore
-            self.page.wait(2)
             # pyautogui.moveTo(pos[0], pos[1] + 61, duration=0.5)
             # pyautogui.click()
-            self.page.wait(3)
+            # continue as soon as the challenge page is gone instead of a fixed 5 seconds
+            with suppress(TimeoutError):
+                wait_until(lambda: not self.is_simple_blocked(), timeout=5)
             blocked = True
         except Exception as e:
             self.logger.exception("Failed to solve new Cloudflare turnstile: %s", e)
@@ -2,12 +2,14 @@ import time
 import importlib
 from typing import Any
 
-from v2dl.common import Config
+from v2dl.common import ClientPool, Config
 from v2dl.security import AccountManager, KeyManager
+from v2dl.web_bot.base import BaseBot
 from v2dl.web_bot.drission_bot import DrissionBot
+from v2dl.web_bot.http_bot import HttpBot
 
 
-def get_bot(config: Config) -> Any:
+def get_bot(config: Config, client_pool: ClientPool | None = None) -> Any:
     bot_classes = {
         "drissionpage": DrissionBot,
     }
@@ -27,6 +29,16 @@ def get_bot(config: Config) -> Any:
                 "Selenium is not installed. Please install it to use SeleniumBot."
             ) from e
 
+    # plain HTTP requests, the browser is started only when a page requires it
+    if bot_type == "http":
+        return HttpBot(
+            config,
+            key_manager,
+            account_manager,
+            client_pool,
+            fallback=lambda holder: init_fallback_bot(config, key_manager, account_manager, holder),
+        )
+
     if bot_type not in bot_classes or bot_classes[bot_type] is None:
         raise ValueError(f"Unsupported automator type: {bot_type}")
 
@@ -37,6 +49,16 @@ def get_bot(config: Config) -> Any:
     return bot
 
 
+def init_fallback_bot(
+    config: Config, key_manager: KeyManager, account_manager: AccountManager, holder: BaseBot
+) -> DrissionBot:
+    """Start the browser of `holder`, it shares the account leased by `holder`."""
+    bot = DrissionBot(config, key_manager, account_manager, holder)
+    if bot.new_profile:
+        init_new_profile(bot)
+    return bot
+
+
 def init_new_profile(bot: Any) -> None:
     websites: list[str] = [
         # "https://www.google.com",
@@ -0,0 +1,194 @@
+import asyncio
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+import httpx
+
+from v2dl.common import metrics, tracing
+from v2dl.common.clearance import CLEARANCE_COOKIE
+from v2dl.common.client import ClientPool
+from v2dl.common.const import DEFAULT_USER_AGENT
+from v2dl.common.cookies import load_cookies
+from v2dl.web_bot.base import BaseBot
+
+if TYPE_CHECKING:
+    from v2dl.common import Config
+    from v2dl.security import AccountManager, KeyManager
+
+PAGE_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "ja;q=0.9,en-US,en;q=0.8",
+    "Referer": "https://www.v2ph.com/",
+    "sec-fetch-dest": "document",
+    "sec-fetch-mode": "navigate",
+    "sec-fetch-site": "same-origin",
+}
+
+# pages the browser bot has to handle: cloudflare challenges, login, captcha and read limit
+CHALLENGE_MARKERS = (
+    "Just a moment...",
+    "請稍候...",
+    "Checking your",
+    "cf-turnstile",
+    "_cf_chl_opt",
+)
+BROWSER_MARKERS = ("login-box-msg", "captcha-container")
+READ_LIMIT_PATH = "/user/upgrade"
+
+
+class HttpBot(BaseBot):
+    """Fetch pages with plain HTTP requests and use a browser bot only when required.
+
+    Requests reuse the shared httpx client and send the cookies of the current account, or
+    the cookies and user agent handed off by the browser after it passed a challenge. The
+    browser bot is created lazily by `fallback` the first time a page cannot be fetched
+    without it, it works with the account leased by the http bot.
+    """
+
+    def __init__(
+        self,
+        config: "Config",
+        key_manager: "KeyManager",
+        account_manager: "AccountManager",
+        client_pool: ClientPool | None = None,
+        fallback: "Callable[[BaseBot], BaseBot] | None" = None,
+    ) -> None:
+        super().__init__(config, key_manager, account_manager)
+        self.client_pool = client_pool or ClientPool(config)
+        self.clearance = self.client_pool.clearance
+        self.page_concurrency = max(config.static_config.page_concurrency, 1)
+        self.browser_lock = asyncio.Lock()  # the browser has one tab for all page requests
+        self.fallback_factory = fallback
+        self.fallback: BaseBot | None = None
+        self.user_agent = config.static_config.custom_user_agent or DEFAULT_USER_AGENT
+        self.cookies: dict[str, str] = {}
+        self.session_account = ""
+        self.init_driver()
+
+    def init_driver(self) -> None:
+        """Load the cookies of the current account, no browser is started."""
+        self.session_account = self.account
+        account_info = self.account_manager.read(self.account) or {}
+        cookies_path = account_info.get("cookies")
+        cookies = load_cookies(cookies_path) if cookies_path else {}
+        self.cookies = {k: v for k, v in cookies.items() if v is not None}
+
+    def logout(self) -> None:
+        """Drop the cookies of the current account, the next request loads the new account."""
+        self.cookies = {}
+        self.session_account = ""
+
+    def close_driver(self) -> None:
+        if self.fallback is not None:
+            self.fallback.close_driver()
+            self.fallback = None  # started again by the next page that needs it
+
+    async def auto_page_scroll(
+        self,
+        url: str,
+        max_retry: int = 3,
+        page_sleep: int = 5,
+    ) -> str:
+        if not self.account_manager.is_available(self.account):
+            self.rotate_account()
+        if self.session_account != self.account:
+            self.init_driver()
+        self.load_clearance()
+
+        for attempt in range(max_retry):
+            if attempt:
+                metrics.RETRIES.inc(stage="page")
+            try:
+                with tracing.span("http.get", attempt=attempt):
+                    response = await self.client_pool.get().get(url, headers=self.get_headers())
+            except httpx.HTTPError as e:
+                self.logger.warning(
+                    "Request failed for URL %s - Attempt %d/%d. Error: %s",
+                    url,
+                    attempt + 1,
+                    max_retry,
+                    e,
+                )
+                await asyncio.sleep(attempt + 1)
+                continue
+
+            self.cookies.update(response.cookies)
+            if self.needs_browser(response):
+                self.logger.info("Page %s requires the browser", url)
+                async with self.browser_lock:
+                    return await self.browser_fetch(url, max_retry, page_sleep)
+            if response.status_code == 429 or response.status_code >= 500:
+                await asyncio.sleep(attempt + 1)
+                continue
+            if response.is_success:
+                self.account_manager.record_read(self.account)
+                return response.text
+            break
+
+        error_msg = f"Failed to retrieve URL after {max_retry} attempts: '{url}'"
+        self.logger.error(error_msg)
+        return error_msg
+
+    def load_clearance(self) -> None:
+        """Use a cached clearance together with the user agent it was issued to."""
+        if CLEARANCE_COOKIE in self.cookies:
+            return
+        clearance = self.clearance.get()
+        if clearance is not None:
+            self.cookies[CLEARANCE_COOKIE] = clearance.value
+            self.user_agent = clearance.user_agent
+
+    def reject_clearance(self) -> None:
+        value = self.cookies.pop(CLEARANCE_COOKIE, None)
+        if value is not None:
+            self.clearance.discard(value)
+
+    def get_headers(self) -> dict[str, str]:
+        headers = {**PAGE_HEADERS, "User-Agent": self.user_agent}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        return headers
+
+    def needs_browser(self, response: httpx.Response) -> bool:
+        if response.headers.get("cf-mitigated") == "challenge":
+            metrics.CHALLENGES.inc()
+            self.reject_clearance()
+            return True
+        if READ_LIMIT_PATH in response.url.path:
+            return True
+
+        html = response.text
+        if any(marker in html for marker in CHALLENGE_MARKERS):
+            metrics.CHALLENGES.inc()
+            self.reject_clearance()
+            return True
+        if any(marker in html for marker in BROWSER_MARKERS):
+            return True
+        # same blockage check as the browser bots
+        return response.is_success and "v2ph" not in html
+
+    async def browser_fetch(self, url: str, max_retry: int, page_sleep: int) -> str:
+        """Fetch the page with the browser bot and take over its session afterwards."""
+        if self.fallback is None:
+            if self.fallback_factory is None:
+                error_msg = f"Failed to retrieve URL without a browser: '{url}'"
+                self.logger.error(error_msg)
+                return error_msg
+            self.logger.info("Starting the browser bot")
+            self.fallback = self.fallback_factory(self)
+
+        self.fallback.account = self.account
+        html = await self.fallback.auto_page_scroll(url, max_retry, page_sleep)
+        self.account = self.fallback.account  # the browser may switch account on read limit
+
+        try:
+            cookies, user_agent = self.fallback.export_session()
+        except NotImplementedError:
+            self.logger.debug("Browser bot does not support session hand-off")
+        else:
+            self.cookies = cookies
+            self.user_agent = user_agent or self.user_agent
+            self.session_account = self.account
+            self.clearance.store(cookies.get(CLEARANCE_COOKIE, ""), self.user_agent)
+            self.logger.debug("Took over the browser session with %d cookies", len(cookies))
+        return html
@@ -18,7 +18,7 @@ from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
-from v2dl.common import BotError
+from v2dl.common import AccountError, BotError
 from v2dl.common.cookies import load_cookies
 from v2dl.web_bot.base import BaseBehavior, BaseBot, BaseScroll
 
@@ -27,7 +27,6 @@ if TYPE_CHECKING:
     from v2dl.security import AccountManager, KeyManager
 
 DEFAULT_BOT_OPT = [
-    "--remote-debugging-port=9222",
     "--disable-gpu",
     "--disable-infobars",
     "--disable-extensions",
@@ -45,8 +44,6 @@ class SeleniumBot(BaseBot):
     ) -> None:
         super().__init__(config, key_manager, account_manager)
         self.init_driver()
-        self.scroller = SelScroll(self.driver, self.config, self.logger)
-        self.cloudflare = SelCloudflareHandler(self.driver, self.logger)
 
     def init_driver(self) -> None:
         self.driver: WebDriver
@@ -55,7 +52,8 @@ class SeleniumBot(BaseBot):
         chrome_path = [self.config.static_config.chrome_exec_path]
 
         # commands for running subprocess
-        subprocess_cmd = chrome_path + (DEFAULT_BOT_OPT)
+        port = self.config.static_config.chrome_port
+        subprocess_cmd = [*chrome_path, f"--remote-debugging-port={port}", *DEFAULT_BOT_OPT]
 
         if not self.config.static_config.use_default_chrome_profile:
             user_data_dir = self.prepare_chrome_profile()
@@ -65,18 +63,24 @@ class SeleniumBot(BaseBot):
             options.add_argument(arg)
 
         # additional args for webdriver.Chrome to takeover the control of created browser
-        options.add_experimental_option("debuggerAddress", "127.0.0.1:9222")
+        options.add_experimental_option("debuggerAddress", f"127.0.0.1:{port}")
         try:
             self.chrome_process = Popen(subprocess_cmd)  # subprocess.run fails
             self.driver = webdriver.Chrome(service=Service(), options=options)
         except Exception as e:
             self.logger.error("Unable to start Selenium WebDriver: %s", e)
             sys.exit("Unable to start Selenium WebDriver")
+        self.scroller = SelScroll(self.driver, self.config, self.logger)
+        self.cloudflare = SelCloudflareHandler(self.driver, self.logger)
 
     def close_driver(self) -> None:
         self.driver.quit()
         self.chrome_process.terminate()
 
+    def export_session(self) -> tuple[dict[str, str], str]:
+        cookies = {cookie["name"]: cookie["value"] for cookie in self.driver.get_cookies()}
+        return cookies, self.driver.execute_script("return navigator.userAgent;")
+
     async def auto_page_scroll(
         self,
         url: str,
@@ -85,6 +89,8 @@ class SeleniumBot(BaseBot):
     ) -> str:
         response: str = ""
         self.url = url
+        if not self.account_manager.is_available(self.account):
+            self.rotate_account()
 
         for attempt in range(max_retry):
             try:
@@ -107,11 +113,15 @@ class SeleniumBot(BaseBot):
                 self.handle_image_captcha()
                 self.driver.execute_script("document.body.style.zoom='50%'")
                 await self.scroller.scroll_to_bottom()
+                self.account_manager.record_read(self.account)
                 SelBehavior.random_sleep(5, 15)
 
                 response = self.driver.page_source
                 break
 
+            except AccountError:
+                raise
+
             except Exception as e:
                 self.logger.exception(
                     "Request failed for URL %s - Attempt %d/%d. Error: %s",
@@ -157,8 +167,9 @@ class SeleniumBot(BaseBot):
             try:
                 accounts = self.account_manager.get_all_accounts()
                 for _ in accounts:
-                    # if no any available account, `AccountManager.random_pick` will execute sys.exit
-                    self.account = self.account_manager.random_pick()
+                    # if no any available account, `AccountManager.lease` raises AccountError
+                    if not self.account_manager.is_available(self.account):
+                        self.account = self.account_manager.lease(self.holder)
 
                     # this will update cookies_valid
                     if self.cookies_login():
@@ -285,17 +296,17 @@ class SeleniumBot(BaseBot):
 
     def handle_read_limit(self) -> None:
         if self.check_read_limit():
-            # click logout
-            logout_button = self.driver.find_element(
-                By.XPATH,
-                '//ul[@class="nav justify-content-end"]//a[contains(@href, "/user/logout")]',
-            )
-            logout_button.click()
-            now = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
-            self.account_manager.update_runtime_state(self.account, "exceed_quota", True)
-            self.account_manager.update_account(self.account, "exceed_quota", True)
-            self.account_manager.update_account(self.account, "exceed_time", now)
-            self.account = self.account_manager.random_pick()
+            self.logout()
+            self.account_manager.mark_exhausted(self.account)
+            self.account = self.account_manager.lease(self.holder)
+
+    def logout(self) -> None:
+        logout_buttons = self.driver.find_elements(
+            By.XPATH,
+            '//ul[@class="nav justify-content-end"]//a[contains(@href, "/user/logout")]',
+        )
+        if logout_buttons:
+            logout_buttons[0].click()
 
     def check_read_limit(self) -> bool:
         return "https://www.v2ph.com/user/upgrade" in self.driver.current_url